@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "AmiFactory_test_task.settings")
+# Sync code of each request runs in a new thread, per-thread persistent
+# connections would pile up. Set DB_POOL_MAX_SIZE to reuse connections
+os.environ.setdefault("DB_CONN_MAX_AGE", "0")
 
 application = get_asgi_application()
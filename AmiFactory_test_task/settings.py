@@ -32,6 +32,8 @@ DEBUG = True
 
 ALLOWED_HOSTS = ["127.0.0.1"]
 
+INTERNAL_IPS = ["127.0.0.1"]
+
 
 # Application definition
 
@@ -46,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.instrumentation.instrumentation_middleware",
+    "api.routers.replica_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -87,6 +91,67 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        # Seconds a thread keeps its connection open between requests, and
+        # a liveness check before reusing it. Set DB_CONN_MAX_AGE=0 with
+        # ASGI, it runs each request in a new thread, see asgi.py
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+# Bounded pool shared by all threads instead of per-thread connections,
+# requests wait up to DB_POOL_TIMEOUT seconds for a free connection
+if os.getenv("DB_POOL_MAX_SIZE"):
+    DATABASES["default"].update(
+        ENGINE="api.backends.postgresql_pool",
+        CONN_MAX_AGE=0,
+        OPTIONS={
+            "pool": {
+                "max_size": int(os.getenv("DB_POOL_MAX_SIZE")),
+                "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+                "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 600)),
+            }
+        },
+    )
+
+# Streaming replicas of the primary, comma separated hosts. Reads of api
+# models by safe requests go to a healthy replica, see api.routers.ReplicaRouter.
+# For a local setup add any databases to DATABASES and list them here
+API_DB_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))
+):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    API_DB_REPLICAS.append(f"replica_{index}")
+
+# Second alias of the primary, never routed to unless listed in
+# API_DB_REPLICAS. Tests list it to read through a separate connection,
+# test runs point it at the test database, see api.tests.test_routers
+DATABASES["test_replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["api.routers.ReplicaRouter"]
+
+# Seconds a client reads from primary after its write, to see own changes,
+# and every request after any catalog write, so version-keyed caches are
+# not filled from lagging replicas. Keep it above the worst replica lag
+API_DB_REPLICA_STICKINESS = int(os.getenv("API_DB_REPLICA_STICKINESS", 10))
+# Seconds a replica that failed to connect is skipped
+API_DB_REPLICA_RETRY_AFTER = int(os.getenv("API_DB_REPLICA_RETRY_AFTER", 30))
+
+
+# Holds catalog and reference versions besides cached data. Point it at
+# Redis or Memcached when running several worker processes, so that
+# writes in one process invalidate caches of the others
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
     }
 }
 
@@ -127,6 +192,9 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+MEDIA_URL = "media/"
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", BASE_DIR / "media")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -134,3 +202,102 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Pagination
 NUM_OF_INSTANCES_ON_PAGE = 5
+# Movie list totals are cached per filters and catalog version that long
+CURSOR_COUNT_CACHE_TIMEOUT = int(os.getenv("CURSOR_COUNT_CACHE_TIMEOUT", 60))
+# Counts of at least this many rows are planner estimates instead of
+# COUNT(*): table statistics for admin changelists and unfiltered movie
+# lists, EXPLAIN row estimates for filtered movie lists on PostgreSQL.
+# Run ANALYZE to refresh them, see api.counting
+ESTIMATED_COUNT_THRESHOLD = int(os.getenv("ESTIMATED_COUNT_THRESHOLD", 100_000))
+
+# Movies fetched per server-side cursor round trip of the NDJSON export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Seconds X-Export-Watermark is set back from the start of an export, so
+# rows stamped before but committed after it are exported next time
+EXPORT_WATERMARK_LAG = int(os.getenv("EXPORT_WATERMARK_LAG", 300))
+
+# Response cache of api views, BACKEND is "local", "django" or "none"
+API_RESPONSE_CACHE = {
+    "BACKEND": os.getenv("API_RESPONSE_CACHE_BACKEND", "local"),
+    "TIMEOUT": int(os.getenv("API_RESPONSE_CACHE_TIMEOUT", 300)),
+    "MAX_ENTRIES": int(os.getenv("API_RESPONSE_CACHE_MAX_ENTRIES", 1024)),
+    "CACHE_ALIAS": "default",
+}
+
+# Identical concurrent requests missing the response cache wait up to
+# TIMEOUT seconds for the first one and reuse its response instead of
+# running the same queries, per process, see api.coalescing
+API_COALESCE_REQUESTS = {
+    "ENABLED": os.getenv("API_COALESCE_REQUESTS", "1") == "1",
+    "TIMEOUT": float(os.getenv("API_COALESCE_REQUESTS_TIMEOUT", 10)),
+}
+
+# Token bucket per client and list endpoint, BACKEND is "local" (per
+# process), "django" (CACHE_ALIAS, shared) or "none". A client gets
+# BURST requests at once and RATE more per second, then 429
+API_RATE_LIMIT = {
+    "BACKEND": os.getenv("API_RATE_LIMIT_BACKEND", "none"),
+    "RATE": float(os.getenv("API_RATE_LIMIT_RATE", 10)),
+    "BURST": int(os.getenv("API_RATE_LIMIT_BURST", 30)),
+    "MAX_CLIENTS": int(os.getenv("API_RATE_LIMIT_MAX_CLIENTS", 100_000)),
+    "CACHE_ALIAS": "default",
+}
+
+# Serve movie endpoints from denormalized MovieCard rows,
+# run `manage.py rebuild_movie_cards` before turning it on
+API_SERVE_FROM_READ_MODEL = os.getenv("API_SERVE_FROM_READ_MODEL") == "1"
+
+# Route api through async views, worth it only when served with ASGI
+API_ASYNC_VIEWS = os.getenv("API_ASYNC_VIEWS") == "1"
+
+# Encoder of api responses, "json" (stdlib, same bytes as JsonResponse)
+# or "orjson" (faster, compact output, needs orjson installed)
+API_JSON_ENCODER = os.getenv("API_JSON_ENCODER", "json")
+
+# Default movie payload of movie list, "full" or the compact "card"
+# (no description, only genres of relations). Clients pick either with
+# `view=`, or exact fields with `fields=`/`include=`, see api.fieldsets
+API_MOVIE_LIST_VIEW = os.getenv("API_MOVIE_LIST_VIEW", "full")
+
+# Cache-Control directives of api endpoints keyed by url name, passed to
+# patch_cache_control. Responses carry ETag, so clients revalidate cheaply
+API_CACHE_CONTROL = {
+    "genres_list": {"public": True, "max_age": 60},
+    "movies_list": {"public": True, "no_cache": True},
+    "movie_detail": {"public": True, "no_cache": True},
+    "movie_related": {"public": True, "no_cache": True},
+    "persons_list": {"public": True, "no_cache": True},
+    "person_detail": {"public": True, "no_cache": True},
+}
+
+# Resized WebP copies of movie images, name: (max width, max height).
+# Generated by IMAGE_DERIVATIVE_WORKERS background threads, 0 runs inline
+IMAGE_DERIVATIVES = {
+    "thumb": (160, 240),
+    "card": (400, 600),
+    "full": (1280, 1920),
+}
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv("IMAGE_DERIVATIVE_QUALITY", 80))
+IMAGE_DERIVATIVE_WORKERS = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", 2))
+
+# Max genres and max persons each kept in process by api.references
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", 100_000))
+
+# Related movies kept per movie, and movies per attribute above which
+# an attribute (typically a genre) no longer makes every movie having it
+# a candidate, see api.related. Rebuild with `rebuild_related_movies`
+RELATED_MOVIES_TOP_K = int(os.getenv("RELATED_MOVIES_TOP_K", 20))
+RELATED_MOVIES_MAX_POSTING = int(os.getenv("RELATED_MOVIES_MAX_POSTING", 200))
+
+# Per-request queries, DB and JSON encoding time and payload size, opt-in.
+# SAMPLE_RATE 0.01 instruments one request in a hundred. Statements run
+# REPEATED_QUERY_THRESHOLD times in one request are logged as N+1 suspects.
+# Per-view totals are served at api/v1/metrics/ to INTERNAL_IPS
+API_INSTRUMENTATION = {
+    "ENABLED": os.getenv("API_INSTRUMENTATION") == "1",
+    "SAMPLE_RATE": float(os.getenv("API_INSTRUMENTATION_SAMPLE_RATE", 1.0)),
+    "SERVER_TIMING": os.getenv("API_INSTRUMENTATION_SERVER_TIMING", "1") == "1",
+    "LOG": os.getenv("API_INSTRUMENTATION_LOG") == "1",
+    "REPEATED_QUERY_THRESHOLD": 3,
+}
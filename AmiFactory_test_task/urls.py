@@ -13,10 +13,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
 urlpatterns = [
     path("admin/", admin.site.urls),
-    path("api/v1/", include("api.urls", namespace="api")),
-]
+    path(
+        "api/v1/",
+        include(
+            "api.async_urls" if settings.API_ASYNC_VIEWS else "api.urls",
+            namespace="api",
+        ),
+    ),
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
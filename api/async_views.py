@@ -0,0 +1,259 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import DatabaseError
+from django.http import HttpResponse, HttpRequest
+
+from api.cache import cache_response, conditional_response
+from api.counting import acount_movies
+from api.encoding import FastJsonResponse
+from api.facets import get_facets
+from api.fieldsets import VIEW_CARD, VIEW_FULL, parse_fieldset
+from api.filmography import (
+    PERSON_FIELDS,
+    filter_persons,
+    get_credit_rows,
+    get_person_rows,
+    parse_roles,
+)
+from api.filters import (
+    FIELDSET_PARAMS,
+    GENRE_LIST_PARAMS,
+    MOVIE_LIST_PARAMS,
+    PERSON_DETAIL_PARAMS,
+    PERSON_LIST_PARAMS,
+    RELATED_LIST_PARAMS,
+    InvalidFilter,
+)
+from api.models import Genre, Movie, MovieCard, Person
+from api.pagination import aget_cursor_page, aget_estimated_page, aget_offset_page
+from api.ratelimit import rate_limit
+from api.read_model import is_read_model_enabled
+from api.references import agenre_exists
+from api.related import aget_related_ids, order_related_rows, parse_limit
+from api.serializers import (
+    CARD_FIELDS,
+    MOVIE_OUTPUT_FIELDS,
+    aget_movie_dicts,
+    get_movie_columns,
+)
+from api.views import (
+    error_response,
+    get_cards_page_response,
+    get_credit_movie_rows,
+    get_genre_list_data,
+    get_movie_list_rows,
+    get_movie_updated_at,
+    get_person_detail_response,
+    get_person_list_response,
+    get_related_results,
+    get_related_rows,
+    internal_error_response,
+    page_error_response,
+    parse_movie_list_query,
+)
+
+
+async def aget_movies_page_response(
+    data: dict, rows: list[dict], from_cards: bool, fields: tuple[str, ...]
+) -> HttpResponse:
+    """Async get_movies_page_response, rows are already fetched"""
+    if from_cards:
+        return get_cards_page_response(data, rows)
+
+    return FastJsonResponse({**data, "results": await aget_movie_dicts(rows, fields)})
+
+
+@rate_limit("genres_list")
+@conditional_response("genres_list", query_params=GENRE_LIST_PARAMS)
+@cache_response(query_params=GENRE_LIST_PARAMS)
+async def genre_list_view(request: HttpRequest) -> FastJsonResponse:
+    """Async version of api.views.genre_list_view"""
+    try:
+        data = get_genre_list_data(
+            request, [genre async for genre in Genre.objects.all()]
+        )
+        return FastJsonResponse(data, safe=False)
+    except DatabaseError:
+        return internal_error_response()
+
+
+@rate_limit("movies_list")
+@conditional_response("movies_list", query_params=MOVIE_LIST_PARAMS)
+@cache_response(query_params=MOVIE_LIST_PARAMS)
+async def movie_list_view(request: HttpRequest) -> HttpResponse:
+    """
+    Async version of api.views.movie_list_view with the same
+    parameters, errors and response bodies.
+    """
+    page = request.GET.get("page", 1)
+
+    try:
+        filters, facets, fields = parse_movie_list_query(request)
+        if filters.genre_id and not await agenre_exists(filters.genre_id):
+            raise InvalidFilter("genre__invalid")
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        movies, rows, from_cards = get_movie_list_rows(filters, fields)
+
+        if "cursor" in request.GET:
+            try:
+                page_rows, next_cursor = await aget_cursor_page(
+                    rows,
+                    request.GET["cursor"],
+                    settings.NUM_OF_INSTANCES_ON_PAGE,
+                    pk_field="movie_id" if from_cards else "id",
+                )
+            except ValueError:
+                return error_response("cursor__invalid")
+
+            data = {"next_cursor": next_cursor}
+            if request.GET.get("with_total"):
+                data["total"], data["total_is_estimate"] = await acount_movies(movies)
+            if facets:
+                data["facets"] = await sync_to_async(get_facets)(movies, facets)
+
+            return await aget_movies_page_response(data, page_rows, from_cards, fields)
+
+        total, total_is_estimate = await acount_movies(movies)
+
+        try:
+            if total_is_estimate:
+                page_rows, total, total_is_estimate = await aget_estimated_page(
+                    rows, page, settings.NUM_OF_INSTANCES_ON_PAGE, total
+                )
+            else:
+                page_rows = await aget_offset_page(
+                    rows, page, settings.NUM_OF_INSTANCES_ON_PAGE, total
+                )
+        except InvalidPage as error:
+            return page_error_response(error)
+
+        data = {"pages": page, "total": total, "total_is_estimate": total_is_estimate}
+        if facets:
+            data["facets"] = await sync_to_async(get_facets)(movies, facets)
+
+        return await aget_movies_page_response(data, page_rows, from_cards, fields)
+
+    except DatabaseError:
+        return internal_error_response()
+
+
+@conditional_response(
+    "movie_detail", query_params=FIELDSET_PARAMS, last_modified=get_movie_updated_at
+)
+@cache_response(query_params=FIELDSET_PARAMS)
+async def movie_detail_view(request: HttpRequest, pk: int) -> HttpResponse:
+    """Async version of api.views.movie_detail_view"""
+    try:
+        fields = parse_fieldset(request.GET, VIEW_FULL)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        if is_read_model_enabled() and fields == MOVIE_OUTPUT_FIELDS:
+            try:
+                card = await MovieCard.objects.only("payload").aget(movie_id=pk)
+                return HttpResponse(card.payload, content_type="application/json")
+            except MovieCard.DoesNotExist:
+                pass
+
+        movie = await Movie.objects.values(*get_movie_columns(fields)).aget(id=pk)
+        data = (await aget_movie_dicts([movie], fields))[0]
+    except Movie.DoesNotExist:
+        return error_response("movie__not_found")
+    except DatabaseError:
+        return internal_error_response()
+
+    return FastJsonResponse(data, safe=False)
+
+
+@rate_limit("movie_related")
+@conditional_response("movie_related", query_params=RELATED_LIST_PARAMS)
+@cache_response(query_params=RELATED_LIST_PARAMS)
+async def movie_related_view(request: HttpRequest, pk: int) -> HttpResponse:
+    """Async version of api.views.movie_related_view"""
+    try:
+        fields = parse_fieldset(request.GET, VIEW_CARD)
+        limit = parse_limit(request.GET)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        pairs = await aget_related_ids(pk, limit)
+        if not pairs and not await Movie.objects.filter(id=pk).aexists():
+            return error_response("movie__not_found")
+
+        rows, scores = order_related_rows(
+            pairs, [row async for row in get_related_rows(pairs, fields)]
+        )
+        results = get_related_results(await aget_movie_dicts(rows, fields), scores)
+    except DatabaseError:
+        return internal_error_response()
+
+    return FastJsonResponse({"results": results})
+
+
+@rate_limit("persons_list")
+@conditional_response("persons_list", query_params=PERSON_LIST_PARAMS)
+@cache_response(query_params=PERSON_LIST_PARAMS)
+async def person_list_view(request: HttpRequest) -> FastJsonResponse:
+    """Async version of api.views.person_list_view"""
+    page = request.GET.get("page", 1)
+
+    try:
+        persons = filter_persons(Person.objects.all(), request.GET)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        total = await persons.acount()
+        try:
+            rows = await aget_offset_page(
+                get_person_rows(persons),
+                page,
+                settings.NUM_OF_INSTANCES_ON_PAGE,
+                total,
+            )
+        except InvalidPage as error:
+            return page_error_response(error)
+
+        return get_person_list_response(page, total, rows)
+    except DatabaseError:
+        return internal_error_response()
+
+
+@conditional_response("person_detail", query_params=PERSON_DETAIL_PARAMS)
+@cache_response(query_params=PERSON_DETAIL_PARAMS)
+async def person_detail_view(request: HttpRequest, pk: int) -> FastJsonResponse:
+    """Async version of api.views.person_detail_view"""
+    page = request.GET.get("page", 1)
+
+    try:
+        roles = parse_roles(request.GET)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        person = await Person.objects.values(*PERSON_FIELDS).aget(id=pk)
+
+        credit_rows = get_credit_rows(pk, roles)
+        total = await credit_rows.acount()
+        try:
+            credits = await aget_offset_page(
+                credit_rows, page, settings.NUM_OF_INSTANCES_ON_PAGE, total
+            )
+        except InvalidPage as error:
+            return page_error_response(error)
+
+        movies = await aget_movie_dicts(
+            [row async for row in get_credit_movie_rows(credits)], CARD_FIELDS
+        )
+    except Person.DoesNotExist:
+        return error_response("person__not_found")
+    except DatabaseError:
+        return internal_error_response()
+
+    return get_person_detail_response(person, page, total, credits, movies, roles)
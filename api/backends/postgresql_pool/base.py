@@ -0,0 +1,130 @@
+"""
+PostgreSQL backend that borrows connections from a process-wide pool
+instead of opening one per request. Closing a connection, which Django
+does at the end of every request with CONN_MAX_AGE = 0, returns it to the
+pool. Unlike persistent connections, which belong to a thread, pooled
+ones are reused across the threads ASGI runs sync code in.
+
+    "ENGINE": "api.backends.postgresql_pool",
+    "CONN_MAX_AGE": 0,
+    "OPTIONS": {"pool": {"max_size": 10, "timeout": 10, "max_idle": 600}},
+
+CONN_HEALTH_CHECKS validates idle connections before they are reused.
+"""
+
+import functools
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base, creation
+from psycopg2 import extensions, extras
+
+from api.backends.postgresql_pool.pool import ConnectionPool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool_key(conn_params: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in conn_params.items()))
+
+
+def close_pools(database: str) -> None:
+    with _pools_lock:
+        pools = [pool for key, pool in _pools.items() if ("database", database) in key]
+    for pool in pools:
+        pool.close()
+
+
+def connect(conn_params: dict, isolation_level: int | None):
+    """Same setup as DatabaseWrapper.get_new_connection of the base backend"""
+    connection = base.Database.connect(**conn_params)
+    if isolation_level is not None and isolation_level != connection.isolation_level:
+        connection.set_session(isolation_level=isolation_level)
+    extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+def is_reusable(health_checks: bool, connection) -> bool:
+    if connection.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if not health_checks:
+        return True
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name: str, verbosity: int) -> None:
+        # Idle pooled connections would keep the database busy
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, settings_dict: dict, *args, **kwargs) -> None:
+        super().__init__(settings_dict, *args, **kwargs)
+        if settings_dict["CONN_MAX_AGE"]:
+            raise ImproperlyConfigured(
+                "Pooled connections require CONN_MAX_AGE = 0, "
+                "persistent ones would never return to the pool"
+            )
+
+    def get_connection_params(self) -> dict:
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_pool(self, conn_params: dict) -> ConnectionPool:
+        key = get_pool_key(conn_params)
+        pool = _pools.get(key)
+        if pool is None:
+            options = self.settings_dict["OPTIONS"]
+            with _pools_lock:
+                pool = _pools.get(key)
+                if pool is None:
+                    pool = _pools[key] = ConnectionPool(
+                        functools.partial(
+                            connect, conn_params, options.get("isolation_level")
+                        ),
+                        functools.partial(
+                            is_reusable, self.settings_dict["CONN_HEALTH_CHECKS"]
+                        ),
+                        **options.get("pool", {}),
+                    )
+        return pool
+
+    def get_new_connection(self, conn_params: dict):
+        self._pool = self.get_pool(conn_params)
+        connection = self._pool.getconn()
+        # Set by the base class only when it opens a connection
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    def _close(self) -> None:
+        if self.connection is None:
+            return
+
+        connection = self.connection
+        # Closed inside atomic() the wrapper keeps a reference, never share it
+        reusable = not self.in_atomic_block
+        if reusable and not connection.closed:
+            status = connection.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                reusable = False
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    connection.rollback()
+                except base.Database.Error:
+                    reusable = False
+
+        self._pool.putconn(connection, reusable=reusable)
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+from django.db import OperationalError
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of at most max_size DB-API connections shared by all
+    threads of a process. Checkout blocks up to timeout seconds when all
+    connections are in use. Idle connections are handed out most recently
+    used first and closed after max_idle seconds. With check, connections
+    are validated before reuse and replaced when broken.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        check: Callable[[Any], bool],
+        max_size: int = 10,
+        timeout: float = 10.0,
+        max_idle: float = 600.0,
+    ) -> None:
+        self.connect = connect
+        self.check = check
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    def take_idle(self) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                connection, released_at = self._idle.pop()
+                if now - released_at <= self.max_idle:
+                    return connection
+                # Rest of the deque is older still
+                expired = [connection] + [item[0] for item in self._idle]
+                self._idle.clear()
+                break
+            else:
+                return None
+
+        for connection in expired:
+            self.discard(connection)
+        return None
+
+    def getconn(self) -> Any:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise OperationalError(
+                f"All {self.max_size} pooled connections are busy "
+                f"for {self.timeout} seconds"
+            )
+
+        try:
+            connection = self.take_idle()
+            while connection is not None and not self.check(connection):
+                self.discard(connection)
+                connection = self.take_idle()
+            if connection is None:
+                connection = self.connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        return connection
+
+    def putconn(self, connection: Any, reusable: bool = True) -> None:
+        try:
+            if reusable and not connection.closed:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+            else:
+                self.discard(connection)
+        finally:
+            self._slots.release()
+
+    def discard(self, connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Close idle connections, e.g. before dropping the database"""
+        with self._lock:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self.discard(connection)
@@ -0,0 +1,93 @@
+"""
+Benchmarks of the api app, run them with
+`python manage.py run_benchmark <name>` against a throwaway test database.
+"""
+
+import statistics
+import time
+from typing import Callable
+
+BENCHMARKS = {
+    "endpoints": "api.benchmarks.endpoints.run",
+    "search": "api.benchmarks.search.run",
+    "asgi": "api.benchmarks.asgi.run",
+    "connections": "api.benchmarks.connections.run",
+    "encoding": "api.benchmarks.encoding.run",
+    "filters": "api.benchmarks.filters.run",
+}
+
+
+def measure(func: Callable, repeat: int) -> dict:
+    """Run func repeat times and return latency stats in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 3),
+        "p99_ms": round(timings[int(0.99 * (len(timings) - 1))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+# Latency below this difference in milliseconds is treated as noise
+NOISE_FLOOR_MS = 0.5
+
+
+def get_result_key(result: dict) -> tuple:
+    """Identity of a result, its size, concurrency and text values"""
+    return tuple(
+        sorted(
+            (name, value)
+            for name, value in result.items()
+            if name in ("size", "concurrency") or isinstance(value, str)
+        )
+    )
+
+
+def compare_results(
+    baseline: list[dict], current: list[dict], threshold: float
+) -> list[str]:
+    """
+    Regressions of current results against baseline ones of the same
+    size and case. Timings and memory regress when they grow by more than
+    `threshold` (0.2 is 20%), throughput when it drops by more than that,
+    query counts regress on any growth.
+    """
+    baseline = {get_result_key(result): result for result in baseline}
+    regressions = []
+
+    for result in current:
+        previous = baseline.get(get_result_key(result))
+        if previous is None:
+            continue
+
+        for metric, value in result.items():
+            old = previous.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+
+            if metric == "queries":
+                regressed = value > old
+            elif metric.endswith("_ms"):
+                regressed = (
+                    value > old * (1 + threshold) and value - old > NOISE_FLOOR_MS
+                )
+            elif metric.endswith("_kb"):
+                regressed = value > old * (1 + threshold)
+            elif metric.endswith("_per_s"):
+                regressed = value < old * (1 - threshold)
+            else:
+                continue
+
+            if regressed:
+                regressions.append(
+                    f"size={result.get('size')} case={result.get('case')} "
+                    f"{metric}: {old} -> {value}"
+                )
+
+    return regressions
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import include, path
+
+from api.benchmarks.seed import seed_movies
+
+CONCURRENCY = 16
+PATHS = {
+    "list": "movies/",
+    "list_search": "movies/?q=silent ocean",
+    "cursor": "movies/?cursor=",
+    "detail": "movies/1/",
+}
+
+# ROOT_URLCONF of the benchmark, same api under sync and async prefixes
+urlpatterns = [
+    path("sync/", include("api.urls", namespace="sync")),
+    path("async/", include("api.async_urls", namespace="async")),
+]
+
+
+def summarize(prefix: str, timings: list[float], elapsed: float) -> dict:
+    timings.sort()
+    return {
+        f"{prefix}_requests_per_s": round(len(timings) / elapsed, 1),
+        f"{prefix}_p99_ms": round(timings[int(0.99 * (len(timings) - 1))] * 1000, 3),
+    }
+
+
+def run_sync(url: str, requests: int) -> dict:
+    """WSGI-style serving, every worker thread holds its own connection"""
+
+    def worker(count: int) -> list[float]:
+        client = Client()
+        timings = []
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                client.get(url)
+                timings.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+        return timings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        chunks = executor.map(worker, [requests // CONCURRENCY] * CONCURRENCY)
+        timings = [timing for chunk in chunks for timing in chunk]
+
+    return summarize("wsgi", timings, time.perf_counter() - start)
+
+
+def run_async(url: str, requests: int) -> dict:
+    """ASGI serving, CONCURRENCY requests in flight on one event loop"""
+    client = AsyncClient()
+
+    async def fetch() -> float:
+        start = time.perf_counter()
+        await client.get(url)
+        return time.perf_counter() - start
+
+    async def main() -> list[float]:
+        timings = []
+        for _ in range(requests // CONCURRENCY):
+            timings += await asyncio.gather(*(fetch() for _ in range(CONCURRENCY)))
+        return timings
+
+    start = time.perf_counter()
+    timings = asyncio.run(main())
+
+    return summarize("asgi", timings, time.perf_counter() - start)
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    """
+    Throughput and p99 latency of the same endpoints served by sync
+    views from a thread pool and by async views from an event loop.
+    Every case sends `repeat` rounds of CONCURRENCY requests.
+    """
+    requests = repeat * CONCURRENCY
+    results = []
+
+    with override_settings(
+        ROOT_URLCONF=__name__,
+        ALLOWED_HOSTS=["testserver"],
+        API_RESPONSE_CACHE={"BACKEND": None},
+    ):
+        for size in sorted(sizes):
+            seed_movies(size)
+
+            for case, url in PATHS.items():
+                results.append(
+                    {
+                        "size": size,
+                        "case": case,
+                        "concurrency": CONCURRENCY,
+                        **run_sync(f"/sync/{url}", requests),
+                        **run_async(f"/async/{url}", requests),
+                    }
+                )
+
+    return results
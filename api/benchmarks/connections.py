@@ -0,0 +1,140 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from api.benchmarks.asgi import CONCURRENCY, summarize
+from api.benchmarks.seed import seed_catalog
+from api.models import Movie
+
+# Settings of the default database per mode, pooled needs PostgreSQL
+MODES = {
+    "per_request": {"CONN_MAX_AGE": 0},
+    "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True},
+    "pooled": {
+        "ENGINE": "api.backends.postgresql_pool",
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"pool": {"max_size": CONCURRENCY}},
+    },
+}
+
+
+def run_wsgi(path: str, requests: int) -> dict:
+    """
+    Full WSGI handler, unlike the test client it closes connections at the
+    end of every request as a real server does
+    """
+    handler = WSGIHandler()
+
+    def worker(count: int) -> list[float]:
+        timings = []
+        try:
+            for _ in range(count):
+                environ = RequestFactory().get(path).environ
+                start = time.perf_counter()
+                response = handler(environ, lambda status, headers: None)
+                b"".join(response)
+                response.close()
+                timings.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+        return timings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as executor:
+        chunks = executor.map(worker, [requests // CONCURRENCY] * CONCURRENCY)
+        timings = [timing for chunk in chunks for timing in chunk]
+
+    return summarize("wsgi", timings, time.perf_counter() - start)
+
+
+def run_asgi(path: str, requests: int) -> dict:
+    handler = ASGIHandler()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 0),
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    async def fetch() -> float:
+        start = time.perf_counter()
+        await handler(dict(scope), receive, send)
+        return time.perf_counter() - start
+
+    async def main() -> list[float]:
+        timings = []
+        for _ in range(requests // CONCURRENCY):
+            timings += await asyncio.gather(*(fetch() for _ in range(CONCURRENCY)))
+        return timings
+
+    start = time.perf_counter()
+    timings = asyncio.run(main())
+
+    return summarize("asgi", timings, time.perf_counter() - start)
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    """
+    Throughput and p99 latency of a tiny and a typical endpoint with a
+    new connection per request, per-thread persistent connections and,
+    on PostgreSQL, the shared pool of api.backends.postgresql_pool.
+    Connection setup only shows up against a real server, SQLite opens a
+    file.
+    """
+    requests = repeat * CONCURRENCY
+    database = connections.settings[DEFAULT_DB_ALIAS]
+    modes = [
+        mode for mode in MODES if mode != "pooled" or connection.vendor == "postgresql"
+    ]
+    results = []
+
+    with override_settings(
+        ALLOWED_HOSTS=["testserver"], API_RESPONSE_CACHE={"BACKEND": None}
+    ):
+        for size in sorted(sizes):
+            seed_catalog(size)
+            movie = Movie.objects.order_by("id").values_list("id", flat=True).first()
+            paths = {
+                "genres": reverse("api:genres_list"),
+                "detail": reverse("api:movie_detail", args=[movie]),
+            }
+
+            for mode in modes:
+                original = {name: database.get(name) for name in MODES[mode]}
+                database.update(MODES[mode])
+                try:
+                    for case, path in paths.items():
+                        results.append(
+                            {
+                                "size": size,
+                                "case": case,
+                                "mode": mode,
+                                "concurrency": CONCURRENCY,
+                                **run_wsgi(path, requests),
+                                **run_asgi(path, requests),
+                            }
+                        )
+                finally:
+                    database.update(original)
+
+    return results
@@ -0,0 +1,51 @@
+import json
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from api.benchmarks import measure
+from api.benchmarks.seed import seed_movies
+from api.encoding import ENCODERS
+from api.models import Movie
+from api.serializers import MOVIE_FIELDS, get_movie_dicts
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    """
+    Encode time of one page of movies, sizes are movies per page.
+    `django_encoder` is the JsonResponse path with Decimal ratings
+    left for DjangoJSONEncoder.default, the rest encode rows
+    pre-converted by api.serializers.
+    """
+    seed_movies(max(sizes))
+    results = []
+
+    for size in sorted(sizes):
+        rows = list(Movie.objects.values(*MOVIE_FIELDS)[:size])
+        page = {"pages": 1, "total": size, "results": get_movie_dicts(rows)}
+        raw_page = {
+            **page,
+            "results": [
+                {**movie, "imdb_rating": Decimal(movie["imdb_rating"])}
+                for movie in page["results"]
+            ],
+        }
+
+        cases = {
+            "django_encoder": lambda: json.dumps(
+                raw_page, cls=DjangoJSONEncoder
+            ).encode()
+        }
+        for name, path in ENCODERS.items():
+            try:
+                encode = import_string(path)
+                encode({})
+            except ImportError:
+                continue
+            cases[name] = lambda encode=encode: encode(page)
+
+        for case, encode_page in cases.items():
+            results.append({"size": size, "case": case, **measure(encode_page, repeat)})
+
+    return results
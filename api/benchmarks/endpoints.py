@@ -0,0 +1,80 @@
+import tracemalloc
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.benchmarks import measure
+from api.benchmarks.seed import seed_catalog
+from api.models import Genre, Movie, Person
+
+
+def get_cases() -> dict[str, str]:
+    movies = reverse("api:movies_list")
+    genre = Genre.objects.order_by("id").values_list("id", flat=True).first()
+    person = Person.objects.order_by("id").values_list("id", flat=True).first()
+    movie = Movie.objects.order_by("id").values_list("id", flat=True).first()
+
+    return {
+        "genres": reverse("api:genres_list"),
+        "list": movies,
+        "list_page_50": f"{movies}?page=50",
+        "cursor": f"{movies}?cursor=",
+        "cursor_total": f"{movies}?cursor=&with_total=1",
+        "filtered": f"{movies}?genres={genre}&rating_min=7&year_min=1990",
+        "star": f"{movies}?stars={person}",
+        "search": f"{movies}?q=silent ocean",
+        "detail": reverse("api:movie_detail", args=[movie]),
+    }
+
+
+def profile_request(client: Client, url: str) -> dict:
+    """Queries and peak Python memory of one request"""
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "bytes": len(response.content),
+        "queries": len(context.captured_queries),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    """
+    Latency percentiles, queries and memory per request of every api
+    endpoint at every dataset size. Response cache is off, so views
+    are measured, not cache hits.
+    """
+    results = []
+
+    with override_settings(
+        ALLOWED_HOSTS=["testserver"], API_RESPONSE_CACHE={"BACKEND": None}
+    ):
+        for size in sorted(sizes):
+            seed_catalog(size)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+
+            client = Client()
+            for case, url in get_cases().items():
+                # First request warms in-process caches
+                client.get(url)
+                results.append(
+                    {
+                        "size": size,
+                        "case": case,
+                        **profile_request(client, url),
+                        **measure(lambda: client.get(url), repeat),
+                    }
+                )
+
+    return results
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.db import connection
+from django.http import QueryDict
+
+from api.benchmarks import measure
+from api.benchmarks.seed import seed_movies, seed_relations
+from api.filters import MovieListFilters, get_movie_rows
+from api.models import Genre, Movie, Person
+
+CASES = {
+    "genre_any": "genres={genre}",
+    "genres_all": "genres={genre},{other_genre}&genres_match=all",
+    "year_range": "year_min=2001&year_max=2002",
+    "rating_top": "rating_min=9.8",
+    "mpa_duration": "mpa_rating=PG,PG-13&duration_min=170",
+    "director": "directors={person}",
+    "star": "stars={person}",
+    "combined": (
+        "genres={genre}&year_min=1990&rating_min=7&mpa_rating=R&stars={person}"
+    ),
+}
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    """Latency of one filtered page plus its count at every dataset size"""
+    page_size = settings.NUM_OF_INSTANCES_ON_PAGE
+    results = []
+
+    for size in sorted(sizes):
+        seed_movies(size)
+        seed_relations()
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        genre, other_genre = Genre.objects.order_by("id").values_list("id", flat=True)[
+            :2
+        ]
+        person = Person.objects.order_by("id").values_list("id", flat=True).first()
+
+        for case, query in CASES.items():
+            filters = MovieListFilters.from_query(
+                QueryDict(
+                    query.format(genre=genre, other_genre=other_genre, person=person)
+                )
+            )
+
+            def filtered_page():
+                movies = filters.filter_movies(Movie.objects.all())
+                list(get_movie_rows(movies, from_cards=False)[:page_size])
+                movies.count()
+
+            results.append(
+                {"size": size, "case": case, **measure(filtered_page, repeat)}
+            )
+
+    return results
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import connection
+
+from api.benchmarks import measure
+from api.benchmarks.seed import seed_movies
+from api.models import Movie
+from api.search import prefix_search, ranked_search
+from api.serializers import MOVIE_FIELDS
+
+CASES = {
+    "prefix": lambda: prefix_search(Movie.objects.all(), "Star Ni"),
+    "ranked": lambda: ranked_search(Movie.objects.all(), "silent ocean"),
+    "src_exclude": lambda: Movie.objects.exclude(
+        id__in=prefix_search(Movie.objects.all(), "Star").values("id")
+    ),
+}
+
+
+def run(sizes: list[int], repeat: int) -> list[dict]:
+    """Latency of one search page plus its count at every dataset size"""
+    page_size = settings.NUM_OF_INSTANCES_ON_PAGE
+    results = []
+
+    for size in sorted(sizes):
+        seed_movies(size)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE api_movie")
+
+        for case, build_query in CASES.items():
+
+            def search_page():
+                movies = build_query()
+                list(movies.values(*MOVIE_FIELDS)[:page_size])
+                movies.count()
+
+            results.append({"size": size, "case": case, **measure(search_page, repeat)})
+
+    return results
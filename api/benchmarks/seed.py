@@ -0,0 +1,156 @@
+import random
+from decimal import Decimal
+
+from api.facets import refresh_genre_counts
+from api.models import Genre, Movie, Person
+
+WORDS = (
+    "star",
+    "night",
+    "river",
+    "shadow",
+    "king",
+    "dream",
+    "storm",
+    "city",
+    "garden",
+    "ghost",
+    "winter",
+    "empire",
+    "fire",
+    "ocean",
+    "silent",
+    "last",
+    "broken",
+    "golden",
+    "wild",
+    "secret",
+    "return",
+    "journey",
+    "iron",
+    "heart",
+    "summer",
+    "black",
+    "crimson",
+    "lost",
+    "machine",
+    "moon",
+    "northern",
+    "road",
+)
+
+
+def make_title(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).title()
+
+
+def make_description(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))).capitalize()
+
+
+def seed_movies(total: int, batch_size: int = 5000, seed: int = 0) -> int:
+    """
+    Top up Movie table to total rows with deterministic data.
+    Rows of the same position are identical across runs with the same seed.
+    Returns the number of created movies.
+    """
+    existing = Movie.objects.count()
+
+    for start in range(existing, total, batch_size):
+        rng = random.Random(f"{seed}:{start}")
+        Movie.objects.bulk_create(
+            [
+                Movie(
+                    title=make_title(rng),
+                    description=make_description(rng),
+                    release_year=rng.randint(1950, 2023),
+                    mpa_rating=rng.choice(Movie.MPARating.values),
+                    imdb_rating=Decimal(rng.randint(10, 99)) / 10,
+                    duration=rng.randint(80, 180),
+                )
+                for _ in range(min(batch_size, total - start))
+            ],
+            batch_size=batch_size,
+        )
+
+    return max(total - existing, 0)
+
+
+# Relations per movie, (min, max) drawn uniformly
+FAN_OUT = {
+    "genres": (1, 3),
+    "directors": (1, 2),
+    "writers": (1, 3),
+    "stars": (3, 8),
+}
+PERSON_TYPES = tuple(Person.PersonStatus.values)
+
+
+def pick_popular(rng: random.Random, ids: list[int], count: int) -> set[int]:
+    """Distinct ids skewed towards the start of the list, like real casts"""
+    picked = set()
+    while len(picked) < min(count, len(ids)):
+        picked.add(ids[int(len(ids) * rng.random() ** 3)])
+    return picked
+
+
+def seed_relations(
+    genres: int = 20, persons: int = 5000, batch_size: int = 20000, seed: int = 0
+) -> int:
+    """
+    Link every movie without genres to genres and persons with FAN_OUT
+    relations each, drawn from `genres` genres and `persons` persons
+    created on demand. A few persons appear in many movies, most in few.
+    Returns the number of movies linked.
+    """
+    for index in range(Genre.objects.count(), genres):
+        Genre.objects.create(title=f"Genre {index}")
+    Person.objects.bulk_create(
+        [
+            Person(
+                first_name=f"First{index}",
+                last_name=f"Last{index}",
+                types=PERSON_TYPES[index % len(PERSON_TYPES)],
+            )
+            for index in range(Person.objects.count(), persons)
+        ],
+        batch_size=batch_size,
+    )
+    reference_ids = {
+        "genres": sorted(Genre.objects.values_list("id", flat=True))[:genres],
+        "persons": sorted(Person.objects.values_list("id", flat=True))[:persons],
+    }
+
+    movie_ids = (
+        Movie.objects.filter(genres__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    linked = 0
+    batch = list(movie_ids[:batch_size])
+    while batch:
+        # Seeded by position, like seed_movies, not by autoincrement ids
+        position = Movie.objects.filter(id__lt=batch[0]).count()
+        rng = random.Random(f"{seed}:{position}")
+        for relation, (low, high) in FAN_OUT.items():
+            through = getattr(Movie, relation).through
+            column = "genre_id" if relation == "genres" else "person_id"
+            ids = reference_ids["genres" if relation == "genres" else "persons"]
+            through.objects.bulk_create(
+                [
+                    through(movie_id=movie_id, **{column: pk})
+                    for movie_id in batch
+                    for pk in sorted(pick_popular(rng, ids, rng.randint(low, high)))
+                ]
+            )
+        linked += len(batch)
+        batch = list(movie_ids[:batch_size])
+
+    refresh_genre_counts()
+    return linked
+
+
+def seed_catalog(total: int, seed: int = 0) -> None:
+    """Deterministic catalog of total movies with genres and persons"""
+    seed_movies(total, seed=seed)
+    seed_relations(persons=max(total // 20, 100), seed=seed)
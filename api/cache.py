@@ -0,0 +1,394 @@
+import asyncio
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.signals import setting_changed
+from django.db.models import QuerySet
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from api.coalescing import FLIGHTS
+from api.routers import mark_catalog_written
+
+CATALOG_VERSION_KEY = "api:catalog:version"
+
+
+def get_catalog_version() -> int:
+    """Shared counter bumped on every catalog write"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+async def aget_catalog_version() -> int:
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, 1, None)
+        version = await cache.aget(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version() -> None:
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.add(CATALOG_VERSION_KEY, 2, None)
+    mark_catalog_written()
+
+
+class LocalResponseCache:
+    """In-process cache with TTL and LRU eviction above max_entries"""
+
+    def __init__(self, timeout: int, max_entries: int) -> None:
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    async def aget(self, key: str) -> Any:
+        return self.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def aset(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoResponseCache:
+    """Response cache stored in one of CACHES backends"""
+
+    def __init__(self, timeout: int, alias: str) -> None:
+        self.timeout = timeout
+        self.alias = alias
+
+    def get(self, key: str) -> Any:
+        return caches[self.alias].get(key)
+
+    async def aget(self, key: str) -> Any:
+        return await caches[self.alias].aget(key)
+
+    def set(self, key: str, value: Any) -> None:
+        caches[self.alias].set(key, value, self.timeout)
+
+    async def aset(self, key: str, value: Any) -> None:
+        await caches[self.alias].aset(key, value, self.timeout)
+
+    def clear(self) -> None:
+        caches[self.alias].clear()
+
+
+@functools.cache
+def get_response_cache() -> LocalResponseCache | DjangoResponseCache | None:
+    config = settings.API_RESPONSE_CACHE
+    backend = config.get("BACKEND")
+
+    if backend == "local":
+        return LocalResponseCache(config["TIMEOUT"], config["MAX_ENTRIES"])
+    if backend == "django":
+        return DjangoResponseCache(config["TIMEOUT"], config["CACHE_ALIAS"])
+
+    return None
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting: str, **kwargs) -> None:
+    if setting == "API_RESPONSE_CACHE":
+        get_response_cache.cache_clear()
+
+
+def clear_response_cache() -> None:
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        response_cache.clear()
+
+
+def get_response_cache_key(
+    request: HttpRequest,
+    view_name: str,
+    query_params: tuple[str, ...],
+    catalog_version: int,
+    **kwargs,
+) -> str:
+    # Raw values, views tell an empty parameter from a missing one and
+    # do not strip values, so neither may the key
+    query = [
+        (name, request.GET.getlist(name))
+        for name in query_params
+        if name in request.GET
+    ]
+
+    normalized = f"{sorted(kwargs.items())}{query}"
+    digest = hashlib.md5(normalized.encode()).hexdigest()
+
+    return f"api:response:{catalog_version}:{view_name}:{digest}"
+
+
+def is_response_cacheable(response: HttpResponse) -> bool:
+    return response.status_code == 200 and "no-store" not in response.get(
+        "Cache-Control", ""
+    )
+
+
+def get_cache_entry(response: HttpResponse) -> tuple[bytes, str] | None:
+    if not is_response_cacheable(response):
+        return None
+    return response.content, response["Content-Type"]
+
+
+def get_coalescing_timeout() -> float | None:
+    config = settings.API_COALESCE_REQUESTS
+    return config["TIMEOUT"] if config["ENABLED"] else None
+
+
+def cache_response(query_params: tuple[str, ...] = ()) -> Callable:
+    """
+    Cache GET responses of a sync or async view keyed on the catalog
+    version, view kwargs and raw values of given query parameters.
+    Concurrent misses of one key are coalesced, the first request renders
+    the response and the others reuse its content, see api.coalescing.
+    """
+
+    def decorator(view_func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(view_func):
+
+            @functools.wraps(view_func)
+            async def async_wrapper(
+                request: HttpRequest, *args, **kwargs
+            ) -> HttpResponse:
+                response_cache = get_response_cache()
+                timeout = get_coalescing_timeout()
+                if request.method != "GET" or (
+                    response_cache is None and timeout is None
+                ):
+                    return await view_func(request, *args, **kwargs)
+
+                key = get_response_cache_key(
+                    request,
+                    view_func.__name__,
+                    query_params,
+                    await aget_catalog_version(),
+                    **kwargs,
+                )
+                if response_cache is not None:
+                    cached = await response_cache.aget(key)
+                    if cached is not None:
+                        content, content_type = cached
+                        return HttpResponse(content, content_type=content_type)
+
+                async def render() -> tuple[HttpResponse, tuple | None]:
+                    response = await view_func(request, *args, **kwargs)
+                    entry = get_cache_entry(response)
+                    if entry is not None and response_cache is not None:
+                        await response_cache.aset(key, entry)
+                    return response, entry
+
+                if timeout is None:
+                    return (await render())[0]
+
+                (response, entry), rendered = await FLIGHTS.ado(key, render, timeout)
+                if rendered:
+                    return response
+                if entry is None:
+                    # Responses that are not cacheable are not shared either
+                    return await view_func(request, *args, **kwargs)
+                content, content_type = entry
+                return HttpResponse(content, content_type=content_type)
+
+            return async_wrapper
+
+        @functools.wraps(view_func)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            response_cache = get_response_cache()
+            timeout = get_coalescing_timeout()
+            if request.method != "GET" or (response_cache is None and timeout is None):
+                return view_func(request, *args, **kwargs)
+
+            key = get_response_cache_key(
+                request,
+                view_func.__name__,
+                query_params,
+                get_catalog_version(),
+                **kwargs,
+            )
+            if response_cache is not None:
+                cached = response_cache.get(key)
+                if cached is not None:
+                    content, content_type = cached
+                    return HttpResponse(content, content_type=content_type)
+
+            def render() -> tuple[HttpResponse, tuple | None]:
+                response = view_func(request, *args, **kwargs)
+                entry = get_cache_entry(response)
+                if entry is not None and response_cache is not None:
+                    response_cache.set(key, entry)
+                return response, entry
+
+            if timeout is None:
+                return render()[0]
+
+            (response, entry), rendered = FLIGHTS.do(key, render, timeout)
+            if rendered:
+                return response
+            if entry is None:
+                return view_func(request, *args, **kwargs)
+            content, content_type = entry
+            return HttpResponse(content, content_type=content_type)
+
+        return wrapper
+
+    return decorator
+
+
+def get_etag(
+    request: HttpRequest,
+    view_name: str,
+    query_params: tuple[str, ...],
+    catalog_version: int,
+    **kwargs,
+) -> str:
+    """ETag changes with the catalog version, so computing it costs no query"""
+    key = get_response_cache_key(
+        request, view_name, query_params, catalog_version, **kwargs
+    )
+    return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+
+def set_validators(
+    response: HttpResponse,
+    endpoint: str,
+    etag: str,
+    modified_at: datetime | None,
+) -> HttpResponse:
+    response["ETag"] = etag
+    if modified_at is not None:
+        response["Last-Modified"] = http_date(modified_at.timestamp())
+    cache_control = settings.API_CACHE_CONTROL.get(endpoint)
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
+
+
+def get_not_modified_response(
+    request: HttpRequest, endpoint: str, etag: str, modified_at: datetime | None
+) -> HttpResponse | None:
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=modified_at and int(modified_at.timestamp()),
+    )
+    if response is None:
+        return None
+
+    return set_validators(response, endpoint, etag, modified_at)
+
+
+def conditional_response(
+    endpoint: str,
+    query_params: tuple[str, ...] = (),
+    last_modified: Callable[..., QuerySet] | None = None,
+) -> Callable:
+    """
+    Answer conditional GET requests of a sync or async view with 304
+    before the view runs. ETag is derived like the response cache key,
+    `last_modified` gets view kwargs and returns a queryset of one
+    `updated_at` value. Cache-Control comes from API_CACHE_CONTROL[endpoint].
+    """
+
+    def decorator(view_func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(view_func):
+
+            @functools.wraps(view_func)
+            async def async_wrapper(
+                request: HttpRequest, *args, **kwargs
+            ) -> HttpResponse:
+                if request.method not in ("GET", "HEAD"):
+                    return await view_func(request, *args, **kwargs)
+
+                etag = get_etag(
+                    request,
+                    view_func.__name__,
+                    query_params,
+                    await aget_catalog_version(),
+                    **kwargs,
+                )
+                modified_at = None
+                if last_modified is not None:
+                    modified_at = await last_modified(**kwargs).afirst()
+
+                response = get_not_modified_response(
+                    request, endpoint, etag, modified_at
+                )
+                if response is not None:
+                    return response
+
+                response = await view_func(request, *args, **kwargs)
+                if is_response_cacheable(response):
+                    set_validators(response, endpoint, etag, modified_at)
+
+                return response
+
+            return async_wrapper
+
+        @functools.wraps(view_func)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            if request.method not in ("GET", "HEAD"):
+                return view_func(request, *args, **kwargs)
+
+            etag = get_etag(
+                request,
+                view_func.__name__,
+                query_params,
+                get_catalog_version(),
+                **kwargs,
+            )
+            modified_at = None
+            if last_modified is not None:
+                modified_at = last_modified(**kwargs).first()
+
+            response = get_not_modified_response(request, endpoint, etag, modified_at)
+            if response is not None:
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if is_response_cacheable(response):
+                set_validators(response, endpoint, etag, modified_at)
+
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable
+
+
+class Flight:
+    """One in-flight computation, awaited from threads and event loops"""
+
+    def __init__(self) -> None:
+        self.result = None
+        self.error = None
+        # False when the leader was interrupted, e.g. its task cancelled
+        self.completed = False
+        self._done = threading.Event()
+        self._waiters = []
+        self._lock = threading.Lock()
+
+    def finish(self, result: Any, error: BaseException | None) -> None:
+        with self._lock:
+            self.result = result
+            self.error = error if isinstance(error, Exception) else None
+            self.completed = error is None or self.error is not None
+            self._done.set()
+            waiters, self._waiters = self._waiters, []
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(resolve, future)
+
+    def wait(self, timeout: float) -> bool:
+        return self._done.wait(timeout)
+
+    async def await_done(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._done.is_set():
+                return True
+            self._waiters.append((loop, future))
+
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def get(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time. Callers arriving while it
+    runs wait for it and get its result, or its exception, instead of
+    computing again. Threads and async tasks share the same flights.
+    Waiting callers give up after timeout seconds and compute themselves.
+    """
+
+    def __init__(self) -> None:
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> tuple[Flight, bool]:
+        """Flight of key and whether the caller leads it"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def land(self, key: str, flight: Flight, result: Any, error) -> None:
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.finish(result, error)
+
+    def do(self, key: str, func: Callable[[], Any], timeout: float) -> tuple[Any, bool]:
+        """Result of func for key and whether it was computed by this call"""
+        flight, leader = self.join(key)
+        if not leader:
+            if flight.wait(timeout) and flight.completed:
+                return flight.get(), False
+            return func(), True
+
+        try:
+            result = func()
+        except BaseException as error:
+            self.land(key, flight, None, error)
+            raise
+        self.land(key, flight, result, None)
+        return result, True
+
+    async def ado(
+        self, key: str, func: Callable[[], Awaitable[Any]], timeout: float
+    ) -> tuple[Any, bool]:
+        flight, leader = self.join(key)
+        if not leader:
+            if await flight.await_done(timeout) and flight.completed:
+                return flight.get(), False
+            return await func(), True
+
+        try:
+            result = await func()
+        except BaseException as error:
+            self.land(key, flight, None, error)
+            raise
+        self.land(key, flight, result, None)
+        return result, True
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+
+# Flights of api views in this process, see api.cache.cache_response
+FLIGHTS = SingleFlight()
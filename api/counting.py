@@ -0,0 +1,83 @@
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import QuerySet
+
+from api.cache import aget_catalog_version, get_catalog_version
+from api.pagination import get_table_estimate
+
+
+def get_count_cache_key(movies: QuerySet, catalog_version: int) -> str:
+    sql, params = movies.query.sql_with_params()
+    signature = hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+    return f"api:movies:count:{catalog_version}:{signature}"
+
+
+def get_plan_estimate(queryset: QuerySet) -> int | None:
+    """Rows the PostgreSQL planner expects queryset to return, from EXPLAIN"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        (plan,) = cursor.fetchone()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(movies: QuerySet) -> int | None:
+    """
+    Planner estimate of the count, None below ESTIMATED_COUNT_THRESHOLD
+    where an exact count is cheap enough. Unfiltered sets take the table
+    statistics, filtered ones the row estimate of their plan.
+    """
+    if movies.query.has_filters():
+        estimate = get_plan_estimate(movies)
+    else:
+        estimate = get_table_estimate(movies.model, movies.db)
+
+    if estimate is None or estimate < settings.ESTIMATED_COUNT_THRESHOLD:
+        return None
+    return estimate
+
+
+def compute_count(movies: QuerySet) -> tuple[int, bool]:
+    estimate = estimate_count(movies)
+    if estimate is not None:
+        return estimate, True
+    return movies.count(), False
+
+
+def count_movies(movies: QuerySet) -> tuple[int, bool]:
+    """
+    Total of the filtered set and whether it is a planner estimate.
+    Computed once per filter signature and catalog version, and cached
+    for CURSOR_COUNT_CACHE_TIMEOUT.
+    """
+    key = get_count_cache_key(movies, get_catalog_version())
+
+    counted = cache.get(key)
+    if counted is None:
+        counted = compute_count(movies)
+        cache.set(key, counted, settings.CURSOR_COUNT_CACHE_TIMEOUT)
+
+    return counted
+
+
+async def acount_movies(movies: QuerySet) -> tuple[int, bool]:
+    key = get_count_cache_key(movies, await aget_catalog_version())
+
+    counted = await cache.aget(key)
+    if counted is None:
+        counted = await sync_to_async(compute_count)(movies)
+        await cache.aset(key, counted, settings.CURSOR_COUNT_CACHE_TIMEOUT)
+
+    return counted
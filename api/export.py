@@ -0,0 +1,37 @@
+from itertools import islice
+from typing import Iterator
+
+from django.db.models import QuerySet
+
+from api.models import MovieCard
+from api.read_model import encode_payload
+from api.serializers import MOVIE_FIELDS, get_movie_dicts
+
+EXPORT_ORDERING = ("updated_at", "id")
+
+
+def iter_movie_lines(movies: QuerySet, chunk_size: int) -> Iterator[str]:
+    """
+    NDJSON lines of movies in get_movie_dicts shape, read through a
+    server-side cursor with relations batch-loaded once per chunk.
+    """
+    rows = (
+        movies.order_by(*EXPORT_ORDERING)
+        .values(*MOVIE_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        for data in get_movie_dicts(chunk):
+            yield encode_payload(data) + "\n"
+
+
+def iter_card_lines(movies: QuerySet, chunk_size: int) -> Iterator[str]:
+    """Same lines as iter_movie_lines, read from ready movie cards"""
+    payloads = (
+        MovieCard.objects.filter(movie__in=movies.values("id"))
+        .order_by(*(f"movie__{field}" for field in EXPORT_ORDERING))
+        .values_list("payload", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+    for payload in payloads:
+        yield payload + "\n"
@@ -0,0 +1,98 @@
+from collections import Counter
+
+from django.db.models import Count, F, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.http import QueryDict
+
+from api.filters import InvalidFilter, parse_values
+from api.models import Genre, Movie
+from api.references import GENRES
+
+FACETS = ("genres", "mpa_rating")
+
+
+def parse_facets(params: QueryDict) -> tuple[str, ...]:
+    facets = parse_values(params, "facets")
+    if not set(facets) <= set(FACETS):
+        raise InvalidFilter("facets__invalid")
+    return facets
+
+
+def refresh_genre_counts() -> int:
+    """
+    Recount Genre.movie_count of every genre in one statement, needed
+    after bulk writes to the through table that send no signals.
+    """
+    counts = (
+        Movie.genres.through.objects.filter(genre_id=OuterRef("id"))
+        .values("genre_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return Genre.objects.update(movie_count=Coalesce(Subquery(counts), 0))
+
+
+def adjust_genre_counts(changes: Counter, sign: int) -> None:
+    """Add (sign=1) or subtract (sign=-1) per genre numbers of movies"""
+    by_amount = {}
+    for genre_id, amount in changes.items():
+        by_amount.setdefault(amount, []).append(genre_id)
+
+    for amount, genre_ids in by_amount.items():
+        Genre.objects.filter(id__in=genre_ids).update(
+            movie_count=Greatest(F("movie_count") + sign * amount, 0)
+        )
+
+
+def get_genre_facet(movies: QuerySet) -> list[dict]:
+    """
+    Number of filtered movies per genre, most common first. Without
+    filters counts are read from Genre.movie_count, otherwise from one
+    GROUP BY over the through table.
+    """
+    if not movies.query.has_filters():
+        counts = Genre.objects.filter(movie_count__gt=0).values_list(
+            "id", "movie_count"
+        )
+    else:
+        counts = (
+            Movie.genres.through.objects.filter(movie_id__in=movies.values("id"))
+            .values("genre_id")
+            .annotate(count=Count("id"))
+            .values_list("genre_id", "count")
+            .order_by()
+        )
+
+    counts = dict(counts)
+    genres = GENRES.get_many(counts)
+    return [
+        {"id": genre_id, "title": genres[genre_id][1], "count": count}
+        for genre_id, count in sorted(
+            counts.items(), key=lambda item: (-item[1], item[0])
+        )
+        if genres[genre_id] is not None
+    ]
+
+
+def get_mpa_rating_facet(movies: QuerySet) -> dict[str, int]:
+    """Number of filtered movies per MPA rating, from one GROUP BY"""
+    if movies.query.has_filters():
+        movies = Movie.objects.filter(id__in=movies.values("id"))
+
+    counts = dict(
+        movies.order_by()
+        .values("mpa_rating")
+        .annotate(count=Count("id"))
+        .values_list("mpa_rating", "count")
+    )
+    return {rating: counts.get(rating, 0) for rating in Movie.MPARating.values}
+
+
+FACET_GETTERS = {
+    "genres": get_genre_facet,
+    "mpa_rating": get_mpa_rating_facet,
+}
+
+
+def get_facets(movies: QuerySet, facets: tuple[str, ...]) -> dict:
+    return {facet: FACET_GETTERS[facet](movies) for facet in facets}
@@ -0,0 +1,36 @@
+from django.http import QueryDict
+
+from api.filters import InvalidFilter, parse_values
+from api.serializers import CARD_FIELDS, MOVIE_OUTPUT_FIELDS
+
+VIEW_FULL = "full"
+VIEW_CARD = "card"
+VIEWS = {
+    VIEW_FULL: MOVIE_OUTPUT_FIELDS,
+    VIEW_CARD: CARD_FIELDS,
+}
+
+
+def parse_field_names(params: QueryDict, name: str) -> set[str]:
+    names = set(parse_values(params, name))
+    if not names <= set(MOVIE_OUTPUT_FIELDS):
+        raise InvalidFilter(f"{name}__invalid")
+    return names
+
+
+def parse_fieldset(params: QueryDict, default_view: str) -> tuple[str, ...]:
+    """
+    Payload fields of movies in output order. `view` picks the full or
+    card representation, `fields` replaces it with listed fields and
+    `include` adds listed fields to either. `id` is always included.
+    """
+    view = params.get("view", "").strip() or default_view
+    if view not in VIEWS:
+        raise InvalidFilter("view__invalid")
+
+    fields = parse_field_names(params, "fields") or set(VIEWS[view])
+    fields |= parse_field_names(params, "include")
+
+    return tuple(
+        field for field in MOVIE_OUTPUT_FIELDS if field == "id" or field in fields
+    )
@@ -0,0 +1,101 @@
+from django.db.models import CharField, Count, F, OuterRef, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import QueryDict
+
+from api.filters import InvalidFilter
+from api.models import Movie, Person
+
+# Roles of persons in responses with the movie relations behind them
+ROLES = {
+    "director": "directors",
+    "writer": "writers",
+    "star": "stars",
+}
+PERSON_FIELDS = ("id", "first_name", "last_name", "types")
+
+
+def get_role_through(role: str) -> type:
+    return getattr(Movie, ROLES[role]).through
+
+
+def parse_roles(params: QueryDict) -> tuple[str, ...]:
+    role = params.get("role", "").strip()
+    if not role:
+        return tuple(ROLES)
+    if role not in ROLES:
+        raise InvalidFilter("role__invalid")
+    return (role,)
+
+
+def filter_persons(persons: QuerySet, params: QueryDict) -> QuerySet:
+    types = params.get("types", "").strip()
+    if not types:
+        return persons
+    if types not in Person.PersonStatus.values:
+        raise InvalidFilter("types__invalid")
+    return persons.filter(types=types)
+
+
+def get_person_rows(persons: QuerySet) -> QuerySet:
+    """
+    Persons newest first with their number of movies per role, counted
+    by correlated subqueries over the through tables' reverse indexes
+    """
+    counts = {
+        f"{role}_count": Coalesce(
+            Subquery(
+                get_role_through(role)
+                .objects.filter(person_id=OuterRef("id"))
+                .values("person_id")
+                .annotate(count=Count("id"))
+                .values("count")
+            ),
+            0,
+        )
+        for role in ROLES
+    }
+    return (
+        persons.annotate(**counts)
+        .order_by("-created_at", "-id")
+        .values(*PERSON_FIELDS, *counts)
+    )
+
+
+def get_person_dicts(rows: list[dict]) -> list[dict]:
+    return [
+        {
+            **{field: row[field] for field in PERSON_FIELDS},
+            "movie_counts": {role: row[f"{role}_count"] for role in ROLES},
+        }
+        for row in rows
+    ]
+
+
+def get_credit_rows(person_id: int, roles: tuple[str, ...]) -> QuerySet:
+    """
+    (movie_id, role, created_at) credits of a person in given roles,
+    newest movies first, from one UNION ALL over the through tables
+    """
+    first, *rest = [
+        get_role_through(role)
+        .objects.filter(person_id=person_id)
+        .annotate(
+            role=Value(role, output_field=CharField()),
+            created_at=F("movie__created_at"),
+        )
+        .values("movie_id", "role", "created_at")
+        for role in roles
+    ]
+    credits = first.union(*rest, all=True) if rest else first
+    return credits.order_by("-created_at", "-movie_id", "role")
+
+
+def group_credits(
+    credits: list[dict], movies: list[dict], roles: tuple[str, ...]
+) -> dict[str, list[dict]]:
+    """Movie payloads of credits under their role, in credits order"""
+    movies = {movie["id"]: movie for movie in movies}
+    grouped = {role: [] for role in roles}
+    for credit in credits:
+        grouped[credit["role"]].append(movies[credit["movie_id"]])
+    return grouped
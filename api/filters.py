@@ -0,0 +1,274 @@
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db.models import Count, QuerySet
+from django.http import QueryDict
+
+from api.models import Movie, MovieCard
+from api.search import (
+    SEARCH_MODE_FULL,
+    SEARCH_MODE_PREFIX,
+    prefix_search,
+    ranked_search,
+)
+from api.serializers import MOVIE_OUTPUT_FIELDS, get_movie_columns
+
+INTEGER_PATTERN = re.compile(r"^[0-9]+$")
+RATING_PATTERN = re.compile(r"^[0-9](\.[0-9]{1,2})?$|^10(\.0{1,2})?$")
+SEARCH_PHRASE_PATTERN = re.compile(r"^[A-Za-z0-9 !?:;,.]{2,20}$")
+
+MATCH_ANY = "any"
+MATCH_ALL = "all"
+MAX_FILTER_VALUES = 50
+
+# Query parameters shaping movie payloads, see api.fieldsets
+FIELDSET_PARAMS = ("view", "fields", "include")
+# Query parameters of movie list, response cache and ETag depend on them
+MOVIE_LIST_PARAMS = (
+    "genre_id",
+    "src",
+    "q",
+    "search_mode",
+    "genres",
+    "genres_match",
+    "year_min",
+    "year_max",
+    "rating_min",
+    "rating_max",
+    "mpa_rating",
+    "duration_min",
+    "duration_max",
+    "directors",
+    "stars",
+    "page",
+    "cursor",
+    "with_total",
+    "facets",
+    *FIELDSET_PARAMS,
+)
+GENRE_LIST_PARAMS = ("with_counts",)
+RELATED_LIST_PARAMS = ("limit", *FIELDSET_PARAMS)
+PERSON_LIST_PARAMS = ("page", "types")
+PERSON_DETAIL_PARAMS = ("page", "role")
+
+
+class InvalidFilter(ValueError):
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.code = code
+
+
+def parse_genre_id(genre_ids: str) -> int | None:
+    """First id of comma separated genre ids, None when it is not an integer"""
+    genre_id = genre_ids.split(",")[0]
+
+    if not INTEGER_PATTERN.match(genre_id):
+        return None
+
+    return int(genre_id)
+
+
+def verify_search_phrase(search_phrase: str) -> bool:
+    if SEARCH_PHRASE_PATTERN.match(search_phrase):
+        return True
+
+    return False
+
+
+def parse_values(params: QueryDict, name: str) -> tuple[str, ...]:
+    """Distinct comma separated values of a parameter in given order"""
+    values = tuple(
+        dict.fromkeys(
+            value.strip() for value in params.get(name, "").split(",") if value.strip()
+        )
+    )
+    if len(values) > MAX_FILTER_VALUES:
+        raise InvalidFilter(f"{name}__invalid")
+    return values
+
+
+def parse_ids(params: QueryDict, name: str) -> tuple[int, ...]:
+    ids = parse_values(params, name)
+    if not all(INTEGER_PATTERN.match(pk) for pk in ids):
+        raise InvalidFilter(f"{name}__invalid")
+    return tuple(int(pk) for pk in ids)
+
+
+def parse_integer(params: QueryDict, name: str) -> int | None:
+    value = params.get(name, "").strip()
+    if not value:
+        return None
+    if not INTEGER_PATTERN.match(value):
+        raise InvalidFilter(f"{name}__invalid")
+    return int(value)
+
+
+def parse_rating(params: QueryDict, name: str) -> Decimal | None:
+    value = params.get(name, "").strip()
+    if not value:
+        return None
+    if not RATING_PATTERN.match(value):
+        raise InvalidFilter(f"{name}__invalid")
+    return Decimal(value)
+
+
+def movies_with_any(relation: str, ids: tuple[int, ...]) -> QuerySet:
+    """Ids of movies related to any of ids, read from the through table"""
+    through = getattr(Movie, relation).through
+    column = "genre_id" if relation == "genres" else "person_id"
+    return through.objects.filter(**{f"{column}__in": ids}).values("movie_id")
+
+
+def movies_with_all(relation: str, ids: tuple[int, ...]) -> QuerySet:
+    """Ids of movies related to every one of ids"""
+    return (
+        movies_with_any(relation, ids)
+        .annotate(matched=Count("id"))
+        .filter(matched=len(ids))
+        .values("movie_id")
+    )
+
+
+@dataclass(frozen=True)
+class MovieListFilters:
+    """
+    Parsed filters of movie list, validation does not touch the database.
+    `genre_id` and `src` keep their original excluding semantics, the
+    rest narrow the list down. Id lists match by `any` of the ids, genres
+    can match by `all` with `genres_match=all`. Everything compiles into
+    subqueries of one statement, unknown ids simply match nothing.
+    """
+
+    genre_id: int | None = None
+    search_phrase: str | None = None
+    query: str | None = None
+    search_mode: str = SEARCH_MODE_FULL
+    genres: tuple[int, ...] = ()
+    genres_match: str = MATCH_ANY
+    year_min: int | None = None
+    year_max: int | None = None
+    rating_min: Decimal | None = None
+    rating_max: Decimal | None = None
+    mpa_ratings: tuple[str, ...] = ()
+    duration_min: int | None = None
+    duration_max: int | None = None
+    directors: tuple[int, ...] = ()
+    stars: tuple[int, ...] = ()
+
+    @classmethod
+    def from_query(cls, params: QueryDict) -> "MovieListFilters":
+        genre_id = params.get("genre_id", None)
+        search_phrase = params.get("src", None)
+        query = params.get("q", None)
+        search_mode = params.get("search_mode", SEARCH_MODE_FULL)
+        genres_match = params.get("genres_match", MATCH_ANY)
+
+        if genre_id:
+            genre_id = parse_genre_id(genre_id)
+            if not genre_id:
+                raise InvalidFilter("genre__invalid")
+
+        if search_phrase and not verify_search_phrase(search_phrase):
+            raise InvalidFilter("src__invalid")
+
+        if query:
+            if not verify_search_phrase(query):
+                raise InvalidFilter("q__invalid")
+            if search_mode not in (SEARCH_MODE_FULL, SEARCH_MODE_PREFIX):
+                raise InvalidFilter("search_mode__invalid")
+
+        if genres_match not in (MATCH_ANY, MATCH_ALL):
+            raise InvalidFilter("genres_match__invalid")
+
+        mpa_ratings = parse_values(params, "mpa_rating")
+        if not set(mpa_ratings) <= set(Movie.MPARating.values):
+            raise InvalidFilter("mpa_rating__invalid")
+
+        return cls(
+            genre_id=genre_id or None,
+            search_phrase=search_phrase or None,
+            query=query or None,
+            search_mode=search_mode,
+            genres=parse_ids(params, "genres"),
+            genres_match=genres_match,
+            year_min=parse_integer(params, "year_min"),
+            year_max=parse_integer(params, "year_max"),
+            rating_min=parse_rating(params, "rating_min"),
+            rating_max=parse_rating(params, "rating_max"),
+            mpa_ratings=mpa_ratings,
+            duration_min=parse_integer(params, "duration_min"),
+            duration_max=parse_integer(params, "duration_max"),
+            directors=parse_ids(params, "directors"),
+            stars=parse_ids(params, "stars"),
+        )
+
+    @property
+    def is_ranked(self) -> bool:
+        return bool(self.query) and self.search_mode == SEARCH_MODE_FULL
+
+    def get_lookups(self) -> dict:
+        lookups = {
+            "release_year__gte": self.year_min,
+            "release_year__lte": self.year_max,
+            "imdb_rating__gte": self.rating_min,
+            "imdb_rating__lte": self.rating_max,
+            "duration__gte": self.duration_min,
+            "duration__lte": self.duration_max,
+        }
+        lookups = {
+            lookup: value for lookup, value in lookups.items() if value is not None
+        }
+        if self.mpa_ratings:
+            lookups["mpa_rating__in"] = self.mpa_ratings
+
+        return lookups
+
+    def filter_movies(self, movies: QuerySet) -> QuerySet:
+        if self.genre_id:
+            movies = movies.exclude(genres__id=self.genre_id)
+
+        if self.search_phrase:
+            movies = movies.exclude(
+                id__in=prefix_search(Movie.objects.all(), self.search_phrase).values(
+                    "id"
+                )
+            )
+
+        movies = movies.filter(**self.get_lookups())
+
+        if self.genres:
+            if self.genres_match == MATCH_ALL and len(self.genres) > 1:
+                movies = movies.filter(id__in=movies_with_all("genres", self.genres))
+            else:
+                movies = movies.filter(id__in=movies_with_any("genres", self.genres))
+
+        for relation in ("directors", "stars"):
+            ids = getattr(self, relation)
+            if ids:
+                movies = movies.filter(id__in=movies_with_any(relation, ids))
+
+        if self.query:
+            if self.search_mode == SEARCH_MODE_PREFIX:
+                movies = prefix_search(movies, self.query)
+            else:
+                movies = ranked_search(movies, self.query)
+
+        return movies
+
+
+def get_movie_rows(
+    movies: QuerySet, from_cards: bool, fields: tuple[str, ...] = MOVIE_OUTPUT_FIELDS
+) -> QuerySet:
+    """
+    Page rows of filtered movies, either values of the columns given
+    payload fields need or ready payloads of movie cards. Both carry
+    `created_at` for cursors.
+    """
+    if from_cards:
+        cards = MovieCard.objects.all()
+        if movies.query.has_filters():
+            cards = cards.filter(movie__in=movies.values("id"))
+        return cards.values("payload", "created_at", "movie_id")
+
+    return movies.values(*get_movie_columns(fields), "created_at")
@@ -0,0 +1,139 @@
+import functools
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from api.cache import bump_catalog_version
+from api.models import Movie
+from api.read_model import refresh_movie_cards
+from api.utils import DERIVATIVE_FORMAT, get_derivative_path
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FIELDS = ("poster", "bg_picture")
+
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def get_content_hash(file) -> str:
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def encode_derivative(image: Image.Image) -> bytes:
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    buffer = io.BytesIO()
+    image.save(
+        buffer, DERIVATIVE_FORMAT, quality=settings.IMAGE_DERIVATIVE_QUALITY, method=4
+    )
+    return buffer.getvalue()
+
+
+def generate_derivatives(file) -> str:
+    """
+    Resize an image to every IMAGE_DERIVATIVES box, never upscaling.
+    Derivatives are stored under the content hash of the original,
+    so identical uploads share them and are only generated once.
+    Returns the content hash.
+    """
+    content_hash = get_content_hash(file)
+    missing = {
+        name: size
+        for name, size in settings.IMAGE_DERIVATIVES.items()
+        if not default_storage.exists(get_derivative_path(content_hash, name))
+    }
+    if not missing:
+        return content_hash
+
+    with Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        # Largest box first, every next one is resized from the previous
+        for name, size in sorted(
+            missing.items(), key=lambda item: item[1], reverse=True
+        ):
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+            path = get_derivative_path(content_hash, name)
+            saved = default_storage.save(path, ContentFile(encode_derivative(image)))
+            if saved != path:
+                # Another worker stored the same derivative meanwhile
+                default_storage.delete(saved)
+
+    return content_hash
+
+
+def process_movie_image(movie_id: int, field: str) -> str | None:
+    """
+    Generate derivatives of one image of a movie and store its hash.
+    Nothing is stored when the image was replaced in the meantime.
+    """
+    name = Movie.objects.filter(id=movie_id).values_list(field, flat=True).first()
+    if not name:
+        return None
+
+    with default_storage.open(name, "rb") as file:
+        content_hash = generate_derivatives(file)
+
+    updated = Movie.objects.filter(id=movie_id, **{field: name}).update(
+        **{f"{field}_hash": content_hash, "updated_at": timezone.now()}
+    )
+    if updated:
+        refresh_movie_cards([movie_id])
+        bump_catalog_version()
+
+    return content_hash
+
+
+@functools.cache
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.IMAGE_DERIVATIVE_WORKERS,
+        thread_name_prefix="image-derivatives",
+    )
+
+
+def run_job(movie_id: int, field: str) -> None:
+    # Image replaced while this job runs gets queued again
+    with _pending_lock:
+        _pending.discard((movie_id, field))
+
+    close_old_connections()
+    try:
+        process_movie_image(movie_id, field)
+    except Exception:
+        logger.exception("Derivatives of %s of movie %s failed", field, movie_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_movie_image(movie_id: int, field: str) -> Future | None:
+    """
+    Queue derivative generation off the request path. A job already
+    queued for the same image is not repeated. With
+    IMAGE_DERIVATIVE_WORKERS = 0 the job runs right away instead.
+    """
+    if not settings.IMAGE_DERIVATIVE_WORKERS:
+        process_movie_image(movie_id, field)
+        return None
+
+    with _pending_lock:
+        if (movie_id, field) in _pending:
+            return None
+        _pending.add((movie_id, field))
+
+    return get_executor().submit(run_job, movie_id, field)
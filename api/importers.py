@@ -0,0 +1,234 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Iterable, Iterator, TextIO
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.facets import refresh_genre_counts
+from api.models import Genre, Movie, Person
+from api.read_model import refresh_movie_cards
+from api.references import invalidate_references
+from api.signals import invalidate_catalog
+
+MOVIE_COLUMNS = (
+    "title",
+    "description",
+    "release_year",
+    "mpa_rating",
+    "imdb_rating",
+    "duration",
+)
+PERSON_ROLES = {
+    "directors": Person.PersonStatus.DIRECTOR,
+    "writers": Person.PersonStatus.WRITER,
+    "stars": Person.PersonStatus.ACTOR,
+}
+CSV_LIST_SEPARATOR = "|"
+
+
+class CatalogImportError(ValueError):
+    def __init__(self, line: int, message: str) -> None:
+        super().__init__(f"line {line}: {message}")
+
+
+def read_jsonl(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            yield line, json.loads(text)
+        except ValueError as error:
+            raise CatalogImportError(line, str(error))
+
+
+def read_csv(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    """Relation columns hold names separated with `|`"""
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        for relation in ("genres", *PERSON_ROLES):
+            value = row.get(relation) or ""
+            row[relation] = [
+                name.strip() for name in value.split(CSV_LIST_SEPARATOR) if name.strip()
+            ]
+        yield line, row
+
+
+def parse_person(value: str | dict) -> tuple[str, str]:
+    if isinstance(value, dict):
+        return value.get("first_name", ""), value.get("last_name", "")
+
+    first_name, _, last_name = value.strip().partition(" ")
+    return first_name, last_name.strip()
+
+
+def parse_movie(line: int, record: dict) -> dict:
+    try:
+        movie = {
+            "title": str(record["title"]),
+            "description": str(record.get("description", "")),
+            "release_year": int(record["release_year"]),
+            "mpa_rating": str(record["mpa_rating"]),
+            "imdb_rating": Decimal(str(record["imdb_rating"])),
+            "duration": int(record["duration"]),
+            "genres": [str(title) for title in record.get("genres", [])],
+        }
+        for relation in PERSON_ROLES:
+            movie[relation] = [
+                parse_person(person) for person in record.get(relation, [])
+            ]
+    except KeyError as error:
+        raise CatalogImportError(line, f"missing {error}")
+    except (TypeError, ValueError, InvalidOperation, AttributeError) as error:
+        raise CatalogImportError(line, str(error))
+
+    for column in ("title", "description"):
+        max_length = Movie._meta.get_field(column).max_length
+        if len(movie[column]) > max_length:
+            raise CatalogImportError(line, f"{column} is longer than {max_length}")
+
+    if movie["mpa_rating"] not in Movie.MPARating.values:
+        raise CatalogImportError(line, f"unknown mpa_rating {movie['mpa_rating']!r}")
+
+    return movie
+
+
+class CatalogImporter:
+    """
+    Loads movies in batches with bulk_create/bulk_update.
+    Movies are upserted on (title, release_year), genres on title and
+    persons on (first_name, last_name, types) through in-memory lookups.
+    """
+
+    def __init__(self, batch_size: int = 1000) -> None:
+        self.batch_size = batch_size
+        self.genres = {
+            title: pk for pk, title in Genre.objects.values_list("id", "title")
+        }
+        self.persons = {
+            (first_name, last_name, types): pk
+            for pk, first_name, last_name, types in Person.objects.values_list(
+                "id", "first_name", "last_name", "types"
+            )
+        }
+        self.created = 0
+        self.updated = 0
+
+    def run(self, records: Iterable[tuple[int, dict]]) -> int:
+        records = iter(records)
+        while batch := list(islice(records, self.batch_size)):
+            self.import_batch([parse_movie(line, record) for line, record in batch])
+
+        # Relations, genres and persons are bulk written without signals
+        refresh_genre_counts()
+        invalidate_catalog()
+        invalidate_references()
+        return self.created + self.updated
+
+    def resolve_genres(self, movies: list[dict]) -> None:
+        missing = {
+            title
+            for movie in movies
+            for title in movie["genres"]
+            if title not in self.genres
+        }
+        for genre in Genre.objects.bulk_create(
+            [Genre(title=title) for title in missing]
+        ):
+            self.genres[genre.title] = genre.id
+
+    def resolve_persons(self, movies: list[dict]) -> None:
+        missing = {
+            (first_name, last_name, types)
+            for movie in movies
+            for relation, types in PERSON_ROLES.items()
+            for first_name, last_name in movie[relation]
+            if (first_name, last_name, types) not in self.persons
+        }
+        for person in Person.objects.bulk_create(
+            [
+                Person(first_name=first_name, last_name=last_name, types=types)
+                for first_name, last_name, types in missing
+            ]
+        ):
+            self.persons[person.first_name, person.last_name, person.types] = person.id
+
+    def save_movies(self, movies: list[dict]) -> list[int]:
+        """Upsert movie rows, returns their ids in the same order"""
+        existing = {
+            (title, release_year): pk
+            for pk, title, release_year in Movie.objects.filter(
+                title__in={movie["title"] for movie in movies},
+                release_year__in={movie["release_year"] for movie in movies},
+            ).values_list("id", "title", "release_year")
+        }
+
+        now = timezone.now()
+        instances = [
+            Movie(
+                id=existing.get((movie["title"], movie["release_year"])),
+                updated_at=now,
+                **{column: movie[column] for column in MOVIE_COLUMNS},
+            )
+            for movie in movies
+        ]
+        to_create = [instance for instance in instances if instance.id is None]
+        to_update = [instance for instance in instances if instance.id is not None]
+
+        Movie.objects.bulk_create(to_create)
+        # Upsert on primary key, it is far cheaper than bulk_update CASE chains
+        Movie.objects.bulk_create(
+            to_update,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[*MOVIE_COLUMNS, "updated_at"],
+        )
+
+        self.created += len(to_create)
+        self.updated += len(to_update)
+
+        return [instance.id for instance in instances]
+
+    def save_relations(self, movies: list[dict], movie_ids: list[int]) -> None:
+        unique_ids = set(movie_ids)
+
+        through = Movie.genres.through
+        through.objects.filter(movie_id__in=unique_ids).delete()
+        through.objects.bulk_create(
+            [
+                through(movie_id=movie_id, genre_id=self.genres[title])
+                for movie, movie_id in zip(movies, movie_ids)
+                for title in movie["genres"]
+            ],
+            ignore_conflicts=True,
+        )
+
+        for relation, types in PERSON_ROLES.items():
+            through = getattr(Movie, relation).through
+            through.objects.filter(movie_id__in=unique_ids).delete()
+            through.objects.bulk_create(
+                [
+                    through(
+                        movie_id=movie_id,
+                        person_id=self.persons[first_name, last_name, types],
+                    )
+                    for movie, movie_id in zip(movies, movie_ids)
+                    for first_name, last_name in movie[relation]
+                ],
+                ignore_conflicts=True,
+            )
+
+    @transaction.atomic
+    def import_batch(self, movies: list[dict]) -> None:
+        # The last record wins when a movie repeats inside one batch
+        movies = list(
+            {
+                (movie["title"], movie["release_year"]): movie for movie in movies
+            }.values()
+        )
+        self.resolve_genres(movies)
+        self.resolve_persons(movies)
+        movie_ids = self.save_movies(movies)
+        self.save_relations(movies, movie_ids)
+        refresh_movie_cards(movie_ids)
@@ -0,0 +1,237 @@
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestMetrics:
+    started_at: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_ms: float = 0.0
+    serialize_ms: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def get_repeated_queries(self, threshold: int) -> dict[str, int]:
+        """Statements run at least threshold times, usually an N+1 loop"""
+        return {
+            sql: count for sql, count in self.statements.items() if count >= threshold
+        }
+
+
+_current = ContextVar("api_request_metrics", default=None)
+
+
+def record_query(execute: Callable, sql: str, params, many: bool, context: dict):
+    """connection.execute_wrapper hook, free when no request is sampled"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_ms += (time.perf_counter() - start) * 1000
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_on_open_connections() -> None:
+    # Connections opened before the middleware was loaded
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+
+@contextlib.contextmanager
+def measure_serialization() -> Iterator[None]:
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_ms += (time.perf_counter() - start) * 1000
+
+
+class MetricsRegistry:
+    """Per-view totals of instrumented requests of this process"""
+
+    FIELDS = ("queries", "db_ms", "serialize_ms", "total_ms", "bytes")
+
+    def __init__(self) -> None:
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def add(self, view_name: str, sample: dict) -> None:
+        with self._lock:
+            totals = self._views.setdefault(
+                view_name,
+                {"requests": 0, "repeated_queries": 0, "max_total_ms": 0.0}
+                | dict.fromkeys(self.FIELDS, 0),
+            )
+            totals["requests"] += 1
+            totals["repeated_queries"] += bool(sample["repeated_queries"])
+            totals["max_total_ms"] = max(totals["max_total_ms"], sample["total_ms"])
+            for name in self.FIELDS:
+                totals[name] += sample.get(name) or 0
+
+    def snapshot(self) -> dict[str, dict]:
+        """Averages per request, besides request counts and max_total_ms"""
+        with self._lock:
+            return {
+                view_name: {
+                    "requests": totals["requests"],
+                    "repeated_queries": totals["repeated_queries"],
+                    "max_total_ms": round(totals["max_total_ms"], 3),
+                    **{
+                        f"avg_{name}": round(totals[name] / totals["requests"], 3)
+                        for name in self.FIELDS
+                    },
+                }
+                for view_name, totals in self._views.items()
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views.clear()
+
+
+REGISTRY = MetricsRegistry()
+
+
+def get_server_timing(sample: dict) -> str:
+    app_ms = max(sample["total_ms"] - sample["db_ms"] - sample["serialize_ms"], 0)
+    return ", ".join(
+        [
+            f'db;dur={sample["db_ms"]:.2f};desc="{sample["queries"]} queries"',
+            f'serialize;dur={sample["serialize_ms"]:.2f}',
+            f"app;dur={app_ms:.2f}",
+            f'total;dur={sample["total_ms"]:.2f}',
+        ]
+    )
+
+
+def finish(request: HttpRequest, response: HttpResponse, metrics: RequestMetrics):
+    config = settings.API_INSTRUMENTATION
+    resolver_match = request.resolver_match
+    view_name = resolver_match.view_name if resolver_match else "unresolved"
+    sample = {
+        "queries": metrics.queries,
+        "db_ms": round(metrics.db_ms, 3),
+        "serialize_ms": round(metrics.serialize_ms, 3),
+        "total_ms": round((time.perf_counter() - metrics.started_at) * 1000, 3),
+        # Unknown for streamed responses
+        "bytes": None if response.streaming else len(response.content),
+        "repeated_queries": metrics.get_repeated_queries(
+            config["REPEATED_QUERY_THRESHOLD"]
+        ),
+    }
+    REGISTRY.add(view_name, sample)
+
+    if config["SERVER_TIMING"]:
+        response["Server-Timing"] = get_server_timing(sample)
+
+    if sample["repeated_queries"]:
+        logger.warning(
+            "%s ran repeated queries: %s",
+            view_name,
+            "; ".join(
+                f"{count}x {sql[:200]}"
+                for sql, count in sample["repeated_queries"].items()
+            ),
+        )
+    if config["LOG"]:
+        logger.info(
+            "%s %s %s queries=%s db=%sms serialize=%sms total=%sms bytes=%s",
+            request.method,
+            request.path,
+            response.status_code,
+            sample["queries"],
+            sample["db_ms"],
+            sample["serialize_ms"],
+            sample["total_ms"],
+            sample["bytes"],
+            extra={"view_name": view_name, "metrics": sample},
+        )
+
+
+def is_sampled() -> bool:
+    rate = settings.API_INSTRUMENTATION["SAMPLE_RATE"]
+    return rate >= 1 or random.random() < rate
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response: Callable) -> Callable:
+    """
+    Record queries, DB time, JSON encoding time and payload size of a
+    sample of requests. Totals are reported in the Server-Timing header,
+    logged to the api.instrumentation logger and kept per view for the
+    metrics endpoint. Requests outside the sample only pay for one
+    random() call.
+    """
+    if not settings.API_INSTRUMENTATION["ENABLED"]:
+        raise MiddlewareNotUsed
+
+    connection_created.connect(
+        install_query_recorder, dispatch_uid="api.instrumentation"
+    )
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def async_middleware(request: HttpRequest) -> HttpResponse:
+            if not is_sampled():
+                return await get_response(request)
+
+            # ORM of async views runs in the sync thread, it has own connections
+            await sync_to_async(install_on_open_connections)()
+            metrics = RequestMetrics()
+            token = _current.set(metrics)
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            finish(request, response, metrics)
+            return response
+
+        return async_middleware
+
+    def middleware(request: HttpRequest) -> HttpResponse:
+        if not is_sampled():
+            return get_response(request)
+
+        install_on_open_connections()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = get_response(request)
+        finally:
+            _current.reset(token)
+        finish(request, response, metrics)
+        return response
+
+    return middleware
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Q
+
+from api.images import IMAGE_FIELDS, process_movie_image
+from api.models import Movie
+
+
+def process_in_thread(job: tuple[int, str]) -> str | None:
+    try:
+        return process_movie_image(*job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Generate derivatives of movie images uploaded before the pipeline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Process images that already have derivatives too",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=settings.IMAGE_DERIVATIVE_WORKERS or 1
+        )
+
+    def handle(self, *args, **options):
+        jobs = []
+        for field in IMAGE_FIELDS:
+            movies = Movie.objects.exclude(Q(**{field: ""}) | Q(**{field: None}))
+            if not options["force"]:
+                movies = movies.filter(**{f"{field}_hash": ""})
+            jobs += [
+                (movie_id, field) for movie_id in movies.values_list("id", flat=True)
+            ]
+
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as executor:
+            hashes = list(executor.map(process_in_thread, jobs))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {len(jobs)} images, {len(set(hashes) - {None})} unique"
+            )
+        )
@@ -0,0 +1,51 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importers import CatalogImporter, CatalogImportError, read_csv, read_jsonl
+
+READERS = {"jsonl": read_jsonl, "csv": read_csv}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import movies with their genres and persons from JSONL or CSV. "
+        "Movies are upserted on (title, release_year)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the input file, - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format, guessed from the file extension by default",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if input_format not in READERS:
+            raise CommandError("Unknown input format, pass --format")
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        importer = CatalogImporter(batch_size=options["batch_size"])
+        start = time.perf_counter()
+
+        try:
+            total = importer.run(READERS[input_format](stream))
+        except CatalogImportError as error:
+            raise CommandError(f"Import failed at {error}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {total} movies ({importer.created} created, "
+                f"{importer.updated} updated) in {elapsed:.2f}s, "
+                f"{total / elapsed if elapsed else 0:.0f} rows/s"
+            )
+        )
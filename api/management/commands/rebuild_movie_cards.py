@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.read_model import rebuild_movie_cards
+
+
+class Command(BaseCommand):
+    help = "Rebuild denormalized MovieCard rows of the whole catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_movie_cards(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt cards of {total} movies"))
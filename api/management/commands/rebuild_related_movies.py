@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.related import rebuild_related_movies
+from api.signals import invalidate_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Rank related movies of the whole catalog, after imports and "
+        "other writes that bypass signals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_related_movies(batch_size=options["batch_size"])
+        invalidate_catalog()
+        self.stdout.write(
+            self.style.SUCCESS(f"Ranked related movies of {total} movies")
+        )
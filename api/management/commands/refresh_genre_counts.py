@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.facets import refresh_genre_counts
+from api.signals import invalidate_catalog
+
+
+class Command(BaseCommand):
+    help = "Recount movies of every genre, after writes that bypass signals"
+
+    def handle(self, *args, **options):
+        total = refresh_genre_counts()
+        invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(f"Recounted movies of {total} genres"))
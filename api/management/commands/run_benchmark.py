@@ -0,0 +1,101 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from api.benchmarks import BENCHMARKS, compare_results
+
+
+class Command(BaseCommand):
+    help = "Run api benchmark against a throwaway test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(BENCHMARKS))
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10_000, 100_000, 1_000_000],
+            help="Dataset sizes (number of movies) to measure at",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep seeded test database between runs",
+        )
+        parser.add_argument(
+            "--output", help="Write results with run metadata to this JSON file"
+        )
+        parser.add_argument(
+            "--compare",
+            help="JSON file of a previous run, fail when results regressed",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed relative slowdown for --compare, 0.2 is 20%%",
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be positive")
+
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read {options['compare']}: {error}")
+            if baseline.get("benchmark") != options["name"]:
+                raise CommandError(
+                    f"{options['compare']} holds {baseline.get('benchmark')} results"
+                )
+
+        benchmark = import_string(BENCHMARKS[options["name"]])
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+
+        try:
+            results = benchmark(sizes=options["sizes"], repeat=options["repeat"])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+
+        for result in results:
+            self.stdout.write(json.dumps(result))
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(
+                    {
+                        "benchmark": options["name"],
+                        "created_at": timezone.now().isoformat(),
+                        "vendor": connection.vendor,
+                        "python": platform.python_version(),
+                        "django": django.get_version(),
+                        "repeat": options["repeat"],
+                        "results": results,
+                    },
+                    file,
+                    indent=2,
+                )
+
+        if baseline is not None:
+            regressions = compare_results(
+                baseline["results"], results, options["threshold"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Regressed against baseline:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
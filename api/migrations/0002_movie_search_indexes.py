@@ -0,0 +1,48 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS api_movie_title_prefix_idx "
+    "ON api_movie (UPPER(title::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS api_movie_title_trgm_idx "
+    "ON api_movie USING gin (UPPER(title::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS api_movie_search_idx ON api_movie "
+    "USING gin (to_tsvector('english'::regconfig, title || ' ' || description))",
+)
+POSTGRES_BACKWARD = (
+    "DROP INDEX IF EXISTS api_movie_search_idx",
+    "DROP INDEX IF EXISTS api_movie_title_trgm_idx",
+    "DROP INDEX IF EXISTS api_movie_title_prefix_idx",
+)
+
+SQLITE_FORWARD = (
+    "CREATE INDEX IF NOT EXISTS api_movie_title_prefix_idx "
+    "ON api_movie (title COLLATE NOCASE)",
+)
+SQLITE_BACKWARD = ("DROP INDEX IF EXISTS api_movie_title_prefix_idx",)
+
+
+def run_for_vendor(postgres_statements, sqlite_statements):
+    def run(apps, schema_editor):
+        statements = {
+            "postgresql": postgres_statements,
+            "sqlite": sqlite_statements,
+        }.get(schema_editor.connection.vendor, ())
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
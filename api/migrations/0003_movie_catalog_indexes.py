@@ -0,0 +1,47 @@
+# Generated by Django 4.1.6 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+# Auto-created through tables only index each FK on its own, these
+# composite indexes serve reverse lookups (genre/person -> movie ids)
+# straight from the index.
+THROUGH_INDEXES = (
+    ("api_movie_genres", "genre_id"),
+    ("api_movie_directors", "person_id"),
+    ("api_movie_writers", "person_id"),
+    ("api_movie_stars", "person_id"),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_movie_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="api_movie_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["release_year"], name="api_movie_release_year_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["imdb_rating"], name="api_movie_imdb_rating_idx"
+            ),
+        ),
+    ] + [
+        migrations.RunSQL(
+            f"CREATE INDEX {table}_reverse_idx ON {table} ({column}, movie_id)",
+            f"DROP INDEX {table}_reverse_idx",
+        )
+        for table, column in THROUGH_INDEXES
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.1.6 on 2026-10-18 16:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_movie_catalog_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MovieCard",
+            fields=[
+                (
+                    "movie",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card",
+                        serialize=False,
+                        to="api.movie",
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("payload", models.TextField()),
+            ],
+            options={
+                "ordering": ["-created_at", "-movie"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="moviecard",
+            index=models.Index(
+                fields=["-created_at", "-movie"], name="api_moviecard_created_idx"
+            ),
+        ),
+    ]
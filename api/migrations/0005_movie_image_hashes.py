@@ -0,0 +1,34 @@
+# Generated by Django 4.1.6 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+def restore_sqlite_prefix_index(apps, schema_editor):
+    # SQLite adds these columns by rebuilding api_movie, which drops
+    # the raw SQL index of 0002_movie_search_indexes
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS api_movie_title_prefix_idx "
+            "ON api_movie (title COLLATE NOCASE)"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_moviecard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="bg_picture_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="poster_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.RunPython(restore_sqlite_prefix_index, migrations.RunPython.noop),
+    ]
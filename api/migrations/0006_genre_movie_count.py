@@ -0,0 +1,33 @@
+# Generated by Django 4.1.6 on 2026-10-18 16:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_genre_movies(apps, schema_editor):
+    Genre = apps.get_model("api", "Genre")
+    through = apps.get_model("api", "Movie").genres.through
+    counts = (
+        through.objects.filter(genre_id=OuterRef("id"))
+        .values("genre_id")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Genre.objects.update(movie_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_movie_image_hashes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="genre",
+            name="movie_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_genre_movies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Prefix indexes matching the UPPER(...) LIKE of istartswith, used by
+# admin person search
+POSTGRES_FORWARD = tuple(
+    f"CREATE INDEX IF NOT EXISTS api_person_{column}_prefix_idx "
+    f"ON api_person (UPPER({column}::text) text_pattern_ops)"
+    for column in ("first_name", "last_name")
+)
+POSTGRES_BACKWARD = (
+    "DROP INDEX IF EXISTS api_person_last_name_prefix_idx",
+    "DROP INDEX IF EXISTS api_person_first_name_prefix_idx",
+)
+
+SQLITE_FORWARD = tuple(
+    f"CREATE INDEX IF NOT EXISTS api_person_{column}_prefix_idx "
+    f"ON api_person ({column} COLLATE NOCASE)"
+    for column in ("first_name", "last_name")
+)
+SQLITE_BACKWARD = POSTGRES_BACKWARD
+
+
+def run_for_vendor(postgres_statements, sqlite_statements):
+    def run(apps, schema_editor):
+        statements = {
+            "postgresql": postgres_statements,
+            "sqlite": sqlite_statements,
+        }.get(schema_editor.connection.vendor, ())
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_genre_movie_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
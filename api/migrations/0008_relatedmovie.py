@@ -0,0 +1,60 @@
+# Generated by Django 4.1.6 on 2026-10-18 16:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_person_name_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedMovie",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_movies",
+                        to="api.movie",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="api.movie",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["movie", "-score", "related"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="relatedmovie",
+            index=models.Index(
+                fields=["movie", "-score", "related"], name="api_relatedmovie_rank_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="relatedmovie",
+            constraint=models.UniqueConstraint(
+                fields=("movie", "related"), name="api_relatedmovie_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.1.6 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_relatedmovie"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["updated_at", "id"], name="api_movie_updated_idx"
+            ),
+        ),
+    ]
@@ -14,6 +14,23 @@ class TimeStampModel(models.Model):
 
 class Genre(TimeStampModel):
     title = models.CharField(max_length=50)
+    # Maintained by api.signals, recount with `refresh_genre_counts`
+    movie_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs) -> None:
+        # Counts change with F() updates, a stale in-memory one must not
+        # overwrite them when an existing genre is saved
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "movie_count"
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return self.title
@@ -47,6 +64,9 @@ class Movie(TimeStampModel):
     bg_picture = models.ImageField(
         null=True, blank=True, upload_to=bg_picture_file_path
     )
+    # Content hashes of images with generated derivatives, see api.images
+    poster_hash = models.CharField(max_length=64, blank=True, default="")
+    bg_picture_hash = models.CharField(max_length=64, blank=True, default="")
     release_year = models.IntegerField()
     mpa_rating = models.CharField(choices=MPARating.choices, max_length=50)
     imdb_rating = models.DecimalField(max_digits=3, decimal_places=2)
@@ -56,5 +76,68 @@ class Movie(TimeStampModel):
     writers = models.ManyToManyField(Person, related_name="movies_as_writer")
     stars = models.ManyToManyField(Person, related_name="movies_as_star")
 
+    class Meta(TimeStampModel.Meta):
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="api_movie_created_idx"),
+            models.Index(fields=["release_year"], name="api_movie_release_year_idx"),
+            models.Index(fields=["imdb_rating"], name="api_movie_imdb_rating_idx"),
+            models.Index(fields=["updated_at", "id"], name="api_movie_updated_idx"),
+        ]
+
     def __str__(self) -> str:
         return self.title
+
+
+class MovieCard(models.Model):
+    """
+    Denormalized read model of a movie holding ready to serve JSON,
+    kept in sync by api.signals and rebuilt with `rebuild_movie_cards`.
+    """
+
+    movie = models.OneToOneField(
+        Movie, on_delete=models.CASCADE, primary_key=True, related_name="card"
+    )
+    created_at = models.DateTimeField()
+    payload = models.TextField()
+
+    class Meta:
+        ordering = ["-created_at", "-movie"]
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-movie"], name="api_moviecard_created_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Card of movie {self.movie_id}"
+
+
+class RelatedMovie(models.Model):
+    """
+    One of the most similar movies of a movie by shared genres and
+    persons, maintained by api.signals and rebuilt with
+    `rebuild_related_movies`, see api.related.
+    """
+
+    movie = models.ForeignKey(
+        Movie, on_delete=models.CASCADE, related_name="related_movies"
+    )
+    related = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["movie", "-score", "related"]
+        indexes = [
+            models.Index(
+                fields=["movie", "-score", "related"],
+                name="api_relatedmovie_rank_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["movie", "related"], name="api_relatedmovie_unique"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Movie {self.related_id} related to movie {self.movie_id}"
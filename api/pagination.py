@@ -0,0 +1,196 @@
+import base64
+import json
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Model, Q, QuerySet
+from django.utils.functional import cached_property
+
+CURSOR_ORDERING = ("-created_at", "-id")
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    payload = json.dumps([created_at.isoformat(), pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError when cursor was not produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(pk, int) or isinstance(pk, bool):
+        raise ValueError("Invalid cursor")
+
+    return created_at, pk
+
+
+def get_cursor_queryset(
+    movie_rows: QuerySet, cursor: str, page_size: int, pk_field: str = "id"
+) -> QuerySet:
+    """
+    Keyset pagination over `-created_at` with `pk_field` as a tiebreaker.
+    Rows must include `created_at` and `pk_field`. An empty cursor
+    starts from the first page. One extra row tells if there is a next page.
+    """
+    movie_rows = movie_rows.order_by("-created_at", f"-{pk_field}")
+
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        movie_rows = movie_rows.filter(
+            Q(created_at__lt=created_at)
+            | Q(created_at=created_at, **{f"{pk_field}__lt": pk})
+        )
+
+    return movie_rows[: page_size + 1]
+
+
+def split_cursor_page(
+    rows: list[dict], page_size: int, pk_field: str = "id"
+) -> tuple[list[dict], str | None]:
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1][pk_field])
+
+    return rows, next_cursor
+
+
+def get_cursor_page(
+    movie_rows: QuerySet, cursor: str, page_size: int, pk_field: str = "id"
+) -> tuple[list[dict], str | None]:
+    rows = get_cursor_queryset(movie_rows, cursor, page_size, pk_field)
+    return split_cursor_page(list(rows), page_size, pk_field)
+
+
+async def aget_cursor_page(
+    movie_rows: QuerySet, cursor: str, page_size: int, pk_field: str = "id"
+) -> tuple[list[dict], str | None]:
+    rows = get_cursor_queryset(movie_rows, cursor, page_size, pk_field)
+    return split_cursor_page([row async for row in rows], page_size, pk_field)
+
+
+def get_page_number(page: str | int) -> int:
+    try:
+        number = int(page)
+    except (TypeError, ValueError):
+        raise PageNotAnInteger("That page number is not an integer")
+    if number < 1:
+        raise EmptyPage("That page number is less than 1")
+
+    return number
+
+
+def get_page_offset(page: str | int, page_size: int, total: int) -> int:
+    """
+    Offset of a page for a known total, raises the same PageNotAnInteger
+    and EmptyPage errors as Paginator.page.
+    """
+    number = get_page_number(page)
+    if number > max(1, math.ceil(total / page_size)):
+        raise EmptyPage("That page contains no results")
+
+    return (number - 1) * page_size
+
+
+def get_offset_page(
+    rows: QuerySet, page: str | int, page_size: int, total: int
+) -> list[dict]:
+    """Paginator.page for a known total, without counting again"""
+    offset = get_page_offset(page, page_size, total)
+    return list(rows[offset : offset + page_size])
+
+
+def settle_estimate(
+    rows: list[dict], offset: int, page_size: int, estimate: int
+) -> tuple[list[dict], int, bool]:
+    if not rows and offset:
+        raise EmptyPage("That page contains no results")
+    if len(rows) <= page_size:
+        # The last page tells the exact total
+        return rows, offset + len(rows), False
+    return rows[:page_size], max(estimate, offset + len(rows)), True
+
+
+def get_estimated_page(
+    rows: QuerySet, page: str | int, page_size: int, estimate: int
+) -> tuple[list[dict], int, bool]:
+    """
+    Page for an estimated total, which must not bound the pages: there
+    may be rows past it or none before it. One extra row tells whether
+    the page is the last one, then the total is exact. Returns rows,
+    total and whether the total is still an estimate.
+    """
+    offset = (get_page_number(page) - 1) * page_size
+    page_rows = list(rows[offset : offset + page_size + 1])
+    return settle_estimate(page_rows, offset, page_size, estimate)
+
+
+async def aget_offset_page(
+    movie_rows: QuerySet, page: str | int, page_size: int, total: int
+) -> list[dict]:
+    """Async counterpart of get_offset_page"""
+    offset = get_page_offset(page, page_size, total)
+    return [row async for row in movie_rows[offset : offset + page_size]]
+
+
+async def aget_estimated_page(
+    rows: QuerySet, page: str | int, page_size: int, estimate: int
+) -> tuple[list[dict], int, bool]:
+    """Async counterpart of get_estimated_page"""
+    offset = (get_page_number(page) - 1) * page_size
+    page_rows = [row async for row in rows[offset : offset + page_size + 1]]
+    return settle_estimate(page_rows, offset, page_size, estimate)
+
+
+def get_table_estimate(model: type[Model], using: str) -> int | None:
+    """
+    Row count of the model's table from planner statistics (pg_class on
+    Postgres, sqlite_stat1 on SQLite), None when the table was never
+    analyzed or the backend keeps no statistics.
+    """
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)"
+    elif connection.vendor == "sqlite":
+        # First number of stat is the row count of the table
+        sql = "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 exists only after the first ANALYZE
+        return None
+
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator taking the count of unfiltered querysets from planner
+    statistics, as COUNT(*) reads the whole table on Postgres. Counts
+    stay exact for filtered querysets and tables smaller than
+    ESTIMATED_COUNT_THRESHOLD rows.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.has_filters():
+            estimate = get_table_estimate(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import add_never_cache_headers
+
+from api.encoding import FastJsonResponse
+
+
+def refill(
+    bucket: tuple[float, float] | None, now: float, rate: float, burst: int
+) -> tuple[tuple[float, float], float]:
+    """
+    Take one token out of a (tokens, updated_at) bucket refilled with rate
+    tokens per second up to burst. Returns the new bucket and seconds to
+    wait, 0 when the token was taken.
+    """
+    tokens, updated_at = bucket if bucket is not None else (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class LocalBucketStore:
+    """Token buckets of this process, least recently seen clients evicted"""
+
+    def __init__(self, rate: float, burst: int, max_entries: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        with self._lock:
+            bucket, wait = refill(
+                self._buckets.get(key), time.monotonic(), self.rate, self.burst
+            )
+            self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def atake(self, key: str) -> float:
+        return self.take(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DjangoBucketStore:
+    """
+    Token buckets in one of CACHES backends, shared by processes. Reads
+    and writes are not atomic, concurrent requests of one client may
+    occasionally both get the last token.
+    """
+
+    def __init__(self, rate: float, burst: int, alias: str) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.alias = alias
+        # A bucket left alone that long is full again, same as a missing one
+        self.timeout = math.ceil(burst / rate) + 1
+
+    def take(self, key: str) -> float:
+        cache = caches[self.alias]
+        bucket, wait = refill(cache.get(key), time.time(), self.rate, self.burst)
+        cache.set(key, bucket, self.timeout)
+        return wait
+
+    async def atake(self, key: str) -> float:
+        cache = caches[self.alias]
+        bucket, wait = refill(await cache.aget(key), time.time(), self.rate, self.burst)
+        await cache.aset(key, bucket, self.timeout)
+        return wait
+
+    def clear(self) -> None:
+        caches[self.alias].clear()
+
+
+@functools.cache
+def get_bucket_store() -> LocalBucketStore | DjangoBucketStore | None:
+    config = settings.API_RATE_LIMIT
+    backend = config.get("BACKEND")
+
+    if backend == "local":
+        return LocalBucketStore(config["RATE"], config["BURST"], config["MAX_CLIENTS"])
+    if backend == "django":
+        return DjangoBucketStore(config["RATE"], config["BURST"], config["CACHE_ALIAS"])
+
+    return None
+
+
+@receiver(setting_changed)
+def reset_bucket_store(setting: str, **kwargs) -> None:
+    if setting == "API_RATE_LIMIT":
+        get_bucket_store.cache_clear()
+
+
+def get_bucket_key(request: HttpRequest, scope: str) -> str:
+    client = request.META.get("REMOTE_ADDR") or "unknown"
+    return f"api:ratelimit:{scope}:{client}"
+
+
+def rate_limited_response(wait: float) -> FastJsonResponse:
+    response = FastJsonResponse({"error": ["rate_limited"]}, status=429)
+    response["Retry-After"] = str(math.ceil(wait))
+    add_never_cache_headers(response)
+    return response
+
+
+def rate_limit(scope: str) -> Callable:
+    """
+    Limit requests of each client (REMOTE_ADDR) to a sync or async view
+    with a token bucket per client and scope, see API_RATE_LIMIT.
+    Requests over the limit get 429 with Retry-After.
+    """
+
+    def decorator(view_func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(view_func):
+
+            @functools.wraps(view_func)
+            async def async_wrapper(
+                request: HttpRequest, *args, **kwargs
+            ) -> HttpResponse:
+                store = get_bucket_store()
+                if store is not None:
+                    wait = await store.atake(get_bucket_key(request, scope))
+                    if wait:
+                        return rate_limited_response(wait)
+                return await view_func(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(view_func)
+        def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+            store = get_bucket_store()
+            if store is not None:
+                wait = store.take(get_bucket_key(request, scope))
+                if wait:
+                    return rate_limited_response(wait)
+            return view_func(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
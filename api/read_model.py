@@ -0,0 +1,95 @@
+import json
+from typing import Iterable
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from api.models import Movie, MovieCard
+from api.serializers import MOVIE_FIELDS, get_movie_dicts
+
+
+def is_read_model_enabled() -> bool:
+    return settings.API_SERVE_FROM_READ_MODEL
+
+
+def encode_payload(data: dict) -> str:
+    """Same encoding as JsonResponse, so cards are served byte-identical"""
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def write_movie_cards(movie_ids: Iterable[int]) -> None:
+    """Rebuild cards of given movies, cards of deleted movies cascade"""
+    movie_ids = set(movie_ids)
+    if not movie_ids:
+        return
+
+    rows = list(
+        Movie.objects.filter(id__in=movie_ids).values(*MOVIE_FIELDS, "created_at")
+    )
+    cards = [
+        MovieCard(
+            movie_id=data["id"],
+            created_at=row["created_at"],
+            payload=encode_payload(data),
+        )
+        for row, data in zip(rows, get_movie_dicts(rows))
+    ]
+
+    MovieCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=["movie"],
+        update_fields=["created_at", "payload"],
+    )
+
+
+def refresh_movie_cards(movie_ids: Iterable[int], batch_size: int = 1000) -> None:
+    """
+    Keep cards of changed movies in step while the read model is
+    served, batch_size movies per query. Nothing is written while it is
+    off, `rebuild_movie_cards` catches up before turning it on.
+    """
+    if not is_read_model_enabled():
+        return
+
+    movie_ids = sorted(set(movie_ids))
+    for start in range(0, len(movie_ids), batch_size):
+        write_movie_cards(movie_ids[start : start + batch_size])
+
+
+def rebuild_movie_cards(batch_size: int = 1000) -> int:
+    """Write cards of the whole catalog, returns number of movies"""
+    movie_ids = Movie.objects.order_by("id").values_list("id", flat=True)
+    total = 0
+    batch = []
+    for movie_id in movie_ids.iterator(chunk_size=batch_size):
+        batch.append(movie_id)
+        if len(batch) == batch_size:
+            write_movie_cards(batch)
+            total += len(batch)
+            batch = []
+
+    write_movie_cards(batch)
+    return total + len(batch)
+
+
+def get_card_payload(movie_id: int) -> str | None:
+    try:
+        return MovieCard.objects.values_list("payload", flat=True).get(
+            movie_id=movie_id
+        )
+    except MovieCard.DoesNotExist:
+        return None
+
+
+def join_payloads(payloads: Iterable[str]) -> str:
+    return f"[{', '.join(payloads)}]"
+
+
+def encode_with_results(data: dict, payloads: Iterable[str]) -> str:
+    """
+    Encode data like JsonResponse does, with ready cards under
+    "results" key, which must be the last key of data.
+    """
+    envelope = encode_payload({**data, "results": None})
+    return envelope[: -len("null}")] + join_payloads(payloads) + "}"
@@ -0,0 +1,127 @@
+import threading
+from itertools import islice
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import QuerySet
+
+from api.models import Genre, Person
+from api.routers import mark_catalog_written
+
+REFERENCES_VERSION_KEY = "api:references:version"
+
+
+def get_references_version() -> int:
+    """Shared counter bumped on every genre or person write"""
+    version = cache.get(REFERENCES_VERSION_KEY)
+    if version is None:
+        cache.add(REFERENCES_VERSION_KEY, 1, None)
+        version = cache.get(REFERENCES_VERSION_KEY, 1)
+    return version
+
+
+async def aget_references_version() -> int:
+    version = await cache.aget(REFERENCES_VERSION_KEY)
+    if version is None:
+        await cache.aadd(REFERENCES_VERSION_KEY, 1, None)
+        version = await cache.aget(REFERENCES_VERSION_KEY, 1)
+    return version
+
+
+def bump_references_version() -> None:
+    try:
+        cache.incr(REFERENCES_VERSION_KEY)
+    except ValueError:
+        cache.add(REFERENCES_VERSION_KEY, 2, None)
+    mark_catalog_written()
+
+
+def invalidate_references() -> None:
+    """Like api.signals.invalidate_catalog, bump now and after commit"""
+    bump_references_version()
+    transaction.on_commit(bump_references_version)
+
+
+class ReferenceCache:
+    """
+    Process-local map of primary key to a tuple of `fields` of a small
+    reference table. Rows are loaded lazily, ids without a row are
+    remembered as None. Everything is dropped when the shared references
+    version changes, the oldest rows above REFERENCE_CACHE_MAX_ENTRIES
+    are evicted.
+    """
+
+    def __init__(self, model: type[models.Model], fields: tuple[str, ...]) -> None:
+        self.model = model
+        self.fields = fields
+        self._rows = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_rows(self, version: int) -> dict[int, tuple | None]:
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._rows = {}
+                    self._version = version
+        return self._rows
+
+    def get_queryset(self, ids: Iterable[int]) -> QuerySet:
+        return self.model.objects.filter(id__in=ids).values_list("id", *self.fields)
+
+    def store(
+        self, version: int, missing: list[int], fetched: Iterable[tuple]
+    ) -> dict[int, tuple | None]:
+        found = {pk: row for pk, *row in fetched}
+        found = {pk: tuple(found[pk]) if pk in found else None for pk in missing}
+
+        with self._lock:
+            if version == self._version:
+                self._rows.update(found)
+                overflow = len(self._rows) - settings.REFERENCE_CACHE_MAX_ENTRIES
+                if overflow > 0:
+                    for pk in list(islice(self._rows, overflow)):
+                        del self._rows[pk]
+
+        return found
+
+    def split(
+        self, rows: dict, ids: Iterable[int]
+    ) -> tuple[dict[int, tuple | None], list[int]]:
+        cached = {pk: rows[pk] for pk in ids if pk in rows}
+        return cached, [pk for pk in ids if pk not in cached]
+
+    def get_many(self, ids: Iterable[int]) -> dict[int, tuple | None]:
+        if not ids:
+            return {}
+
+        version = get_references_version()
+        cached, missing = self.split(self.get_rows(version), set(ids))
+        if missing:
+            cached.update(self.store(version, missing, self.get_queryset(missing)))
+        return cached
+
+    async def aget_many(self, ids: Iterable[int]) -> dict[int, tuple | None]:
+        if not ids:
+            return {}
+
+        version = await aget_references_version()
+        cached, missing = self.split(self.get_rows(version), set(ids))
+        if missing:
+            fetched = [row async for row in self.get_queryset(missing)]
+            cached.update(self.store(version, missing, fetched))
+        return cached
+
+
+GENRES = ReferenceCache(Genre, ("created_at", "title"))
+PERSONS = ReferenceCache(Person, ("created_at", "first_name", "last_name"))
+
+
+def genre_exists(genre_id: int) -> bool:
+    return GENRES.get_many([genre_id])[genre_id] is not None
+
+
+async def agenre_exists(genre_id: int) -> bool:
+    return (await GENRES.aget_many([genre_id]))[genre_id] is not None
@@ -0,0 +1,310 @@
+import heapq
+import math
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.http import QueryDict
+
+from api.filters import InvalidFilter, parse_integer
+from api.models import Movie, RelatedMovie
+
+# Weight of a shared value per relation, on top of its IDF
+RELATION_WEIGHTS = {
+    "genres": 1.0,
+    "directors": 3.0,
+    "writers": 2.0,
+    "stars": 1.5,
+}
+
+Attribute = tuple[str, int]
+
+
+def get_through_and_column(relation: str) -> tuple[type, str]:
+    field = getattr(Movie, relation).field
+    return field.remote_field.through, field.m2m_reverse_name()
+
+
+def load_attributes(movie_ids: Iterable[int] | None = None) -> dict[int, set]:
+    """Genres and persons of given movies, of all movies without movie_ids"""
+    attributes = defaultdict(set)
+    for relation in RELATION_WEIGHTS:
+        through, column = get_through_and_column(relation)
+        links = through.objects.all()
+        if movie_ids is not None:
+            links = links.filter(movie_id__in=movie_ids)
+        for movie_id, value in links.values_list("movie_id", column).iterator(
+            chunk_size=10_000
+        ):
+            attributes[movie_id].add((relation, value))
+    return attributes
+
+
+def count_movies_per_attribute(attributes: Iterable[Attribute]) -> Counter:
+    """Number of movies having each attribute, one GROUP BY per relation"""
+    values = defaultdict(set)
+    for relation, value in attributes:
+        values[relation].add(value)
+
+    frequencies = Counter()
+    for relation, ids in values.items():
+        through, column = get_through_and_column(relation)
+        counts = (
+            through.objects.filter(**{f"{column}__in": ids})
+            .values(column)
+            .annotate(count=Count("id"))
+            .values_list(column, "count")
+            .order_by()
+        )
+        frequencies.update({(relation, value): count for value, count in counts})
+    return frequencies
+
+
+class SimilarityIndex:
+    """
+    Sparse movie-by-attribute matrix. Rows are TF-IDF weighted and
+    L2-normalized, so the dot product of two rows is the cosine
+    similarity of two movies. Columns are kept as an inverted index of
+    (movie, weight) postings, scores accumulate over the postings of
+    shared attributes. Attributes of more than max_posting movies, like
+    popular genres, only add to the scores of movies found otherwise and
+    bring in their newest movies only for movies short of k candidates.
+    """
+
+    def __init__(
+        self,
+        attributes: dict[int, set],
+        frequencies: Counter,
+        total: int,
+        max_posting: int,
+    ) -> None:
+        self.frequencies = frequencies
+        self.max_posting = max_posting
+        self.vectors = {}
+        self.postings = defaultdict(list)
+
+        for movie_id in sorted(attributes):
+            weights = {
+                attribute: RELATION_WEIGHTS[attribute[0]]
+                * (math.log((1 + total) / (1 + frequencies[attribute])) + 1)
+                for attribute in attributes[movie_id]
+            }
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            vector = self.vectors[movie_id] = {
+                attribute: weight / norm for attribute, weight in weights.items()
+            }
+            for attribute, weight in vector.items():
+                self.postings[attribute].append((movie_id, weight))
+
+    def score(self, movie_id: int, other_id: int) -> float:
+        vector = self.vectors.get(movie_id, {})
+        other = self.vectors.get(other_id, {})
+        if len(other) < len(vector):
+            vector, other = other, vector
+        return sum(
+            weight * other.get(attribute, 0.0) for attribute, weight in vector.items()
+        )
+
+    def get_scores(self, movie_id: int, k: int) -> dict[int, float]:
+        """Similarity of movie_id to each of its candidates"""
+        vector = self.vectors.get(movie_id, {})
+        scores = defaultdict(float)
+        frequent = []
+        for attribute, weight in vector.items():
+            if self.frequencies[attribute] <= self.max_posting:
+                for other_id, other_weight in self.postings[attribute]:
+                    scores[other_id] += weight * other_weight
+            else:
+                frequent.append(attribute)
+        scores.pop(movie_id, None)
+
+        frequent.sort(key=lambda attribute: self.frequencies[attribute])
+        for attribute in frequent:
+            if len(scores) >= k:
+                break
+            # Postings are in id order, newest movies last
+            for other_id, _ in self.postings[attribute][-self.max_posting :]:
+                scores[other_id] += 0.0
+            scores.pop(movie_id, None)
+
+        for attribute in frequent:
+            weight = vector[attribute]
+            for other_id in scores:
+                scores[other_id] += weight * self.vectors[other_id].get(attribute, 0.0)
+
+        return scores
+
+    def get_similar(self, movie_id: int, k: int) -> list[tuple[int, float]]:
+        """Up to k most similar movies with their scores, best first"""
+        scored = (
+            (-score, other_id)
+            for other_id, score in self.get_scores(movie_id, k).items()
+        )
+        return [(other_id, -score) for score, other_id in heapq.nsmallest(k, scored)]
+
+
+def build_full_index() -> SimilarityIndex:
+    attributes = load_attributes()
+    frequencies = Counter(
+        attribute for values in attributes.values() for attribute in values
+    )
+    return SimilarityIndex(
+        attributes,
+        frequencies,
+        Movie.objects.count(),
+        settings.RELATED_MOVIES_MAX_POSTING,
+    )
+
+
+def build_neighborhood_index(movie_ids: set[int]) -> SimilarityIndex:
+    """
+    Index of given movies and of every movie the full index would
+    consider as their candidate, so they rank the same as in a full build.
+    """
+    max_posting = settings.RELATED_MOVIES_MAX_POSTING
+    own = load_attributes(movie_ids)
+    frequencies = count_movies_per_attribute(set().union(*own.values()))
+
+    neighbor_ids = set(movie_ids)
+    for relation in RELATION_WEIGHTS:
+        through, column = get_through_and_column(relation)
+        values = {value for name, value in frequencies if name == relation}
+        rare = {
+            value for value in values if frequencies[relation, value] <= max_posting
+        }
+        neighbor_ids.update(
+            through.objects.filter(**{f"{column}__in": rare}).values_list(
+                "movie_id", flat=True
+            )
+        )
+        for value in values - rare:
+            neighbor_ids.update(
+                through.objects.filter(**{column: value})
+                .order_by("-movie_id")
+                .values_list("movie_id", flat=True)[:max_posting]
+            )
+
+    attributes = {**load_attributes(neighbor_ids - set(own)), **own}
+    missing = {
+        attribute
+        for values in attributes.values()
+        for attribute in values
+        if attribute not in frequencies
+    }
+    frequencies.update(count_movies_per_attribute(missing))
+
+    return SimilarityIndex(attributes, frequencies, Movie.objects.count(), max_posting)
+
+
+def save_related(related: dict[int, list[tuple[int, float]]]) -> None:
+    """Replace related movies of every movie in related"""
+    with transaction.atomic():
+        RelatedMovie.objects.filter(movie_id__in=related).delete()
+        RelatedMovie.objects.bulk_create(
+            RelatedMovie(movie_id=movie_id, related_id=related_id, score=score)
+            for movie_id, pairs in related.items()
+            for related_id, score in pairs
+        )
+
+
+def rebuild_related_movies(batch_size: int = 1000) -> int:
+    """
+    Rank related movies of the whole catalog from a full in-memory
+    index, returns number of movies
+    """
+    index = build_full_index()
+    k = settings.RELATED_MOVIES_TOP_K
+
+    batch = {}
+    total = 0
+    for movie_id in Movie.objects.order_by("id").values_list("id", flat=True):
+        batch[movie_id] = index.get_similar(movie_id, k)
+        total += 1
+        if len(batch) == batch_size:
+            save_related(batch)
+            batch = {}
+
+    save_related(batch)
+    return total
+
+
+def refresh_related_movies(movie_ids: Iterable[int]) -> None:
+    """
+    Re-rank related movies of movies whose genres or persons changed,
+    and move them up or down the lists of movies listing them before
+    or after the change. The other entries of those lists keep their
+    scores until the next rebuild.
+    """
+    movie_ids = set(movie_ids)
+    if not movie_ids:
+        return
+
+    k = settings.RELATED_MOVIES_TOP_K
+    index = build_neighborhood_index(movie_ids)
+    related = {movie_id: index.get_similar(movie_id, k) for movie_id in movie_ids}
+
+    listing = set(
+        RelatedMovie.objects.filter(related_id__in=movie_ids).values_list(
+            "movie_id", flat=True
+        )
+    )
+    # Scores are symmetric, new neighbors may rank changed movies higher
+    targets = (
+        listing | {related_id for pairs in related.values() for related_id, _ in pairs}
+    ) - movie_ids
+
+    lists = defaultdict(list)
+    for movie_id, related_id, score in RelatedMovie.objects.filter(
+        movie_id__in=targets
+    ).values_list("movie_id", "related_id", "score"):
+        if related_id not in movie_ids:
+            lists[movie_id].append((related_id, score))
+
+    for movie_id in targets:
+        pairs = lists[movie_id]
+        for changed_id in movie_ids:
+            score = index.score(movie_id, changed_id)
+            if score > 0:
+                pairs.append((changed_id, score))
+        related[movie_id] = heapq.nsmallest(
+            k, pairs, key=lambda pair: (-pair[1], pair[0])
+        )
+
+    save_related(related)
+
+
+def parse_limit(params: QueryDict) -> int:
+    limit = parse_integer(params, "limit")
+    if limit is None:
+        return min(settings.NUM_OF_INSTANCES_ON_PAGE, settings.RELATED_MOVIES_TOP_K)
+    if not 1 <= limit <= settings.RELATED_MOVIES_TOP_K:
+        raise InvalidFilter("limit__invalid")
+    return limit
+
+
+def order_related_rows(
+    pairs: list[tuple[int, float]], rows: Iterable[dict]
+) -> tuple[list[dict], list[float]]:
+    """Movie rows in ranking order of pairs with their scores"""
+    rows = {row["id"]: row for row in rows}
+    pairs = [(rows[movie_id], score) for movie_id, score in pairs if movie_id in rows]
+    return [row for row, _ in pairs], [score for _, score in pairs]
+
+
+def get_related_ids(movie_id: int, limit: int) -> list[tuple[int, float]]:
+    return list(
+        RelatedMovie.objects.filter(movie_id=movie_id).values_list(
+            "related_id", "score"
+        )[:limit]
+    )
+
+
+async def aget_related_ids(movie_id: int, limit: int) -> list[tuple[int, float]]:
+    return [
+        pair
+        async for pair in RelatedMovie.objects.filter(movie_id=movie_id).values_list(
+            "related_id", "score"
+        )[:limit]
+    ]
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+from django.utils.connection import ConnectionDoesNotExist
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_COOKIE = "api_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+CATALOG_WRITTEN_KEY = "api:catalog:written"
+
+# Routing of the current request, None outside requests
+_state = ContextVar("api_db_routing", default=None)
+
+_down_until = {}
+_down_lock = threading.Lock()
+
+
+def mark_replica_down(alias: str) -> None:
+    with _down_lock:
+        _down_until[alias] = time.monotonic() + settings.API_DB_REPLICA_RETRY_AFTER
+
+
+def is_replica_available(alias: str) -> bool:
+    """
+    Connects to the replica unless it failed in the last
+    API_DB_REPLICA_RETRY_AFTER seconds. Open connections are reused,
+    Django drops broken ones at the end of each request.
+    """
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+
+    try:
+        connections[alias].ensure_connection()
+    except (ConnectionDoesNotExist, DatabaseError):
+        logger.warning("Replica %s is unavailable, reading from primary", alias)
+        mark_replica_down(alias)
+        return False
+
+    return True
+
+
+def mark_catalog_written() -> None:
+    """
+    Catalog and reference versions were bumped. Caches keyed on them
+    must not be filled from replicas that may not have the write yet.
+    """
+    if settings.API_DB_REPLICAS:
+        cache.set(CATALOG_WRITTEN_KEY, True, settings.API_DB_REPLICA_STICKINESS)
+
+
+def is_catalog_settling() -> bool:
+    """Whether the catalog was written in the last API_DB_REPLICA_STICKINESS"""
+    return cache.get(CATALOG_WRITTEN_KEY) is not None
+
+
+def choose_replica() -> str | None:
+    if not settings.API_DB_REPLICAS or is_catalog_settling():
+        return None
+
+    replicas = list(settings.API_DB_REPLICAS)
+    random.shuffle(replicas)
+    for alias in replicas:
+        if is_replica_available(alias):
+            return alias
+    return None
+
+
+def note_replica_error(execute, sql, params, many, context):
+    """Skip a replica failing after connecting and flag the request"""
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError:
+        mark_replica_down(context["connection"].alias)
+        state = _state.get()
+        if state is not None:
+            state["replica_failed"] = True
+        raise
+
+
+@receiver(connection_created)
+def watch_replica(connection, **kwargs) -> None:
+    if (
+        connection.alias in settings.API_DB_REPLICAS
+        and note_replica_error not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(note_replica_error)
+
+
+class ReplicaRouter:
+    """
+    Send reads of api models made by safe requests to one of
+    API_DB_REPLICAS, everything else to the primary. A request is pinned
+    to the primary once it writes, and so are requests of the same
+    client for API_DB_REPLICA_STICKINESS seconds after, see
+    replica_middleware. Every request reads from the primary for as
+    long after any catalog write, so responses, counts and references
+    cached under the new catalog version never come from a lagging
+    replica. Management commands and background jobs run outside
+    requests and always use the primary.
+    """
+
+    def db_for_read(self, model: type[Model], **hints) -> str | None:
+        state = _state.get()
+        if state is None or state["pinned"] or model._meta.app_label != "api":
+            return None
+
+        # One replica per request, so that its queries see the same snapshot
+        if "replica" not in state:
+            state["replica"] = choose_replica()
+        return state["replica"]
+
+    def db_for_write(self, model: type[Model], **hints) -> str:
+        state = _state.get()
+        if state is not None and model._meta.app_label == "api":
+            state["pinned"] = state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool | None:
+        databases = {DEFAULT_DB_ALIAS, *settings.API_DB_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool | None:
+        # Replicas receive schema changes from the primary
+        if db in settings.API_DB_REPLICAS:
+            return False
+        return None
+
+
+def start_routing(request: HttpRequest) -> dict:
+    wrote = request.method not in SAFE_METHODS
+    return {"pinned": wrote or PRIMARY_COOKIE in request.COOKIES, "wrote": wrote}
+
+
+def should_retry_on_primary(state: dict) -> bool:
+    """
+    A replica failed mid-request, e.g. dropped its connection. Views
+    turn database errors into responses, so the request is run again
+    on the primary. Safe requests only, they never wrote.
+    """
+    if state.get("replica_failed") and state.get("replica") and not state["wrote"]:
+        logger.warning(
+            "Replica %s failed, retrying request on primary", state["replica"]
+        )
+        return True
+    return False
+
+
+def retry_state() -> dict:
+    return {"pinned": True, "wrote": False}
+
+
+def keep_routing(content: Iterable[bytes], state: dict) -> Iterator[bytes]:
+    """Streamed content runs after the view returned, under the same routing"""
+    content = iter(content)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(content)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+def finish_routing(response: HttpResponse, state: dict) -> None:
+    if response.streaming:
+        response.streaming_content = keep_routing(response.streaming_content, state)
+
+    # Read your writes, the client keeps reading from primary a while
+    if state["wrote"] and settings.API_DB_REPLICAS:
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            "1",
+            max_age=settings.API_DB_REPLICA_STICKINESS,
+            httponly=True,
+            samesite="Lax",
+        )
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response: Callable) -> Callable:
+    """Scope ReplicaRouter decisions to a request and its streamed content"""
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def arespond(request: HttpRequest, state: dict) -> HttpResponse:
+            token = _state.set(state)
+            try:
+                return await get_response(request)
+            finally:
+                _state.reset(token)
+
+        async def async_middleware(request: HttpRequest) -> HttpResponse:
+            state = start_routing(request)
+            response = await arespond(request, state)
+            if should_retry_on_primary(state):
+                state = retry_state()
+                response = await arespond(request, state)
+            finish_routing(response, state)
+            return response
+
+        return async_middleware
+
+    def respond(request: HttpRequest, state: dict) -> HttpResponse:
+        token = _state.set(state)
+        try:
+            return get_response(request)
+        finally:
+            _state.reset(token)
+
+    def middleware(request: HttpRequest) -> HttpResponse:
+        state = start_routing(request)
+        response = respond(request, state)
+        if should_retry_on_primary(state):
+            state = retry_state()
+            response = respond(request, state)
+        finish_routing(response, state)
+        return response
+
+    return middleware
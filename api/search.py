@@ -0,0 +1,68 @@
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, Q, QuerySet, Value, When
+
+SEARCH_CONFIG = "english"
+
+SEARCH_MODE_FULL = "full"
+SEARCH_MODE_PREFIX = "prefix"
+
+
+class MovieDocument(Func):
+    """
+    Full-text document of a movie. Compiles to the same expression
+    as api_movie_search_idx, so Postgres can use the GIN index.
+    """
+
+    template = f"to_tsvector('{SEARCH_CONFIG}'::regconfig, %(expressions)s)"
+    arg_joiner = " || ' ' || "
+
+    def __init__(self) -> None:
+        # contrib.postgres imports psycopg2, which is only needed on Postgres
+        from django.contrib.postgres.search import SearchVectorField
+
+        super().__init__(F("title"), F("description"), output_field=SearchVectorField())
+
+
+def prefix_search(movies: QuerySet, phrase: str) -> QuerySet:
+    """
+    Case-insensitive title prefix match backed by api_movie_title_prefix_idx
+    (UPPER(title) text_pattern_ops on Postgres, NOCASE index on SQLite).
+    """
+    return movies.filter(title__istartswith=phrase)
+
+
+def ranked_search(movies: QuerySet, phrase: str) -> QuerySet:
+    """
+    Movies matching phrase in title or description, best matches first.
+    Uses full-text search on Postgres and a LIKE-based fallback elsewhere.
+    """
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(phrase, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            movies.annotate(document=MovieDocument())
+            .filter(Q(document=query) | Q(title__icontains=phrase))
+            .annotate(
+                rank=SearchRank(MovieDocument(), query)
+                + Case(
+                    When(title__istartswith=phrase, then=Value(1.0)),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-rank", "-created_at", "-id")
+        )
+
+    return (
+        movies.filter(Q(title__icontains=phrase) | Q(description__icontains=phrase))
+        .annotate(
+            rank=Case(
+                When(title__istartswith=phrase, then=Value(3.0)),
+                When(title__icontains=phrase, then=Value(2.0)),
+                default=Value(1.0),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-rank", "-created_at", "-id")
+    )
@@ -0,0 +1,266 @@
+import asyncio
+from typing import Iterable
+
+from django.db.models import QuerySet
+
+from api.models import Genre, Movie
+from api.references import GENRES, PERSONS
+from api.utils import get_derivative_urls
+
+MOVIE_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "release_year",
+    "mpa_rating",
+    "imdb_rating",
+    "duration",
+    "poster",
+    "bg_picture",
+    "poster_hash",
+    "bg_picture_hash",
+)
+
+GENRE_RELATIONS = ("genres",)
+PERSON_RELATIONS = ("directors", "writers", "stars")
+RELATIONS = (*GENRE_RELATIONS, *PERSON_RELATIONS)
+
+# Movie payload keys in output order, relations excluded, with the
+# MOVIE_FIELDS columns they are built from
+MOVIE_FIELD_GETTERS = {
+    "id": lambda row: row["id"],
+    "title": lambda row: row["title"],
+    "description": lambda row: row["description"],
+    "release_year": lambda row: row["release_year"],
+    "mpa_rating": lambda row: row["mpa_rating"],
+    "imdb_rating": lambda row: str(row["imdb_rating"]),
+    "duration": lambda row: row["duration"],
+    "poster": lambda row: row["poster"] or "",
+    "bg_picture": lambda row: row["bg_picture"] or "",
+    "poster_images": lambda row: get_derivative_urls(row["poster_hash"]),
+    "bg_picture_images": lambda row: get_derivative_urls(row["bg_picture_hash"]),
+}
+MOVIE_FIELD_COLUMNS = {
+    "poster_images": "poster_hash",
+    "bg_picture_images": "bg_picture_hash",
+}
+MOVIE_OUTPUT_FIELDS = (*MOVIE_FIELD_GETTERS, *RELATIONS)
+# Compact list representation, one relation query instead of four
+CARD_FIELDS = (
+    "id",
+    "title",
+    "release_year",
+    "mpa_rating",
+    "imdb_rating",
+    "duration",
+    "poster_images",
+    "genres",
+)
+
+
+def get_movie_columns(fields: tuple[str, ...]) -> tuple[str, ...]:
+    """MOVIE_FIELDS columns needed to build given payload fields"""
+    return tuple(
+        dict.fromkeys(
+            MOVIE_FIELD_COLUMNS.get(field, field)
+            for field in ("id", *fields)
+            if field not in RELATIONS
+        )
+    )
+
+
+def get_genres_dicts(genres: Iterable[Genre]) -> list[dict]:
+    return [{"id": genre.id, "title": genre.title} for genre in genres]
+
+
+def get_genre_count_dicts(genres: Iterable[Genre]) -> list[dict]:
+    return [
+        {"id": genre.id, "title": genre.title, "movie_count": genre.movie_count}
+        for genre in genres
+    ]
+
+
+def get_relation_rows(relation: str, movie_ids: list[int]) -> QuerySet:
+    """
+    (movie_id, reference id) pairs of one relation of given movies,
+    straight from its through table. Titles and names come from
+    the reference cache, see api.references.
+    """
+    through = getattr(Movie, relation).through
+    column = "genre_id" if relation in GENRE_RELATIONS else "person_id"
+
+    return (
+        through.objects.filter(movie_id__in=movie_ids)
+        .order_by("id")
+        .values_list("movie_id", column)
+    )
+
+
+def group_relation_rows(
+    relation: str,
+    rows: Iterable[tuple],
+    movie_ids: list[int],
+    references: dict[int, tuple | None],
+) -> dict[int, list[dict]]:
+    """Reference dicts of every movie, newest first like Meta.ordering"""
+    by_movie = {movie_id: [] for movie_id in movie_ids}
+
+    for movie_id, pk in rows:
+        reference = references.get(pk)
+        if reference is None:
+            continue
+        created_at, *values = reference
+        if relation in GENRE_RELATIONS:
+            (title,) = values
+            data = {"id": pk, "title": title}
+        else:
+            first_name, last_name = values
+            data = {"id": pk, "first_name": first_name, "last_name": last_name}
+        by_movie[movie_id].append((created_at, data))
+
+    return {
+        movie_id: [
+            data for _, data in sorted(items, key=lambda item: item[0], reverse=True)
+        ]
+        for movie_id, items in by_movie.items()
+    }
+
+
+def group_relations(
+    relation_rows: dict[str, list[tuple]],
+    movie_ids: list[int],
+    genres: dict[int, tuple | None],
+    persons: dict[int, tuple | None],
+) -> dict[str, dict[int, list[dict]]]:
+    return {
+        relation: group_relation_rows(
+            relation,
+            rows,
+            movie_ids,
+            genres if relation in GENRE_RELATIONS else persons,
+        )
+        for relation, rows in relation_rows.items()
+    }
+
+
+def get_reference_ids(relation_rows: dict[str, list[tuple]], relations) -> set[int]:
+    return {
+        pk
+        for relation in relations
+        if relation in relation_rows
+        for _, pk in relation_rows[relation]
+    }
+
+
+def get_relations_dicts(
+    movie_ids: list[int], relations: tuple[str, ...] = RELATIONS
+) -> dict[str, dict[int, list[dict]]]:
+    """
+    Load relations of given movies, all four by default, with one query
+    per relation. Only id pairs are read from the through tables, genres
+    and persons are resolved from the reference cache.
+    """
+    relation_rows = {
+        relation: list(get_relation_rows(relation, movie_ids)) for relation in relations
+    }
+    genres = GENRES.get_many(get_reference_ids(relation_rows, GENRE_RELATIONS))
+    persons = PERSONS.get_many(get_reference_ids(relation_rows, PERSON_RELATIONS))
+
+    return group_relations(relation_rows, movie_ids, genres, persons)
+
+
+async def aget_relations_dicts(
+    movie_ids: list[int], relations: tuple[str, ...] = RELATIONS
+) -> dict[str, dict[int, list[dict]]]:
+    """Async get_relations_dicts, relations are fetched concurrently"""
+
+    async def fetch(relation: str) -> list[tuple]:
+        return [row async for row in get_relation_rows(relation, movie_ids)]
+
+    results = await asyncio.gather(*(fetch(relation) for relation in relations))
+    relation_rows = dict(zip(relations, results))
+
+    genres, persons = await asyncio.gather(
+        GENRES.aget_many(get_reference_ids(relation_rows, GENRE_RELATIONS)),
+        PERSONS.aget_many(get_reference_ids(relation_rows, PERSON_RELATIONS)),
+    )
+
+    return group_relations(relation_rows, movie_ids, genres, persons)
+
+
+def build_movie_dicts(
+    movie_rows: list[dict],
+    relations: dict,
+    fields: tuple[str, ...] = MOVIE_OUTPUT_FIELDS,
+) -> list[dict]:
+    if fields == MOVIE_OUTPUT_FIELDS:
+        # Full payload spelled out, it is the hot path of large pages
+        return [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "description": row["description"],
+                "release_year": row["release_year"],
+                "mpa_rating": row["mpa_rating"],
+                "imdb_rating": str(row["imdb_rating"]),
+                "duration": row["duration"],
+                "poster": row["poster"] or "",
+                "bg_picture": row["bg_picture"] or "",
+                "poster_images": get_derivative_urls(row["poster_hash"]),
+                "bg_picture_images": get_derivative_urls(row["bg_picture_hash"]),
+                "genres": relations["genres"][row["id"]],
+                "directors": relations["directors"][row["id"]],
+                "writers": relations["writers"][row["id"]],
+                "stars": relations["stars"][row["id"]],
+            }
+            for row in movie_rows
+        ]
+
+    getters = {
+        field: MOVIE_FIELD_GETTERS[field] for field in fields if field not in RELATIONS
+    }
+    return [
+        {
+            field: (
+                relations[field][row["id"]]
+                if field in RELATIONS
+                else getters[field](row)
+            )
+            for field in fields
+        }
+        for row in movie_rows
+    ]
+
+
+def get_movie_dicts(
+    movie_rows: Iterable[dict], fields: tuple[str, ...] = MOVIE_OUTPUT_FIELDS
+) -> list[dict]:
+    """
+    Movie payloads of rows fetched with `.values(*MOVIE_FIELDS)`,
+    or just the columns of given fields.
+    Costs one query per requested relation regardless of how many
+    movies are serialized. Values are converted to JSON primitives
+    the way DjangoJSONEncoder would encode them.
+    """
+    movie_rows = list(movie_rows)
+    if not movie_rows:
+        return []
+
+    relations = get_relations_dicts(
+        [row["id"] for row in movie_rows],
+        tuple(field for field in fields if field in RELATIONS),
+    )
+    return build_movie_dicts(movie_rows, relations, fields)
+
+
+async def aget_movie_dicts(
+    movie_rows: list[dict], fields: tuple[str, ...] = MOVIE_OUTPUT_FIELDS
+) -> list[dict]:
+    if not movie_rows:
+        return []
+
+    relations = await aget_relations_dicts(
+        [row["id"] for row in movie_rows],
+        tuple(field for field in fields if field in RELATIONS),
+    )
+    return build_movie_dicts(movie_rows, relations, fields)
@@ -0,0 +1,228 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.cache import bump_catalog_version
+from api.facets import adjust_genre_counts
+from api.images import IMAGE_FIELDS, schedule_movie_image
+from api.models import Genre, Movie, Person, RelatedMovie
+from api.read_model import refresh_movie_cards
+from api.references import invalidate_references
+from api.related import refresh_related_movies
+
+MOVIE_RELATIONS = (Movie.genres, Movie.directors, Movie.writers, Movie.stars)
+
+
+def invalidate_catalog() -> None:
+    """
+    Bump catalog version right away and once more after commit,
+    so pages cached from not yet committed data are never served.
+    """
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version)
+
+
+def get_through_movie_ids(through: type[Model], instance: Genre | Person) -> set[int]:
+    (field,) = (
+        field
+        for field in through._meta.fields
+        if field.is_relation and field.related_model is type(instance)
+    )
+    return set(
+        through.objects.filter(**{field.name: instance}).values_list(
+            "movie_id", flat=True
+        )
+    )
+
+
+def get_related_movie_ids(instance: Genre | Person) -> set[int]:
+    movie_ids = set()
+    for relation in MOVIE_RELATIONS:
+        if relation.field.related_model is type(instance):
+            movie_ids |= get_through_movie_ids(relation.through, instance)
+    return movie_ids
+
+
+def related_movies_changed(movie_ids: set[int]) -> None:
+    """
+    Touch updated_at of movies whose genres or persons changed,
+    so incremental exports pick them up, and refresh their cards.
+    """
+    if movie_ids:
+        Movie.objects.filter(id__in=movie_ids).update(updated_at=timezone.now())
+        refresh_movie_cards(movie_ids)
+
+
+@receiver([post_save, post_delete], sender=Movie)
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Person)
+def catalog_changed(**kwargs) -> None:
+    invalidate_catalog()
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.directors.through)
+@receiver(m2m_changed, sender=Movie.writers.through)
+@receiver(m2m_changed, sender=Movie.stars.through)
+def catalog_relations_changed(action: str, **kwargs) -> None:
+    if action.startswith("post_"):
+        invalidate_catalog()
+
+
+@receiver(post_save, sender=Movie)
+def refresh_card_of_movie(instance: Movie, **kwargs) -> None:
+    refresh_movie_cards([instance.id])
+
+
+@receiver(pre_save, sender=Movie)
+def collect_changed_images(instance: Movie, update_fields, **kwargs) -> None:
+    """Hashes of replaced images are reset, their derivatives are stale"""
+    fields = [
+        field
+        for field in IMAGE_FIELDS
+        if update_fields is None or field in update_fields
+    ]
+    if not fields:
+        return
+
+    previous = {}
+    if instance.pk is not None:
+        previous = Movie.objects.filter(pk=instance.pk).values(*fields).first() or {}
+
+    instance._changed_images = [
+        field
+        for field in fields
+        if not getattr(instance, field)._committed
+        or getattr(instance, field).name != previous.get(field)
+    ]
+    for field in instance._changed_images:
+        setattr(instance, f"{field}_hash", "")
+
+
+@receiver(post_save, sender=Movie)
+def schedule_image_derivatives(instance: Movie, **kwargs) -> None:
+    for field in getattr(instance, "_changed_images", ()):
+        if getattr(instance, field):
+            transaction.on_commit(
+                lambda field=field: schedule_movie_image(instance.id, field)
+            )
+
+
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Person)
+def references_changed(**kwargs) -> None:
+    invalidate_references()
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Person)
+def reference_saved(instance: Genre | Person, created: bool, **kwargs):
+    if not created:
+        related_movies_changed(get_related_movie_ids(instance))
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Person)
+def collect_related_movies(instance: Genre | Person, **kwargs) -> None:
+    instance._related_movie_ids = get_related_movie_ids(instance)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Person)
+def reference_deleted(instance: Genre | Person, **kwargs) -> None:
+    movie_ids = getattr(instance, "_related_movie_ids", set())
+    related_movies_changed(movie_ids)
+    # Links were deleted by cascade, without m2m_changed
+    refresh_related_movies(movie_ids)
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+@receiver(m2m_changed, sender=Movie.directors.through)
+@receiver(m2m_changed, sender=Movie.writers.through)
+@receiver(m2m_changed, sender=Movie.stars.through)
+def movie_relations_changed(
+    sender: type[Model], instance: Model, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    movie_ids = set()
+    if not reverse:
+        if action.startswith("post_"):
+            movie_ids = {instance.id}
+    elif action == "pre_clear":
+        instance._related_movie_ids = get_through_movie_ids(sender, instance)
+    elif action == "post_clear":
+        movie_ids = getattr(instance, "_related_movie_ids", set())
+    elif action in ("post_add", "post_remove"):
+        movie_ids = pk_set
+
+    if movie_ids:
+        related_movies_changed(movie_ids)
+        refresh_related_movies(movie_ids)
+
+
+def get_linked_genre_counts(
+    instance: Movie | Genre, reverse: bool, pk_set: set[int] | None
+) -> Counter:
+    """Per genre number of links of instance, limited to pk_set when given"""
+    through = Movie.genres.through
+    if reverse:
+        links = through.objects.filter(genre_id=instance.id)
+        if pk_set is not None:
+            links = links.filter(movie_id__in=pk_set)
+        return Counter({instance.id: links.count()})
+
+    links = through.objects.filter(movie_id=instance.id)
+    if pk_set is not None:
+        links = links.filter(genre_id__in=pk_set)
+    return Counter(links.values_list("genre_id", flat=True))
+
+
+@receiver(m2m_changed, sender=Movie.genres.through)
+def genre_links_changed(
+    instance: Movie | Genre, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    """Keep Genre.movie_count in step with the genres relation"""
+    if action == "post_add" and pk_set:
+        adjust_genre_counts(
+            Counter({instance.id: len(pk_set)}) if reverse else Counter(pk_set), 1
+        )
+    elif action in ("pre_remove", "pre_clear"):
+        # Removal of links that do not exist is not an error, count real ones
+        instance._removed_genre_counts = get_linked_genre_counts(
+            instance, reverse, pk_set if action == "pre_remove" else None
+        )
+    elif action in ("post_remove", "post_clear"):
+        adjust_genre_counts(getattr(instance, "_removed_genre_counts", Counter()), -1)
+
+
+@receiver(pre_delete, sender=Movie)
+def collect_movie_genres(instance: Movie, **kwargs) -> None:
+    # Links are deleted by cascade, without m2m_changed
+    instance._removed_genre_counts = get_linked_genre_counts(instance, False, None)
+
+
+@receiver(post_delete, sender=Movie)
+def movie_deleted(instance: Movie, **kwargs) -> None:
+    adjust_genre_counts(getattr(instance, "_removed_genre_counts", Counter()), -1)
+
+
+@receiver(pre_delete, sender=Movie)
+def collect_listing_movies(instance: Movie, **kwargs) -> None:
+    instance._listing_movie_ids = set(
+        RelatedMovie.objects.filter(related=instance).values_list("movie_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Movie)
+def refresh_listing_movies(instance: Movie, **kwargs) -> None:
+    """Movies that listed the deleted one are one related movie short"""
+    refresh_related_movies(getattr(instance, "_listing_movie_ids", set()))
@@ -0,0 +1,94 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.benchmarks.seed import seed_movies
+from api.models import Movie, Person
+from api.pagination import EstimatedCountPaginator, get_table_estimate
+from api.tests.utils import analyze, create_movie
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.short = create_movie("Ocean Drive", duration=80)
+        cls.long = create_movie("Under The Ocean", duration=130)
+        Person.objects.bulk_create(
+            Person(first_name=f"Name {index}", last_name="Doe", types="actor")
+            for index in range(50)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_titles(self, params: dict) -> list[str]:
+        response = self.client.get(reverse("admin:api_movie_changelist"), params)
+        return [str(movie) for movie in response.context["cl"].result_list]
+
+    def test_search_matches_title_start(self):
+        self.assertEqual(self.get_titles({"q": "ocean"}), ["Ocean Drive"])
+
+    def test_duration_filter(self):
+        self.assertEqual(self.get_titles({"duration": "short"}), ["Ocean Drive"])
+        self.assertEqual(self.get_titles({"duration": "long"}), ["Under The Ocean"])
+        self.assertEqual(self.get_titles({"duration": "epic"}), [])
+
+    def test_filtered_changelist_counts_once(self):
+        with CaptureQueriesContext(connection) as context:
+            self.get_titles({"q": "ocean"})
+
+        counts = [
+            query["sql"]
+            for query in context.captured_queries
+            if "COUNT(" in query["sql"] and "api_movie" in query["sql"]
+        ]
+        self.assertEqual(len(counts), 1)
+
+    def test_change_form_uses_autocomplete(self):
+        response = self.client.get(
+            reverse("admin:api_movie_change", args=[self.short.id])
+        )
+
+        for field in ("genres", "directors", "writers", "stars"):
+            self.assertContains(response, f'data-field-name="{field}"', count=1)
+        self.assertNotContains(response, "Name 0 Doe")
+
+
+@skipUnless(connection.vendor in ("sqlite", "postgresql"), "planner statistics")
+class EstimatedCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_movies(300)
+        analyze()
+        # Statistics lag behind writes until the next ANALYZE
+        create_movie("Unanalyzed")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        analyze()
+
+    def test_table_estimate(self):
+        self.assertEqual(get_table_estimate(Movie, "default"), 300)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=100)
+    def test_unfiltered_count_is_estimated(self):
+        paginator = EstimatedCountPaginator(Movie.objects.all(), 10)
+
+        self.assertEqual(paginator.count, 300)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=100)
+    def test_filtered_count_is_exact(self):
+        paginator = EstimatedCountPaginator(Movie.objects.filter(duration=100), 10)
+
+        self.assertEqual(paginator.count, Movie.objects.filter(duration=100).count())
+
+    def test_small_tables_are_counted(self):
+        paginator = EstimatedCountPaginator(Movie.objects.all(), 10)
+
+        self.assertEqual(paginator.count, 301)
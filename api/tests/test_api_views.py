@@ -1,9 +1,10 @@
-from decimal import Decimal
-
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from api.models import Genre, Movie
+from api.models import Genre, Movie, Person
+from api.tests.utils import create_movie
 
 
 class ViewsTests(TestCase):
@@ -11,25 +12,11 @@ class ViewsTests(TestCase):
 
     @classmethod
     def setUpClass(cls) -> None:
-        Genre.objects.create(title="GenreTest")
-        Genre.objects.create(title="TestName")
-        Movie.objects.create(
-            title="TitleTest",
-            description="Test",
-            release_year=2015,
-            mpa_rating=Movie.MPARating.G,
-            imdb_rating=Decimal("7.5"),
-            duration=15,
-        )
+        cls.genre1 = Genre.objects.create(title="GenreTest")
+        cls.genre2 = Genre.objects.create(title="TestName")
+        cls.movie1 = create_movie("TitleTest", duration=15)
 
-        Movie.objects.create(
-            title="TestTitle",
-            description="Test",
-            release_year=2015,
-            mpa_rating=Movie.MPARating.G,
-            imdb_rating=Decimal("7.5"),
-            duration=15,
-        )
+        cls.movie2 = create_movie("TestTitle", duration=15)
 
     @classmethod
     def tearDownClass(cls):
@@ -47,10 +34,10 @@ class ViewsTests(TestCase):
         self.assertJSONEqual(response.content, check_data)
 
     def test_movie_details(self):
-        response = self.client.get(reverse("api:movie_detail", args=[1]))
+        response = self.client.get(reverse("api:movie_detail", args=[self.movie1.id]))
 
         check_data = {
-            "id": 1,
+            "id": self.movie1.id,
             "title": "TitleTest",
             "description": "Test",
             "release_year": 2015,
@@ -59,6 +46,8 @@ class ViewsTests(TestCase):
             "duration": 15,
             "poster": "",
             "bg_picture": "",
+            "poster_images": {},
+            "bg_picture_images": {},
             "genres": [],
             "directors": [],
             "writers": [],
@@ -79,9 +68,10 @@ class ViewsTests(TestCase):
         check_data = {
             "pages": 1,
             "total": 2,
+            "total_is_estimate": False,
             "results": [
                 {
-                    "id": 1,
+                    "id": self.movie1.id,
                     "title": "TitleTest",
                     "description": "Test",
                     "release_year": 2015,
@@ -90,13 +80,15 @@ class ViewsTests(TestCase):
                     "duration": 15,
                     "poster": "",
                     "bg_picture": "",
+                    "poster_images": {},
+                    "bg_picture_images": {},
                     "genres": [],
                     "directors": [],
                     "writers": [],
                     "stars": [],
                 },
                 {
-                    "id": 2,
+                    "id": self.movie2.id,
                     "title": "TestTitle",
                     "description": "Test",
                     "release_year": 2015,
@@ -105,6 +97,8 @@ class ViewsTests(TestCase):
                     "duration": 15,
                     "poster": "",
                     "bg_picture": "",
+                    "poster_images": {},
+                    "bg_picture_images": {},
                     "genres": [],
                     "directors": [],
                     "writers": [],
@@ -132,9 +126,10 @@ class ViewsTests(TestCase):
         check_data = {
             "pages": 1,
             "total": 1,
+            "total_is_estimate": False,
             "results": [
                 {
-                    "id": 1,
+                    "id": self.movie1.id,
                     "title": "TitleTest",
                     "description": "Test",
                     "release_year": 2015,
@@ -143,6 +138,8 @@ class ViewsTests(TestCase):
                     "duration": 15,
                     "poster": "",
                     "bg_picture": "",
+                    "poster_images": {},
+                    "bg_picture_images": {},
                     "genres": [],
                     "directors": [],
                     "writers": [],
@@ -168,11 +165,11 @@ class ViewsTests(TestCase):
         self.assertJSONEqual(response.content, {"error": ["src__invalid"]})
 
     def test_filter_by_genre_id(self):
-        movie1 = Movie.objects.get(id=1)
-        movie2 = Movie.objects.get(id=2)
+        movie1 = Movie.objects.get(id=self.movie1.id)
+        movie2 = Movie.objects.get(id=self.movie2.id)
 
-        genre1 = Genre.objects.get(id=1)
-        genre2 = Genre.objects.get(id=2)
+        genre1 = Genre.objects.get(id=self.genre1.id)
+        genre2 = Genre.objects.get(id=self.genre2.id)
 
         movie1.genres.add(genre1)
         movie2.genres.add(genre2)
@@ -180,14 +177,17 @@ class ViewsTests(TestCase):
         movie1.save()
         movie2.save()
 
-        response = self.client.get(reverse("api:movies_list"), {"genre_id": "1,2"})
+        response = self.client.get(
+            reverse("api:movies_list"), {"genre_id": f"{genre1.id},{genre2.id}"}
+        )
 
         check_data = {
             "pages": 1,
             "total": 1,
+            "total_is_estimate": False,
             "results": [
                 {
-                    "id": 2,
+                    "id": self.movie2.id,
                     "title": "TestTitle",
                     "description": "Test",
                     "release_year": 2015,
@@ -196,7 +196,9 @@ class ViewsTests(TestCase):
                     "duration": 15,
                     "poster": "",
                     "bg_picture": "",
-                    "genres": [{"id": 2, "title": "TestName"}],
+                    "poster_images": {},
+                    "bg_picture_images": {},
+                    "genres": [{"id": genre2.id, "title": "TestName"}],
                     "directors": [],
                     "writers": [],
                     "stars": [],
@@ -221,3 +223,121 @@ class ViewsTests(TestCase):
         response = self.client.get(reverse("api:movies_list"), {"genre_id": "100,2"})
 
         self.assertJSONEqual(response.content, {"error": ["genre__invalid"]})
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class MovieQueryCountTests(TestCase):
+    @staticmethod
+    def create_movies(count: int) -> None:
+        genre = Genre.objects.create(title="Genre")
+        person = Person.objects.create(
+            first_name="First", last_name="Last", types=Person.PersonStatus.ACTOR
+        )
+        for index in range(count):
+            movie = create_movie(f"Movie {index}", duration=15)
+            movie.genres.add(genre)
+            movie.directors.add(person)
+            movie.writers.add(person)
+            movie.stars.add(person)
+
+    def count_list_queries(self) -> int:
+        # Warm the reference cache, genres and persons are then not queried
+        self.client.get(reverse("api:movies_list"))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("api:movies_list"))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    @override_settings(NUM_OF_INSTANCES_ON_PAGE=20)
+    def test_movie_list_query_count_does_not_grow_with_page_size(self):
+        self.create_movies(2)
+        small_page_queries = self.count_list_queries()
+
+        self.create_movies(18)
+        full_page_queries = self.count_list_queries()
+
+        self.assertEqual(small_page_queries, full_page_queries)
+
+    def test_movie_list_relations_are_serialized(self):
+        self.create_movies(1)
+
+        response = self.client.get(reverse("api:movies_list"))
+        result = response.json()["results"][0]
+
+        self.assertEqual(result["genres"][0]["title"], "Genre")
+        for relation in ("directors", "writers", "stars"):
+            self.assertEqual(
+                result[relation],
+                [
+                    {
+                        "id": result[relation][0]["id"],
+                        "first_name": "First",
+                        "last_name": "Last",
+                    }
+                ],
+            )
+
+    def test_movie_detail_query_count(self):
+        self.create_movies(1)
+        movie = Movie.objects.get()
+        # Warm the reference cache, genres and persons are then not queried
+        self.client.get(reverse("api:movie_detail", args=[movie.id]))
+
+        # Last-Modified lookup, the movie and its four relations
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("api:movie_detail", args=[movie.id]))
+
+        self.assertEqual(len(response.json()["stars"]), 1)
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class MovieCursorPaginationTests(TestCase):
+    def setUp(self):
+        for index in range(7):
+            create_movie(f"Movie {index}", duration=15)
+
+    def test_cursor_pages_cover_all_movies_in_order(self):
+        expected_ids = list(
+            Movie.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        ids = []
+        cursor = ""
+        while cursor is not None:
+            response = self.client.get(
+                reverse("api:movies_list"), {"cursor": cursor}
+            ).json()
+            ids.extend(movie["id"] for movie in response["results"])
+            cursor = response["next_cursor"]
+
+        self.assertEqual(ids, expected_ids)
+
+    def test_cursor_page_query_count_does_not_depend_on_depth(self):
+        first_page = self.client.get(reverse("api:movies_list"), {"cursor": ""})
+
+        with CaptureQueriesContext(connection) as first_context:
+            self.client.get(reverse("api:movies_list"), {"cursor": ""})
+        with CaptureQueriesContext(connection) as deep_context:
+            self.client.get(
+                reverse("api:movies_list"),
+                {"cursor": first_page.json()["next_cursor"]},
+            )
+
+        self.assertEqual(
+            len(first_context.captured_queries), len(deep_context.captured_queries)
+        )
+        self.assertFalse(
+            any("COUNT" in query["sql"] for query in deep_context.captured_queries)
+        )
+
+    def test_cursor_with_total(self):
+        response = self.client.get(
+            reverse("api:movies_list"), {"cursor": "", "with_total": 1}
+        )
+
+        self.assertEqual(response.json()["total"], 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("api:movies_list"), {"cursor": "invalid"})
+
+        self.assertJSONEqual(response.content, {"error": ["cursor__invalid"]})
@@ -0,0 +1,137 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.test import (
+    AsyncRequestFactory,
+    RequestFactory,
+    TestCase,
+    override_settings,
+)
+
+from api import async_views, views
+from api.models import Genre, Person
+from api.read_model import rebuild_movie_cards
+from api.tests.utils import create_movie
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None}, NUM_OF_INSTANCES_ON_PAGE=2)
+class AsyncViewsTests(TestCase):
+    """Async views must answer byte for byte like the sync ones"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.drama = Genre.objects.create(title="Drama")
+        cls.comedy = Genre.objects.create(title="Comedy")
+        cls.director = director = Person.objects.create(
+            first_name="Jane", last_name="Doe", types=Person.PersonStatus.DIRECTOR
+        )
+        for index, title in enumerate(("Ocean Drive", "Quiet Night", "Star Ocean")):
+            movie = create_movie(
+                title, description=f"Story number {index}", duration=15 + index
+            )
+            movie.genres.add(cls.drama if index % 2 else cls.comedy)
+            movie.directors.add(director)
+        cls.movie = movie
+
+    async def assertSameResponse(self, sync_view, async_view, path, **kwargs):
+        sync_response = await sync_to_async(sync_view)(
+            RequestFactory().get(path), **kwargs
+        )
+        async_response = await async_view(AsyncRequestFactory().get(path), **kwargs)
+
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+
+    async def test_genre_list(self):
+        for path in ("/", "/?with_counts=1"):
+            await self.assertSameResponse(
+                views.genre_list_view, async_views.genre_list_view, path
+            )
+
+    async def test_movie_detail(self):
+        for pk in (self.movie.pk, 0):
+            await self.assertSameResponse(
+                views.movie_detail_view, async_views.movie_detail_view, "/", pk=pk
+            )
+
+    async def test_movie_list(self):
+        paths = (
+            "/",
+            "/?page=2",
+            "/?page=3",
+            "/?page=x",
+            f"/?genre_id={self.drama.id}",
+            "/?genre_id=999",
+            "/?genre_id=x",
+            "/?src=Ocean",
+            "/?src=?",
+            "/?q=ocean",
+            "/?q=ocean&search_mode=prefix",
+            "/?q=ocean&search_mode=x",
+            "/?cursor=&with_total=1",
+            "/?cursor=bad",
+            "/?q=ocean&cursor=",
+            "/?year_min=3000",
+            "/?facets=genres,mpa_rating",
+            "/?cursor=&genres_match=all&facets=genres",
+            "/?facets=x",
+        )
+        for path in paths:
+            with self.subTest(path=path):
+                await self.assertSameResponse(
+                    views.movie_list_view, async_views.movie_list_view, path
+                )
+
+    async def test_movie_related(self):
+        for path in ("/", "/?limit=1&view=full", "/?limit=0", "/?fields=x"):
+            for pk in (self.movie.pk, 0):
+                with self.subTest(path=path, pk=pk):
+                    await self.assertSameResponse(
+                        views.movie_related_view,
+                        async_views.movie_related_view,
+                        path,
+                        pk=pk,
+                    )
+
+    async def test_persons(self):
+        for path in ("/", "/?types=director", "/?types=x", "/?page=2"):
+            with self.subTest(path=path):
+                await self.assertSameResponse(
+                    views.person_list_view, async_views.person_list_view, path
+                )
+
+        for path in ("/", "/?role=director", "/?role=x", "/?page=x", "/?page=2"):
+            for pk in (self.director.pk, 0):
+                with self.subTest(path=path, pk=pk):
+                    await self.assertSameResponse(
+                        views.person_detail_view,
+                        async_views.person_detail_view,
+                        path,
+                        pk=pk,
+                    )
+
+    async def test_movie_list_next_cursor(self):
+        first = await async_views.movie_list_view(
+            AsyncRequestFactory().get("/?cursor=")
+        )
+        next_cursor = json.loads(first.content)["next_cursor"]
+
+        await self.assertSameResponse(
+            views.movie_list_view,
+            async_views.movie_list_view,
+            f"/?cursor={next_cursor}",
+        )
+
+    @override_settings(API_SERVE_FROM_READ_MODEL=True)
+    async def test_read_model(self):
+        await sync_to_async(rebuild_movie_cards)()
+
+        await self.assertSameResponse(
+            views.movie_list_view, async_views.movie_list_view, "/?src=Star"
+        )
+        await self.assertSameResponse(
+            views.movie_detail_view,
+            async_views.movie_detail_view,
+            "/",
+            pk=self.movie.pk,
+        )
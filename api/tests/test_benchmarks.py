@@ -0,0 +1,78 @@
+from django.test import SimpleTestCase, TestCase
+
+from api.benchmarks import compare_results
+from api.benchmarks.endpoints import run
+from api.benchmarks.seed import seed_catalog
+from api.models import Movie
+
+
+class CompareResultsTests(SimpleTestCase):
+    baseline = [
+        {
+            "size": 100,
+            "case": "list",
+            "queries": 5,
+            "median_ms": 10.0,
+            "p99_ms": 1.0,
+            "peak_memory_kb": 50.0,
+        },
+        {"size": 100, "concurrency": 8, "wsgi_requests_per_s": 400.0},
+    ]
+
+    def test_within_threshold(self):
+        current = [
+            {**self.baseline[0], "median_ms": 11.9, "peak_memory_kb": 59.0},
+            {**self.baseline[1], "wsgi_requests_per_s": 330.0},
+        ]
+
+        self.assertEqual(compare_results(self.baseline, current, 0.2), [])
+
+    def test_regressions(self):
+        current = [
+            {**self.baseline[0], "queries": 6, "median_ms": 12.5},
+            {**self.baseline[1], "wsgi_requests_per_s": 300.0},
+        ]
+
+        self.assertEqual(
+            compare_results(self.baseline, current, 0.2),
+            [
+                "size=100 case=list queries: 5 -> 6",
+                "size=100 case=list median_ms: 10.0 -> 12.5",
+                "size=100 case=None wsgi_requests_per_s: 400.0 -> 300.0",
+            ],
+        )
+
+    def test_small_timings_are_noise(self):
+        current = [{**self.baseline[0], "p99_ms": 1.4}]
+
+        self.assertEqual(compare_results(self.baseline, current, 0.2), [])
+
+    def test_unmatched_results_are_ignored(self):
+        current = [{**self.baseline[0], "size": 1000, "queries": 50}]
+
+        self.assertEqual(compare_results(self.baseline, current, 0.2), [])
+
+
+class SeedTests(TestCase):
+    def test_catalog_is_deterministic(self):
+        def snapshot():
+            return [
+                (movie.title, movie.release_year, len(movie.stars.all()))
+                for movie in Movie.objects.prefetch_related("stars").order_by("id")
+            ]
+
+        seed_catalog(30)
+        first = snapshot()
+        Movie.objects.all().delete()
+        seed_catalog(30)
+
+        self.assertEqual(snapshot(), first)
+        self.assertTrue(all(3 <= stars <= 8 for _, _, stars in first))
+
+
+class EndpointsBenchmarkTests(TestCase):
+    def test_every_case_succeeds(self):
+        results = run(sizes=[20], repeat=1)
+
+        self.assertEqual({result["status"] for result in results}, {200})
+        self.assertIn("detail", {result["case"] for result in results})
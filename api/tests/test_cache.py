@@ -0,0 +1,122 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from api.cache import LocalResponseCache, clear_response_cache
+from api.models import Genre
+from api.tests.utils import create_movie
+
+
+class LocalResponseCacheTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        response_cache = LocalResponseCache(timeout=60, max_entries=2)
+
+        response_cache.set("first", 1)
+        response_cache.set("second", 2)
+        response_cache.get("first")
+        response_cache.set("third", 3)
+
+        self.assertEqual(response_cache.get("first"), 1)
+        self.assertIsNone(response_cache.get("second"))
+        self.assertEqual(response_cache.get("third"), 3)
+
+    def test_expired_entry_is_not_returned(self):
+        response_cache = LocalResponseCache(timeout=60, max_entries=2)
+
+        with mock.patch("api.cache.time.monotonic", return_value=0):
+            response_cache.set("key", 1)
+        with mock.patch("api.cache.time.monotonic", return_value=61):
+            self.assertIsNone(response_cache.get("key"))
+
+
+class ResponseCacheViewsTests(TestCase):
+    def setUp(self):
+        clear_response_cache()
+        self.movie = create_movie("Movie")
+
+    def test_repeated_request_is_served_from_cache(self):
+        first = self.client.get(reverse("api:movies_list"), {"page": 1})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("api:movies_list"), {"page": 1})
+
+        self.assertEqual(first.content, second.content)
+
+    def test_different_query_is_not_shared(self):
+        create_movie("Other")
+        self.client.get(reverse("api:movies_list"))
+
+        response = self.client.get(reverse("api:movies_list"), {"src": "mo"})
+
+        self.assertEqual(response.json()["total"], 1)
+
+    def test_errors_are_not_cached(self):
+        response = self.client.get(reverse("api:movies_list"), {"page": ""})
+        self.assertEqual(response.json(), {"error": ["page__invalid"]})
+
+        response = self.client.get(reverse("api:movies_list"))
+
+        self.assertEqual(response.json()["total"], 1)
+
+    def test_empty_cursor_is_not_shared_with_offset_pages(self):
+        self.client.get(reverse("api:movies_list"), {"cursor": ""})
+
+        response = self.client.get(reverse("api:movies_list"))
+
+        self.assertNotIn("next_cursor", response.json())
+        self.assertEqual(response.json()["pages"], 1)
+
+    def test_values_are_not_stripped(self):
+        create_movie("Abc")
+        self.assertEqual(
+            self.client.get(reverse("api:movies_list"), {"src": " Ab"}).json()["total"],
+            2,
+        )
+
+        response = self.client.get(reverse("api:movies_list"), {"src": "Ab"})
+
+        self.assertEqual(response.json()["total"], 1)
+
+    def test_movie_save_invalidates_cached_detail(self):
+        url = reverse("api:movie_detail", args=[self.movie.id])
+        self.client.get(url)
+
+        self.movie.title = "Changed"
+        self.movie.save()
+
+        self.assertEqual(self.client.get(url).json()["title"], "Changed")
+
+    def test_relation_change_invalidates_cached_list(self):
+        self.client.get(reverse("api:movies_list"))
+
+        genre = Genre.objects.create(title="Genre")
+        self.movie.genres.add(genre)
+
+        response = self.client.get(reverse("api:movies_list"))
+        self.assertEqual(
+            response.json()["results"][0]["genres"],
+            [{"id": genre.id, "title": "Genre"}],
+        )
+
+    def test_genre_change_invalidates_cached_genre_list(self):
+        self.client.get(reverse("api:genres_list"))
+
+        Genre.objects.create(title="Genre")
+
+        self.assertEqual(len(self.client.get(reverse("api:genres_list")).json()), 1)
+
+    @override_settings(
+        API_RESPONSE_CACHE={
+            "BACKEND": "django",
+            "TIMEOUT": 60,
+            "CACHE_ALIAS": "default",
+        }
+    )
+    def test_django_cache_backend(self):
+        self.client.get(reverse("api:genres_list"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("api:genres_list"))
+
+        self.assertEqual(response.json(), [])
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.cache import cache_response
+from api.coalescing import SingleFlight
+
+# Long enough for followers to join before the leader lands
+JOIN_DELAY = 0.2
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def compute(self) -> int:
+        self.calls += 1
+        self.release.wait(5)
+        return self.calls
+
+    def run_threads(self, count: int, func) -> list:
+        with ThreadPoolExecutor(count) as executor:
+            futures = [executor.submit(func) for _ in range(count)]
+            threading.Timer(JOIN_DELAY, self.release.set).start()
+            return [future.result() for future in futures]
+
+    def test_threads_share_one_computation(self):
+        results = self.run_threads(5, lambda: self.flights.do("key", self.compute, 5))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual([result for result, _ in results], [1] * 5)
+        self.assertEqual(sum(rendered for _, rendered in results), 1)
+        self.assertEqual(len(self.flights), 0)
+
+    def test_errors_are_shared(self):
+        def fail():
+            self.calls += 1
+            self.release.wait(5)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                self.flights.do("key", fail, 5)
+            except ValueError:
+                return "error"
+
+        self.assertEqual(self.run_threads(3, call), ["error"] * 3)
+        self.assertEqual(self.calls, 1)
+
+    def test_followers_compute_after_timeout(self):
+        results = self.run_threads(
+            2, lambda: self.flights.do("key", self.compute, 0.01)
+        )
+
+        self.assertEqual(self.calls, 2)
+        self.assertTrue(all(rendered for _, rendered in results))
+
+    def test_tasks_and_threads_share_one_computation(self):
+        async def compute() -> int:
+            self.calls += 1
+            await asyncio.sleep(JOIN_DELAY)
+            return self.calls
+
+        async def main():
+            thread_result = asyncio.to_thread(
+                lambda: self.flights.do("key", self.compute, 5)
+            )
+            return await asyncio.gather(
+                *(self.flights.ado("key", compute, 5) for _ in range(3)),
+                thread_result,
+            )
+
+        self.release.set()
+        results = asyncio.run(main())
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual([result for result, _ in results], [1] * 4)
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class CoalescedViewTests(SimpleTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+        @cache_response(query_params=("q",))
+        def view(request):
+            self.calls += 1
+            self.release.wait(5)
+            return HttpResponse(f"call {self.calls}")
+
+        self.view = view
+
+    def get_responses(self, paths: list[str]) -> list[HttpResponse]:
+        with ThreadPoolExecutor(len(paths)) as executor:
+            futures = [
+                executor.submit(self.view, RequestFactory().get(path)) for path in paths
+            ]
+            threading.Timer(JOIN_DELAY, self.release.set).start()
+            return [future.result() for future in futures]
+
+    def test_identical_requests_are_coalesced(self):
+        responses = self.get_responses(["/?q=a"] * 4 + ["/?q=b"])
+
+        self.assertEqual(self.calls, 2)
+        contents = {response.content for response in responses[:4]}
+        self.assertEqual(len(contents), 1)
+        # Followers get their own response objects
+        self.assertEqual(len({id(response) for response in responses}), 5)
+
+    @override_settings(API_COALESCE_REQUESTS={"ENABLED": False, "TIMEOUT": 10})
+    def test_disabled(self):
+        self.get_responses(["/?q=a"] * 3)
+
+        self.assertEqual(self.calls, 3)
@@ -0,0 +1,81 @@
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from api import async_views
+from api.cache import clear_response_cache
+from api.models import Genre
+from api.tests.utils import create_movie
+
+
+class ConditionalRequestsTests(TestCase):
+    def setUp(self):
+        clear_response_cache()
+        self.genre = Genre.objects.create(title="Drama")
+        self.movie = create_movie("Movie")
+
+    def test_matching_etag_is_answered_without_queries(self):
+        url = reverse("api:genres_list")
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response["Cache-Control"], "public, max-age=60")
+
+    def test_etag_depends_on_query(self):
+        url = reverse("api:movies_list")
+
+        self.assertNotEqual(
+            self.client.get(url)["ETag"], self.client.get(url, {"src": "Mo"})["ETag"]
+        )
+        self.assertNotEqual(
+            self.client.get(url)["ETag"], self.client.get(url, {"cursor": ""})["ETag"]
+        )
+        self.assertEqual(
+            self.client.get(url, {"page": "1"})["ETag"],
+            self.client.get(url, {"page": "1"})["ETag"],
+        )
+
+    def test_relation_change_updates_validators(self):
+        url = reverse("api:movie_detail", args=[self.movie.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.movie.genres.add(self.genre)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["genres"][0]["title"], "Drama")
+
+    def test_if_modified_since(self):
+        url = reverse("api:movie_detail", args=[self.movie.id])
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        modified = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 2015 00:00:00 GMT"
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(modified.status_code, 200)
+
+    @override_settings(API_CACHE_CONTROL={"movie_detail": {"max_age": 5}})
+    def test_cache_control_is_configurable_per_endpoint(self):
+        detail = self.client.get(reverse("api:movie_detail", args=[self.movie.id]))
+        genres = self.client.get(reverse("api:genres_list"))
+
+        self.assertEqual(detail["Cache-Control"], "max-age=5")
+        self.assertNotIn("Cache-Control", genres)
+
+    async def test_async_view_answers_not_modified(self):
+        response = await async_views.genre_list_view(AsyncRequestFactory().get("/"))
+
+        not_modified = await async_views.genre_list_view(
+            AsyncRequestFactory().get("/", **{"If-None-Match": response["ETag"]})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(not_modified.status_code, 304)
@@ -0,0 +1,173 @@
+from unittest import skipUnless
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import (
+    AsyncRequestFactory,
+    RequestFactory,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api import async_views, views
+from api.benchmarks.seed import seed_movies
+from api.counting import count_movies, get_plan_estimate
+from api.models import Movie
+from api.tests.utils import analyze, create_movie
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class CountOnceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(3):
+            create_movie(f"Movie {index}")
+
+    def setUp(self):
+        # Cached counts outlive the rollback of the catalog between tests
+        cache.clear()
+
+    def get_counts(self, params: dict) -> tuple[dict, int]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("api:movies_list"), params)
+        counts = sum("COUNT(" in query["sql"] for query in context.captured_queries)
+        return response.json(), counts
+
+    def test_filtered_set_is_counted_once(self):
+        data, counts = self.get_counts({"year_min": 2000})
+
+        self.assertEqual((data["total"], data["total_is_estimate"]), (3, False))
+        self.assertEqual(counts, 1)
+
+    def test_counts_are_cached_per_catalog_version(self):
+        params = {"year_min": 2000, "page": 1}
+        self.get_counts(params)
+
+        _, counts = self.get_counts({**params, "page": 2})
+        self.assertEqual(counts, 0)
+
+        create_movie("Movie 3")
+        data, counts = self.get_counts(params)
+        self.assertEqual((data["total"], counts), (4, 1))
+
+    def test_cursor_total(self):
+        data, _ = self.get_counts({"cursor": "", "with_total": 1})
+
+        self.assertEqual((data["total"], data["total_is_estimate"]), (3, False))
+
+    def test_no_plan_estimates_without_postgres(self):
+        if connection.vendor != "postgresql":
+            self.assertIsNone(get_plan_estimate(Movie.objects.filter(id__gt=0)))
+
+
+@skipUnless(connection.vendor in ("sqlite", "postgresql"), "planner statistics")
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None}, ESTIMATED_COUNT_THRESHOLD=100)
+class EstimatedTotalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_movies(300)
+        analyze()
+        # Statistics lag behind writes until the next ANALYZE
+        create_movie("Unanalyzed")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        analyze()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unfiltered_total_is_estimated(self):
+        data = self.client.get(reverse("api:movies_list")).json()
+
+        self.assertEqual((data["total"], data["total_is_estimate"]), (300, True))
+
+    def test_filtered_total_is_exact(self):
+        movies = Movie.objects.filter(title="Unanalyzed")
+
+        self.assertEqual(count_movies(movies), (1, False))
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_small_totals_are_exact(self):
+        data = self.client.get(reverse("api:movies_list")).json()
+
+        self.assertEqual((data["total"], data["total_is_estimate"]), (301, False))
+
+    def get_page(self, page: int) -> dict:
+        return self.client.get(reverse("api:movies_list"), {"page": page}).json()
+
+    @override_settings(NUM_OF_INSTANCES_ON_PAGE=10)
+    def test_pages_past_the_estimate(self):
+        for index in range(19):
+            create_movie(f"Late {index}")
+
+        # 320 movies, statistics still say 300
+        data = self.get_page(31)
+        self.assertEqual(len(data["results"]), 10)
+        self.assertTrue(data["total_is_estimate"])
+
+        data = self.get_page(32)
+        self.assertEqual(len(data["results"]), 10)
+        self.assertEqual((data["total"], data["total_is_estimate"]), (320, False))
+
+        self.assertEqual(self.get_page(33), {"error": ["page__out_of_bounds"]})
+
+    @override_settings(NUM_OF_INSTANCES_ON_PAGE=10)
+    def test_pages_short_of_the_estimate(self):
+        Movie.objects.filter(id__in=Movie.objects.values("id")[:100]).delete()
+
+        # 201 movies, statistics still say 300
+        data = self.get_page(21)
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual((data["total"], data["total_is_estimate"]), (201, False))
+
+        self.assertEqual(self.get_page(25), {"error": ["page__out_of_bounds"]})
+
+    @override_settings(NUM_OF_INSTANCES_ON_PAGE=10)
+    async def test_async_pages_match(self):
+        for page in (1, 31, 32):
+            request = f"/?page={page}"
+            sync_response = await sync_to_async(views.movie_list_view)(
+                RequestFactory().get(request)
+            )
+            async_response = await async_views.movie_list_view(
+                AsyncRequestFactory().get(request)
+            )
+            self.assertEqual(async_response.content, sync_response.content)
+
+
+@skipUnless(connection.vendor == "postgresql", "PostgreSQL planner estimates")
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None}, ESTIMATED_COUNT_THRESHOLD=100)
+class PlanEstimateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_movies(500)
+        analyze()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        analyze()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_plan_estimate(self):
+        estimate = get_plan_estimate(Movie.objects.filter(release_year__gte=0))
+
+        self.assertEqual(estimate, 500)
+
+    def test_filtered_total_is_estimated(self):
+        create_movie("Unanalyzed")
+
+        data = self.client.get(reverse("api:movies_list"), {"year_min": 0}).json()
+        self.assertEqual((data["total"], data["total_is_estimate"]), (500, True))
+
+    def test_selective_filter_is_counted(self):
+        movies = Movie.objects.filter(title="Unanalyzed")
+
+        self.assertEqual(count_movies(movies), (0, False))
@@ -0,0 +1,106 @@
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.test import SimpleTestCase
+
+from api.backends.postgresql_pool.base import DatabaseWrapper
+from api.backends.postgresql_pool.pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.closed = False
+        self.healthy = True
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def connect(self) -> FakeConnection:
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def make_pool(self, **kwargs) -> ConnectionPool:
+        return ConnectionPool(
+            self.connect, lambda connection: connection.healthy, **kwargs
+        )
+
+    def test_connections_are_reused(self):
+        pool = self.make_pool(max_size=2)
+
+        first = pool.getconn()
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_size_is_bounded(self):
+        pool = self.make_pool(max_size=1, timeout=0.01)
+        pool.getconn()
+
+        with self.assertRaises(OperationalError):
+            pool.getconn()
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        connection = pool.getconn()
+        threading.Timer(0.05, pool.putconn, [connection]).start()
+
+        self.assertIs(pool.getconn(), connection)
+
+    def test_broken_connections_are_replaced(self):
+        pool = self.make_pool(max_size=1)
+        broken = pool.getconn()
+        pool.putconn(broken)
+        broken.healthy = False
+
+        self.assertIsNot(pool.getconn(), broken)
+        self.assertTrue(broken.closed)
+
+    def test_unreusable_and_expired_connections_are_closed(self):
+        pool = self.make_pool(max_size=2, max_idle=0)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first, reusable=False)
+        pool.putconn(second)
+
+        self.assertIsNot(pool.getconn(), second)
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+
+    def test_failed_connect_frees_slot(self):
+        pool = ConnectionPool(
+            lambda: 1 / 0, lambda connection: True, max_size=1, timeout=0.01
+        )
+
+        for _ in range(2):
+            with self.assertRaises(ZeroDivisionError):
+                pool.getconn()
+
+
+class PooledBackendTests(SimpleTestCase):
+    settings_dict = {
+        "NAME": "movies",
+        "USER": "",
+        "PASSWORD": "",
+        "HOST": "",
+        "PORT": "",
+        "OPTIONS": {"pool": {"max_size": 4}},
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": True,
+        "TIME_ZONE": None,
+    }
+
+    def test_pool_options_are_not_passed_to_psycopg2(self):
+        wrapper = DatabaseWrapper(self.settings_dict)
+
+        self.assertEqual(wrapper.get_connection_params(), {"database": "movies"})
+
+    def test_persistent_connections_are_refused(self):
+        with self.assertRaises(ImproperlyConfigured):
+            DatabaseWrapper({**self.settings_dict, "CONN_MAX_AGE": 60})
@@ -0,0 +1,48 @@
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import JsonResponse
+from django.test import TestCase, override_settings
+
+from api.encoding import FastJsonResponse
+from api.models import Movie
+from api.serializers import MOVIE_FIELDS, get_movie_dicts
+from api.tests.utils import create_movie
+
+
+class FastJsonResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for title in ("Ocean Drive", "Żółw"):
+            create_movie(title)
+
+    def get_page(self) -> dict:
+        rows = Movie.objects.order_by("id").values(*MOVIE_FIELDS)
+        return {"pages": 1, "total": 2, "results": get_movie_dicts(rows)}
+
+    def test_same_bytes_as_json_response(self):
+        page = self.get_page()
+
+        self.assertEqual(FastJsonResponse(page).content, JsonResponse(page).content)
+
+    @override_settings(API_JSON_ENCODER="orjson")
+    def test_orjson_encodes_same_data(self):
+        page = self.get_page()
+
+        response = FastJsonResponse(page)
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(response.content), json.loads(JsonResponse(page).content)
+        )
+
+    def test_non_dict_requires_safe_false(self):
+        with self.assertRaises(TypeError):
+            FastJsonResponse([])
+
+        self.assertEqual(FastJsonResponse([], safe=False).content, b"[]")
+
+    @override_settings(API_JSON_ENCODER="yaml")
+    def test_unknown_encoder(self):
+        with self.assertRaises(ImproperlyConfigured):
+            FastJsonResponse({})
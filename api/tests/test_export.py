@@ -0,0 +1,81 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import Genre, Movie
+from api.read_model import rebuild_movie_cards
+from api.tests.utils import create_movie
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2, EXPORT_WATERMARK_LAG=0)
+class MovieExportTests(TestCase):
+    def setUp(self):
+        self.genre = Genre.objects.create(title="Genre")
+        self.movies = [create_movie(f"Movie {index}") for index in range(5)]
+        self.movies[0].genres.add(self.genre)
+
+    def export(self, params: dict = None) -> tuple[list[dict], str]:
+        response = self.client.get(reverse("api:movies_export"), params)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        return [json.loads(line) for line in lines], response["X-Export-Watermark"]
+
+    def test_export_streams_every_movie(self):
+        lines, _ = self.export()
+
+        self.assertEqual(
+            sorted(line["id"] for line in lines),
+            sorted(movie.id for movie in self.movies),
+        )
+        first = next(line for line in lines if line["id"] == self.movies[0].id)
+        self.assertEqual(first["genres"], [{"id": self.genre.id, "title": "Genre"}])
+        self.assertEqual(first["imdb_rating"], "7.50")
+
+    def test_export_lines_match_detail_view(self):
+        lines, _ = self.export()
+
+        for line in lines:
+            detail = self.client.get(reverse("api:movie_detail", args=[line["id"]]))
+            self.assertEqual(line, detail.json())
+
+    def test_incremental_export(self):
+        _, watermark = self.export()
+
+        self.movies[1].title = "Changed"
+        self.movies[1].save()
+        self.movies[2].stars.create(first_name="First", last_name="Last", types="actor")
+
+        lines, _ = self.export({"updated_since": watermark})
+
+        self.assertEqual(
+            [line["id"] for line in lines], [self.movies[1].id, self.movies[2].id]
+        )
+
+    @override_settings(EXPORT_WATERMARK_LAG=60)
+    def test_watermark_covers_late_commits(self):
+        _, watermark = self.export()
+        # Stamped before the export started, committed after it
+        Movie.objects.filter(id=self.movies[3].id).update(
+            updated_at=timezone.now() - timedelta(seconds=30)
+        )
+
+        lines, _ = self.export({"updated_since": watermark})
+
+        self.assertIn(self.movies[3].id, [line["id"] for line in lines])
+
+    @override_settings(API_SERVE_FROM_READ_MODEL=True)
+    def test_export_from_cards(self):
+        rebuild_movie_cards()
+        lines, _ = self.export()
+
+        self.assertEqual(len(lines), 5)
+
+    def test_invalid_updated_since(self):
+        response = self.client.get(
+            reverse("api:movies_export"), {"updated_since": "yesterday"}
+        )
+
+        self.assertJSONEqual(response.content, {"error": ["updated_since__invalid"]})
@@ -0,0 +1,134 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.facets import get_facets, refresh_genre_counts
+from api.models import Genre, Movie
+from api.tests.utils import create_movie
+
+
+class GenreCountsTests(TestCase):
+    def setUp(self):
+        self.drama = Genre.objects.create(title="Drama")
+        self.comedy = Genre.objects.create(title="Comedy")
+        self.first = create_movie("First")
+        self.second = create_movie("Second")
+
+    def get_counts(self) -> tuple[int, int]:
+        self.drama.refresh_from_db()
+        self.comedy.refresh_from_db()
+        return self.drama.movie_count, self.comedy.movie_count
+
+    def test_forward_changes(self):
+        self.first.genres.add(self.drama, self.comedy)
+        self.first.genres.add(self.drama)
+        self.second.genres.add(self.drama)
+        self.assertEqual(self.get_counts(), (2, 1))
+
+        self.first.genres.remove(self.comedy)
+        self.second.genres.remove(self.comedy)
+        self.assertEqual(self.get_counts(), (2, 0))
+
+        self.first.genres.set([self.comedy])
+        self.assertEqual(self.get_counts(), (1, 1))
+
+        self.second.genres.clear()
+        self.assertEqual(self.get_counts(), (0, 1))
+
+    def test_reverse_changes(self):
+        self.drama.movies.add(self.first, self.second)
+        self.assertEqual(self.get_counts(), (2, 0))
+
+        self.drama.movies.remove(self.first)
+        self.drama.movies.remove(self.first)
+        self.assertEqual(self.get_counts(), (1, 0))
+
+        self.drama.movies.clear()
+        self.assertEqual(self.get_counts(), (0, 0))
+
+    def test_movie_delete(self):
+        self.first.genres.add(self.drama, self.comedy)
+        self.second.genres.add(self.drama)
+
+        Movie.objects.filter(id=self.first.id).delete()
+
+        self.assertEqual(self.get_counts(), (1, 0))
+
+    def test_rename_keeps_count(self):
+        genre = Genre.objects.get(id=self.drama.id)
+        self.first.genres.add(self.drama)
+
+        genre.title = "Renamed"
+        genre.save()
+
+        self.assertEqual(self.get_counts(), (1, 0))
+        self.assertEqual(self.drama.title, "Renamed")
+
+    def test_refresh_fixes_bulk_writes(self):
+        Movie.genres.through.objects.bulk_create(
+            [Movie.genres.through(movie_id=self.first.id, genre_id=self.comedy.id)]
+        )
+        self.assertEqual(self.get_counts(), (0, 0))
+
+        refresh_genre_counts()
+
+        self.assertEqual(self.get_counts(), (0, 1))
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class FacetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.drama = Genre.objects.create(title="Drama")
+        cls.comedy = Genre.objects.create(title="Comedy")
+        create_movie("Old", release_year=1980).genres.add(cls.drama)
+        create_movie("Dramedy", mpa_rating=Movie.MPARating.R).genres.add(
+            cls.drama, cls.comedy
+        )
+        create_movie("Comedy", mpa_rating=Movie.MPARating.R).genres.add(cls.comedy)
+
+    def test_genre_list_with_counts(self):
+        response = self.client.get(reverse("api:genres_list"), {"with_counts": "1"})
+
+        self.assertEqual(
+            response.json(),
+            [
+                {"id": self.comedy.id, "title": "Comedy", "movie_count": 2},
+                {"id": self.drama.id, "title": "Drama", "movie_count": 2},
+            ],
+        )
+
+    def test_movie_list_facets(self):
+        response = self.client.get(
+            reverse("api:movies_list"),
+            {"year_min": "2000", "facets": "genres,mpa_rating", "cursor": ""},
+        )
+
+        self.assertEqual(
+            response.json()["facets"],
+            {
+                "genres": [
+                    {"id": self.comedy.id, "title": "Comedy", "count": 2},
+                    {"id": self.drama.id, "title": "Drama", "count": 1},
+                ],
+                "mpa_rating": {"G": 0, "PG": 0, "PG-13": 0, "R": 2, "NC-17": 0},
+            },
+        )
+
+    def test_unfiltered_genre_facet_reads_counts(self):
+        response = self.client.get(reverse("api:movies_list"), {"facets": "genres"})
+
+        self.assertEqual(
+            [genre["count"] for genre in response.json()["facets"]["genres"]], [2, 2]
+        )
+
+    def test_one_query_per_facet(self):
+        movies = Movie.objects.filter(release_year__gte=2000)
+        get_facets(movies, ("genres",))
+
+        with self.assertNumQueries(2):
+            get_facets(movies, ("genres", "mpa_rating"))
+
+    def test_invalid_facet(self):
+        response = self.client.get(reverse("api:movies_list"), {"facets": "stars"})
+
+        self.assertJSONEqual(response.content, {"error": ["facets__invalid"]})
@@ -0,0 +1,118 @@
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.fieldsets import parse_fieldset
+from api.filters import InvalidFilter
+from api.models import Genre, Person
+from api.read_model import rebuild_movie_cards
+from api.references import GENRES
+from api.serializers import CARD_FIELDS, MOVIE_OUTPUT_FIELDS
+from api.tests.utils import create_movie
+
+
+class ParseFieldsetTests(TestCase):
+    def parse(self, query: str, default_view: str = "full") -> tuple[str, ...]:
+        return parse_fieldset(QueryDict(query), default_view)
+
+    def test_views_and_fields(self):
+        self.assertEqual(self.parse(""), MOVIE_OUTPUT_FIELDS)
+        self.assertEqual(self.parse("", "card"), CARD_FIELDS)
+        self.assertEqual(self.parse("view=full", "card"), MOVIE_OUTPUT_FIELDS)
+        self.assertEqual(self.parse("fields=stars,title"), ("id", "title", "stars"))
+        self.assertEqual(
+            self.parse("view=card&include=description"),
+            ("id", "title", "description", *CARD_FIELDS[2:]),
+        )
+
+    def test_invalid(self):
+        for query, code in (
+            ("view=tiny", "view__invalid"),
+            ("fields=title,rank", "fields__invalid"),
+            ("include=card", "include__invalid"),
+        ):
+            with self.subTest(query=query):
+                with self.assertRaises(InvalidFilter) as context:
+                    self.parse(query)
+                self.assertEqual(context.exception.code, code)
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class SparseFieldsetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.genre = Genre.objects.create(title="Drama")
+        cls.star = Person.objects.create(
+            first_name="Jane", last_name="Doe", types=Person.PersonStatus.ACTOR
+        )
+        cls.movie = create_movie("Movie", description="Long description")
+        cls.movie.genres.add(cls.genre)
+        cls.movie.stars.add(cls.star)
+
+    def setUp(self):
+        GENRES.get_many([self.genre.id])
+
+    def get_list(self, params: dict) -> tuple[dict, list[str]]:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("api:movies_list"), {**params, "cursor": ""}
+            )
+        return response.json()["results"][0], [
+            query["sql"] for query in context.captured_queries
+        ]
+
+    def test_card_view(self):
+        movie, queries = self.get_list({"view": "card"})
+
+        self.assertEqual(tuple(movie), CARD_FIELDS)
+        self.assertEqual(movie["genres"], [{"id": self.genre.id, "title": "Drama"}])
+        # Page and genres only, no person relations
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("description", queries[0])
+
+    def test_fields_narrow_columns_and_relations(self):
+        movie, queries = self.get_list({"fields": "title,stars"})
+
+        self.assertEqual(
+            movie,
+            {
+                "id": self.movie.id,
+                "title": "Movie",
+                "stars": [
+                    {"id": self.star.id, "first_name": "Jane", "last_name": "Doe"}
+                ],
+            },
+        )
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("mpa_rating", queries[0])
+
+    @override_settings(API_MOVIE_LIST_VIEW="card")
+    def test_default_list_view_setting(self):
+        movie, _ = self.get_list({})
+        self.assertEqual(tuple(movie), CARD_FIELDS)
+
+        movie, _ = self.get_list({"view": "full"})
+        self.assertEqual(tuple(movie), MOVIE_OUTPUT_FIELDS)
+
+    @override_settings(API_SERVE_FROM_READ_MODEL=True)
+    def test_read_model_serves_full_payloads_only(self):
+        rebuild_movie_cards()
+
+        movie, _ = self.get_list({"view": "card"})
+
+        self.assertEqual(tuple(movie), CARD_FIELDS)
+
+    def test_detail(self):
+        url = reverse("api:movie_detail", args=[self.movie.id])
+
+        self.assertEqual(
+            self.client.get(url, {"fields": "title"}).json(),
+            {"id": self.movie.id, "title": "Movie"},
+        )
+        self.assertEqual(tuple(self.client.get(url).json()), MOVIE_OUTPUT_FIELDS)
+        self.assertJSONEqual(
+            self.client.get(url, {"include": "rank"}).content,
+            {"error": ["include__invalid"]},
+        )
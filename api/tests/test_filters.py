@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.filters import InvalidFilter, MovieListFilters
+from api.models import Genre, Movie, Person
+from api.tests.utils import create_movie
+
+
+class MovieListFiltersParsingTests(TestCase):
+    def test_invalid_values(self):
+        queries = {
+            "genres=1,x": "genres__invalid",
+            "genres=1&genres_match=some": "genres_match__invalid",
+            "year_min=199x": "year_min__invalid",
+            "rating_max=10.5": "rating_max__invalid",
+            "rating_min=-1": "rating_min__invalid",
+            "mpa_rating=G,XXX": "mpa_rating__invalid",
+            "duration_max=1.5": "duration_max__invalid",
+            "directors=1;2": "directors__invalid",
+            "stars=" + ",".join(map(str, range(51))): "stars__invalid",
+        }
+        for query, code in queries.items():
+            with self.subTest(query=query):
+                with self.assertRaises(InvalidFilter) as context:
+                    MovieListFilters.from_query(QueryDict(query))
+                self.assertEqual(context.exception.code, code)
+
+    def test_values_are_parsed(self):
+        filters = MovieListFilters.from_query(
+            QueryDict("genres=3,1,3&rating_min=7.25&mpa_rating=PG-13,R&year_max=2000")
+        )
+
+        self.assertEqual(filters.genres, (3, 1))
+        self.assertEqual(filters.rating_min, Decimal("7.25"))
+        self.assertEqual(filters.mpa_ratings, ("PG-13", "R"))
+        self.assertEqual(filters.year_max, 2000)
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class MovieListFilteringTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.drama = Genre.objects.create(title="Drama")
+        cls.comedy = Genre.objects.create(title="Comedy")
+        cls.director = Person.objects.create(
+            first_name="Jane", last_name="Doe", types=Person.PersonStatus.DIRECTOR
+        )
+        cls.star = Person.objects.create(
+            first_name="John", last_name="Roe", types=Person.PersonStatus.ACTOR
+        )
+
+        cls.old_drama = create_movie(
+            "Old Drama", release_year=1980, mpa_rating=Movie.MPARating.PG, duration=90
+        )
+        cls.old_drama.genres.add(cls.drama)
+        cls.old_drama.directors.add(cls.director)
+
+        cls.dramedy = create_movie(
+            "Dramedy", imdb_rating=Decimal("8.9"), mpa_rating=Movie.MPARating.R
+        )
+        cls.dramedy.genres.add(cls.drama, cls.comedy)
+        cls.dramedy.stars.add(cls.star)
+
+        cls.comedy_movie = create_movie("Comedy", duration=150)
+        cls.comedy_movie.genres.add(cls.comedy)
+
+    def get_ids(self, params: dict) -> set[int]:
+        response = self.client.get(reverse("api:movies_list"), {**params, "cursor": ""})
+        return {movie["id"] for movie in response.json()["results"]}
+
+    def test_filters(self):
+        cases = [
+            (
+                {"genres": f"{self.drama.id},{self.comedy.id}"},
+                {"old_drama", "dramedy", "comedy_movie"},
+            ),
+            (
+                {"genres": f"{self.drama.id},{self.comedy.id}", "genres_match": "all"},
+                {"dramedy"},
+            ),
+            ({"genres": "999"}, set()),
+            ({"year_max": "1999"}, {"old_drama"}),
+            ({"year_min": "2000", "rating_min": "8.5"}, {"dramedy"}),
+            ({"rating_max": "8"}, {"old_drama", "comedy_movie"}),
+            ({"mpa_rating": "PG,R"}, {"old_drama", "dramedy"}),
+            ({"duration_min": "95", "duration_max": "120"}, {"dramedy"}),
+            ({"directors": str(self.director.id)}, {"old_drama"}),
+            ({"stars": f"{self.star.id},999"}, {"dramedy"}),
+            (
+                {"genres": str(self.comedy.id), "genre_id": str(self.drama.id)},
+                {"comedy_movie"},
+            ),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.get_ids(params),
+                    {getattr(self, name).id for name in expected},
+                )
+
+    def test_filters_are_one_query(self):
+        params = {
+            "genres": f"{self.drama.id},{self.comedy.id}",
+            "genres_match": "all",
+            "year_min": "2000",
+            "mpa_rating": "R",
+            "stars": str(self.star.id),
+            "cursor": "",
+        }
+
+        # Filtered page and its four relations, no validation queries
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("api:movies_list"), params)
+
+        self.assertEqual(
+            [movie["id"] for movie in response.json()["results"]], [self.dramedy.id]
+        )
+
+    def test_no_matches_keep_page_envelope(self):
+        response = self.client.get(reverse("api:movies_list"), {"genres": "999"})
+
+        self.assertJSONEqual(
+            response.content,
+            {"pages": 1, "total": 0, "total_is_estimate": False, "results": []},
+        )
+
+    def test_invalid_filter_response(self):
+        response = self.client.get(reverse("api:movies_list"), {"year_min": "x"})
+
+        self.assertJSONEqual(response.content, {"error": ["year_min__invalid"]})
@@ -0,0 +1,121 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from api.images import schedule_movie_image
+from api.models import Movie
+from api.tests.utils import create_movie
+from api.utils import get_derivative_path
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def make_upload(color: str, size: tuple[int, int] = (800, 1200)) -> SimpleUploadedFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return SimpleUploadedFile("poster.png", buffer.getvalue(), "image/png")
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_DERIVATIVE_WORKERS=0,
+    API_RESPONSE_CACHE={"BACKEND": None},
+    IMAGE_DERIVATIVES={"thumb": (100, 100), "card": (400, 600), "full": (2000, 2000)},
+)
+class ImageDerivativesTests(TestCase):
+    def create_movie(self, **kwargs) -> Movie:
+        with self.captureOnCommitCallbacks(execute=True):
+            movie = create_movie("Movie", **kwargs)
+        movie.refresh_from_db()
+        return movie
+
+    def test_derivatives_fit_their_boxes(self):
+        movie = self.create_movie(poster=make_upload("red"))
+
+        sizes = {}
+        for name in ("thumb", "card", "full"):
+            with default_storage.open(
+                get_derivative_path(movie.poster_hash, name)
+            ) as file, Image.open(file) as image:
+                self.assertEqual(image.format, "WEBP")
+                sizes[name] = image.size
+
+        # Never upscaled past the 800x1200 original
+        self.assertEqual(
+            sizes, {"thumb": (67, 100), "card": (400, 600), "full": (800, 1200)}
+        )
+        self.assertEqual(movie.bg_picture_hash, "")
+
+    def test_identical_images_share_derivatives(self):
+        first = self.create_movie(poster=make_upload("red"))
+        second = self.create_movie(bg_picture=make_upload("red"))
+
+        self.assertEqual(first.poster_hash, second.bg_picture_hash)
+        self.assertEqual(
+            len(default_storage.listdir(f"derivatives/{first.poster_hash[:2]}")[0]),
+            1,
+        )
+
+    def test_replaced_image_is_processed_again(self):
+        movie = self.create_movie(poster=make_upload("red"))
+        red_hash = movie.poster_hash
+
+        movie.poster = make_upload("blue")
+        with self.captureOnCommitCallbacks() as callbacks:
+            movie.save()
+        movie.refresh_from_db()
+
+        self.assertEqual(movie.poster_hash, "")
+
+        for callback in callbacks:
+            callback()
+        movie.refresh_from_db()
+
+        self.assertNotIn(movie.poster_hash, ("", red_hash))
+
+    def test_unrelated_save_does_not_schedule(self):
+        movie = self.create_movie(poster=make_upload("red"))
+
+        movie.title = "Renamed"
+        with self.captureOnCommitCallbacks() as callbacks:
+            movie.save()
+
+        self.assertEqual(len(callbacks), 1)  # catalog version bump only
+        self.assertNotEqual(Movie.objects.get().poster_hash, "")
+
+    def test_api_exposes_derivative_urls(self):
+        movie = self.create_movie(poster=make_upload("red"))
+
+        data = self.client.get(reverse("api:movie_detail", args=[movie.id])).json()
+
+        self.assertEqual(
+            data["poster_images"],
+            {
+                name: f"/media/{get_derivative_path(movie.poster_hash, name)}"
+                for name in ("thumb", "card", "full")
+            },
+        )
+        self.assertEqual(data["bg_picture_images"], {})
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_DERIVATIVE_WORKERS=1)
+class BackgroundDerivativesTests(TransactionTestCase):
+    def test_worker_stores_hash(self):
+        movie = create_movie("Movie")
+        Movie.objects.filter(id=movie.id).update(
+            poster=default_storage.save("uploads/poster.png", make_upload("green"))
+        )
+
+        schedule_movie_image(movie.id, "poster").result(timeout=10)
+
+        self.assertNotEqual(Movie.objects.get().poster_hash, "")
@@ -0,0 +1,116 @@
+import io
+import json
+import tempfile
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.models import Genre, Movie, MovieCard, Person
+from api.references import GENRES, genre_exists
+
+RECORDS = [
+    {
+        "title": "First",
+        "description": "Test",
+        "release_year": 2015,
+        "mpa_rating": "PG",
+        "imdb_rating": "7.5",
+        "duration": 120,
+        "genres": ["Drama", "Comedy"],
+        "directors": ["Jane Doe"],
+        "writers": [{"first_name": "Jane", "last_name": "Doe"}],
+        "stars": ["John Smith", "Jane Doe"],
+    },
+    {
+        "title": "Second",
+        "description": "Test",
+        "release_year": 2016,
+        "mpa_rating": "R",
+        "imdb_rating": 8.1,
+        "duration": 90,
+        "genres": ["Drama"],
+        "stars": ["John Smith"],
+    },
+]
+
+
+class ImportCatalogTests(TestCase):
+    def import_file(self, content: str, suffix: str) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=suffix) as file:
+            file.write(content)
+            file.flush()
+            call_command(
+                "import_catalog", file.name, batch_size=1, stdout=io.StringIO()
+            )
+
+    def import_records(self, records: list[dict]) -> None:
+        self.import_file("\n".join(json.dumps(record) for record in records), ".jsonl")
+
+    def test_import_jsonl(self):
+        self.import_records(RECORDS)
+
+        movie = Movie.objects.get(title="First")
+        self.assertEqual(Genre.objects.count(), 2)
+        self.assertEqual(
+            set(movie.genres.values_list("title", flat=True)), {"Drama", "Comedy"}
+        )
+        self.assertEqual(movie.imdb_rating, Decimal("7.5"))
+        self.assertEqual(
+            Person.objects.filter(first_name="Jane", last_name="Doe").count(), 3
+        )
+        self.assertEqual(Person.objects.filter(first_name="John").count(), 1)
+        self.assertEqual(movie.stars.count(), 2)
+
+    @override_settings(API_SERVE_FROM_READ_MODEL=True)
+    def test_import_refreshes_cards(self):
+        self.import_records(RECORDS)
+
+        self.assertEqual(MovieCard.objects.count(), 2)
+
+    def test_import_after_reference_miss(self):
+        probe = Genre.objects.create(title="Probe")
+        last_id = probe.id
+        probe.delete()
+        # Ids the import is about to take are cached as missing
+        GENRES.get_many(range(last_id + 1, last_id + 10))
+
+        self.import_records(RECORDS)
+
+        drama = Genre.objects.get(title="Drama")
+        self.assertTrue(genre_exists(drama.id))
+        movie = Movie.objects.get(title="Second")
+        response = self.client.get(reverse("api:movie_detail", args=[movie.id]))
+        self.assertEqual(
+            response.json()["genres"], [{"id": drama.id, "title": "Drama"}]
+        )
+
+    def test_reimport_upserts(self):
+        self.import_records(RECORDS)
+        updated = {**RECORDS[0], "duration": 100, "genres": ["Drama"]}
+
+        self.import_records([updated])
+
+        movie = Movie.objects.get(title="First")
+        self.assertEqual(Movie.objects.count(), 2)
+        self.assertEqual(Genre.objects.count(), 2)
+        self.assertEqual(movie.duration, 100)
+        self.assertEqual(list(movie.genres.values_list("title", flat=True)), ["Drama"])
+
+    def test_import_csv(self):
+        self.import_file(
+            "title,description,release_year,mpa_rating,imdb_rating,duration,"
+            "genres,directors,writers,stars\n"
+            "First,Test,2015,PG,7.5,120,Drama|Comedy,Jane Doe,,John Smith\n",
+            ".csv",
+        )
+
+        movie = Movie.objects.get()
+        self.assertEqual(movie.genres.count(), 2)
+        self.assertEqual(movie.directors.get().last_name, "Doe")
+        self.assertFalse(movie.writers.exists())
+
+    def test_invalid_record_reports_line(self):
+        with self.assertRaisesMessage(CommandError, "line 2"):
+            self.import_records([RECORDS[0], {**RECORDS[1], "mpa_rating": "X"}])
@@ -0,0 +1,76 @@
+from django.db import connection
+from django.test import TestCase
+
+from api.benchmarks.seed import seed_movies
+from api.export import EXPORT_ORDERING
+from api.models import Genre, Movie
+from api.pagination import CURSOR_ORDERING
+
+
+class CatalogIndexesTests(TestCase):
+    """Planner picks the catalog indexes on a seeded dataset"""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_movies(2000)
+        genres = Genre.objects.bulk_create(
+            [Genre(title=f"Genre {index}") for index in range(20)]
+        )
+        Movie.genres.through.objects.bulk_create(
+            [
+                Movie.genres.through(movie_id=movie_id, genre=genres[index % 20])
+                for index, movie_id in enumerate(
+                    Movie.objects.values_list("id", flat=True)
+                )
+            ]
+        )
+        cls.genre = genres[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_created_at_ordering(self):
+        self.assertUsesIndex(Movie.objects.all()[:5], "api_movie_created_idx")
+
+    def test_cursor_ordering(self):
+        self.assertUsesIndex(
+            Movie.objects.order_by(*CURSOR_ORDERING)[:5], "api_movie_created_idx"
+        )
+
+    def test_export_ordering(self):
+        # Limited like one batch of the export cursor, a full unlimited
+        # read may rather be a sequential scan and a sort
+        self.assertUsesIndex(
+            Movie.objects.order_by(*EXPORT_ORDERING)[:100], "api_movie_updated_idx"
+        )
+
+    def test_incremental_export(self):
+        updated_since = Movie.objects.order_by("-updated_at")[10].updated_at
+        self.assertUsesIndex(
+            Movie.objects.filter(updated_at__gt=updated_since).order_by(
+                *EXPORT_ORDERING
+            )[:100],
+            "api_movie_updated_idx",
+        )
+
+    def test_release_year_range(self):
+        self.assertUsesIndex(
+            Movie.objects.filter(release_year__range=(2000, 2001)).order_by(),
+            "api_movie_release_year_idx",
+        )
+
+    def test_imdb_rating_range(self):
+        self.assertUsesIndex(
+            Movie.objects.filter(imdb_rating__gte=9.8).order_by(),
+            "api_movie_imdb_rating_idx",
+        )
+
+    def test_genre_reverse_lookup(self):
+        self.assertUsesIndex(
+            Movie.genres.through.objects.filter(genre_id=self.genre.id).values(
+                "movie_id"
+            ),
+            "api_movie_genres_reverse_idx",
+        )
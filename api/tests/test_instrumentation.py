@@ -0,0 +1,86 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.instrumentation import REGISTRY
+from api.models import Genre
+from api.tests.utils import create_movie
+
+INSTRUMENTATION = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 1.0,
+    "SERVER_TIMING": True,
+    "LOG": False,
+    "REPEATED_QUERY_THRESHOLD": 3,
+}
+
+
+@override_settings(
+    API_INSTRUMENTATION=INSTRUMENTATION,
+    API_RESPONSE_CACHE={"BACKEND": None},
+    INTERNAL_IPS=["127.0.0.1"],
+)
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.movie = create_movie("Movie")
+        cls.movie.genres.add(Genre.objects.create(title="Drama"))
+
+    def setUp(self):
+        REGISTRY.clear()
+
+    def get_timings(self, response) -> dict[str, str]:
+        return dict(
+            part.strip().split(";", 1) for part in response["Server-Timing"].split(",")
+        )
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("api:movie_detail", args=[self.movie.id]))
+
+        timings = self.get_timings(response)
+        self.assertEqual(list(timings), ["db", "serialize", "app", "total"])
+        self.assertRegex(timings["db"], r'^dur=[\d.]+;desc="\d+ queries"$')
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse("api:movie_detail", args=[self.movie.id]))
+        response = self.client.get(reverse("api:movie_detail", args=[self.movie.id]))
+
+        metrics = self.client.get(reverse("api:metrics")).json()["views"]
+        detail = metrics["api:movie_detail"]
+        self.assertEqual(detail["requests"], 2)
+        self.assertEqual(detail["avg_bytes"], len(response.content))
+        self.assertGreater(detail["avg_queries"], 0)
+        self.assertEqual(detail["repeated_queries"], 0)
+
+    def test_repeated_queries_are_flagged(self):
+        with override_settings(
+            API_INSTRUMENTATION={**INSTRUMENTATION, "REPEATED_QUERY_THRESHOLD": 1}
+        ), self.assertLogs("api.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("api:genres_list"))
+
+        self.assertIn("api:genres_list ran repeated queries", logs.output[0])
+        self.assertEqual(REGISTRY.snapshot()["api:genres_list"]["repeated_queries"], 1)
+
+    @override_settings(API_INSTRUMENTATION={**INSTRUMENTATION, "SAMPLE_RATE": 0})
+    def test_unsampled_request_is_untouched(self):
+        response = self.client.get(reverse("api:genres_list"))
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(REGISTRY.snapshot(), {})
+
+    @override_settings(ROOT_URLCONF="api.benchmarks.asgi")
+    async def test_async_view_queries_are_counted(self):
+        response = await self.async_client.get("/async/genres/")
+
+        self.assertIn('desc="1 queries"', self.get_timings(response)["db"])
+
+    @override_settings(INTERNAL_IPS=[])
+    def test_metrics_endpoint_is_internal(self):
+        self.assertEqual(self.client.get(reverse("api:metrics")).status_code, 404)
+
+
+class InstrumentationDisabledTests(TestCase):
+    def test_no_header_and_no_endpoint(self):
+        response = self.client.get(reverse("api:genres_list"))
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(self.client.get(reverse("api:metrics")).status_code, 404)
@@ -1,8 +1,7 @@
-from decimal import Decimal
-
 from django.test import TestCase
 
-from api.models import Genre, Movie, Person
+from api.models import Genre, Person
+from api.tests.utils import create_movie
 
 
 class ModelTests(TestCase):
@@ -27,13 +26,6 @@ class ModelTests(TestCase):
 
     def test_movie_str(self):
         title = "Test"
-        movie = Movie.objects.create(
-            title=title,
-            description="Test",
-            release_year=2015,
-            mpa_rating=Movie.MPARating.G,
-            imdb_rating=Decimal("7.5"),
-            duration=15,
-        )
+        movie = create_movie(title, duration=15)
 
         self.assertEqual(str(movie), title)
@@ -0,0 +1,124 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from api.models import Genre, Person
+from api.references import GENRES
+from api.serializers import CARD_FIELDS
+from api.tests.utils import create_movie
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None}, NUM_OF_INSTANCES_ON_PAGE=3)
+class PersonViewsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.genre = Genre.objects.create(title="Drama")
+        cls.person = Person.objects.create(
+            first_name="Jane", last_name="Doe", types=Person.PersonStatus.DIRECTOR
+        )
+        cls.other = Person.objects.create(
+            first_name="John", last_name="Roe", types=Person.PersonStatus.ACTOR
+        )
+        cls.movies = [create_movie(f"Movie {index}") for index in range(4)]
+        for movie in cls.movies:
+            movie.genres.add(cls.genre)
+        cls.movies[0].directors.add(cls.person)
+        cls.movies[1].directors.add(cls.person)
+        cls.movies[1].writers.add(cls.person)
+        cls.movies[3].stars.add(cls.person, cls.other)
+
+    def setUp(self):
+        GENRES.get_many([self.genre.id])
+
+    def get(self, name: str, params: dict | None = None, **kwargs) -> dict:
+        return self.client.get(reverse(name, kwargs=kwargs), params or {}).json()
+
+    def test_person_list(self):
+        with self.assertNumQueries(2):
+            data = self.get("api:persons_list")
+
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(
+            data["results"],
+            [
+                {
+                    "id": self.other.id,
+                    "first_name": "John",
+                    "last_name": "Roe",
+                    "types": "actor",
+                    "movie_counts": {"director": 0, "writer": 0, "star": 1},
+                },
+                {
+                    "id": self.person.id,
+                    "first_name": "Jane",
+                    "last_name": "Doe",
+                    "types": "director",
+                    "movie_counts": {"director": 2, "writer": 1, "star": 1},
+                },
+            ],
+        )
+
+    def test_person_list_types(self):
+        data = self.get("api:persons_list", {"types": "director"})
+
+        self.assertEqual([person["id"] for person in data["results"]], [self.person.id])
+        self.assertEqual(
+            self.get("api:persons_list", {"types": "x"}), {"error": ["types__invalid"]}
+        )
+
+    def test_filmography(self):
+        # Person, credits count, credits page, movie rows and genres
+        with self.assertNumQueries(5):
+            data = self.get("api:person_detail", pk=self.person.id)
+
+        self.assertEqual(data["total"], 4)
+        filmography = data["filmography"]
+        # Newest credits first, spread over roles
+        self.assertEqual(
+            {
+                role: [movie["id"] for movie in movies]
+                for role, movies in filmography.items()
+            },
+            {
+                "director": [self.movies[1].id],
+                "writer": [self.movies[1].id],
+                "star": [self.movies[3].id],
+            },
+        )
+        self.assertEqual(tuple(filmography["star"][0]), CARD_FIELDS)
+
+        data = self.get("api:person_detail", {"page": 2}, pk=self.person.id)
+        self.assertEqual(
+            [movie["id"] for movie in data["filmography"]["director"]],
+            [self.movies[0].id],
+        )
+
+    def test_filmography_query_budget_does_not_grow(self):
+        for index in range(10):
+            movie = create_movie(f"Extra {index}")
+            movie.stars.add(self.person)
+            movie.genres.add(self.genre)
+
+        with self.assertNumQueries(5):
+            self.get("api:person_detail", {"page": 2}, pk=self.person.id)
+
+    def test_filmography_role(self):
+        data = self.get("api:person_detail", {"role": "director"}, pk=self.person.id)
+
+        self.assertEqual(data["total"], 2)
+        self.assertEqual(list(data["filmography"]), ["director"])
+
+    def test_errors(self):
+        for params, code in (
+            ({"role": "producer"}, "role__invalid"),
+            ({"page": "x"}, "page__invalid"),
+            ({"page": 3}, "page__out_of_bounds"),
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.get("api:person_detail", params, pk=self.person.id),
+                    {"error": [code]},
+                )
+
+        self.assertEqual(
+            self.get("api:person_detail", pk=0), {"error": ["person__not_found"]}
+        )
@@ -0,0 +1,72 @@
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from api import async_views
+from api.ratelimit import get_bucket_store, refill
+
+RATE_LIMIT = {
+    "BACKEND": "local",
+    "RATE": 1.0,
+    "BURST": 2,
+    "MAX_CLIENTS": 10,
+    "CACHE_ALIAS": "default",
+}
+
+
+class RefillTests(TestCase):
+    def test_token_bucket(self):
+        bucket, wait = refill(None, 100.0, rate=2.0, burst=2)
+        self.assertEqual((bucket, wait), ((1.0, 100.0), 0.0))
+
+        bucket, wait = refill(bucket, 100.0, rate=2.0, burst=2)
+        self.assertEqual(wait, 0.0)
+
+        bucket, wait = refill(bucket, 100.25, rate=2.0, burst=2)
+        self.assertEqual(wait, 0.25)
+
+        # Refills up to burst only
+        bucket, wait = refill(bucket, 200.0, rate=2.0, burst=2)
+        self.assertEqual((bucket, wait), ((1.0, 200.0), 0.0))
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None}, API_RATE_LIMIT=RATE_LIMIT)
+class RateLimitTests(TestCase):
+    def get(self, name: str = "api:genres_list", address: str = "10.0.0.1"):
+        return self.client.get(reverse(name), REMOTE_ADDR=address)
+
+    def test_limits_each_client(self):
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.get().status_code, 200)
+
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertJSONEqual(response.content, {"error": ["rate_limited"]})
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertIn("no-store", response["Cache-Control"])
+
+        self.assertEqual(self.get(address="10.0.0.2").status_code, 200)
+        # Separate bucket per endpoint
+        self.assertEqual(self.get("api:movies_list").status_code, 200)
+
+    @override_settings(API_RATE_LIMIT={**RATE_LIMIT, "BACKEND": "django"})
+    def test_django_cache_backend(self):
+        get_bucket_store().clear()
+
+        statuses = [self.get().status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [200, 200, 429])
+
+    @override_settings(API_RATE_LIMIT={**RATE_LIMIT, "BACKEND": "none"})
+    def test_disabled(self):
+        statuses = {self.get().status_code for _ in range(5)}
+
+        self.assertEqual(statuses, {200})
+
+    async def test_async_views(self):
+        statuses = []
+        for _ in range(3):
+            request = AsyncRequestFactory().get("/", REMOTE_ADDR="10.0.0.3")
+            response = await async_views.person_list_view(request)
+            statuses.append(response.status_code)
+
+        self.assertEqual(statuses, [200, 200, 429])
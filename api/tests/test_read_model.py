@@ -0,0 +1,95 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Genre, MovieCard, Person
+from api.read_model import rebuild_movie_cards, refresh_movie_cards
+from api.tests.utils import create_movie
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None}, API_SERVE_FROM_READ_MODEL=True)
+class MovieCardTests(TestCase):
+    def setUp(self):
+        self.genre = Genre.objects.create(title="Genre")
+        self.person = Person.objects.create(
+            first_name="First", last_name="Last", types=Person.PersonStatus.ACTOR
+        )
+        self.movies = []
+        for index in range(3):
+            movie = create_movie(f"Movie {index}")
+            movie.genres.add(self.genre)
+            movie.stars.add(self.person)
+            self.movies.append(movie)
+
+    def get_both(self, url: str, params: dict = None) -> tuple[bytes, bytes]:
+        with self.settings(API_SERVE_FROM_READ_MODEL=False):
+            normalized = self.client.get(url, params).content
+        from_cards = self.client.get(url, params).content
+        return normalized, from_cards
+
+    def test_cards_are_served_byte_identical(self):
+        for url, params in (
+            (reverse("api:movies_list"), None),
+            (reverse("api:movies_list"), {"page": "1", "src": "Movie 1"}),
+            (reverse("api:movies_list"), {"cursor": "", "with_total": "1"}),
+            (reverse("api:movie_detail", args=[self.movies[0].id]), None),
+        ):
+            normalized, from_cards = self.get_both(url, params)
+            self.assertEqual(normalized, from_cards)
+
+    def test_list_page_is_one_query_plus_counts(self):
+        with self.assertNumQueries(3):
+            self.client.get(reverse("api:movies_list"))
+
+    def test_genre_rename_refreshes_cards(self):
+        self.genre.title = "Renamed"
+        self.genre.save()
+
+        normalized, from_cards = self.get_both(reverse("api:movies_list"))
+        self.assertIn(b"Renamed", from_cards)
+        self.assertEqual(normalized, from_cards)
+
+    def test_relation_changes_refresh_cards(self):
+        other = Genre.objects.create(title="Other")
+        other.movies.add(self.movies[0])
+        self.movies[1].genres.remove(self.genre)
+        self.person.movies_as_star.clear()
+
+        normalized, from_cards = self.get_both(reverse("api:movies_list"))
+        self.assertEqual(normalized, from_cards)
+
+    def test_person_delete_refreshes_cards(self):
+        self.person.delete()
+
+        normalized, from_cards = self.get_both(reverse("api:movies_list"))
+        self.assertNotIn(b"First", from_cards)
+        self.assertEqual(normalized, from_cards)
+
+    def test_rebuild_restores_cards(self):
+        MovieCard.objects.all().delete()
+
+        self.assertEqual(rebuild_movie_cards(batch_size=2), 3)
+        self.assertEqual(MovieCard.objects.count(), 3)
+
+    def test_refresh_in_batches(self):
+        movie_ids = [movie.id for movie in self.movies]
+        MovieCard.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as one_batch:
+            refresh_movie_cards(movie_ids, batch_size=3)
+        with CaptureQueriesContext(connection) as two_batches:
+            refresh_movie_cards(movie_ids, batch_size=2)
+
+        self.assertEqual(len(two_batches), 2 * len(one_batch))
+        self.assertEqual(MovieCard.objects.count(), 3)
+
+    @override_settings(API_SERVE_FROM_READ_MODEL=False)
+    def test_cards_are_not_written_while_off(self):
+        MovieCard.objects.all().delete()
+
+        self.genre.title = "Renamed"
+        self.genre.save()
+        self.movies[0].save()
+
+        self.assertFalse(MovieCard.objects.exists())
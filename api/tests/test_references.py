@@ -0,0 +1,91 @@
+from django.test import TestCase, override_settings
+
+from api.models import Genre, Movie, Person
+from api.references import GENRES, PERSONS, bump_references_version, genre_exists
+from api.serializers import MOVIE_FIELDS, get_movie_dicts
+from api.tests.utils import create_movie
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        self.drama = Genre.objects.create(title="Drama")
+        self.comedy = Genre.objects.create(title="Comedy")
+        self.person = Person.objects.create(
+            first_name="Jane", last_name="Doe", types=Person.PersonStatus.ACTOR
+        )
+        self.movie = create_movie("Movie")
+        self.movie.genres.add(self.drama, self.comedy)
+        self.movie.stars.add(self.person)
+
+    def serialize(self) -> dict:
+        return get_movie_dicts(Movie.objects.values(*MOVIE_FIELDS))[0]
+
+    def test_payload(self):
+        person = {"id": self.person.id, "first_name": "Jane", "last_name": "Doe"}
+
+        self.assertEqual(
+            self.serialize(),
+            {
+                "id": self.movie.id,
+                "title": "Movie",
+                "description": "Test",
+                "release_year": 2015,
+                "mpa_rating": "G",
+                "imdb_rating": "7.50",
+                "duration": 100,
+                "poster": "",
+                "bg_picture": "",
+                "poster_images": {},
+                "bg_picture_images": {},
+                # Newest first like Meta.ordering
+                "genres": [
+                    {"id": self.comedy.id, "title": "Comedy"},
+                    {"id": self.drama.id, "title": "Drama"},
+                ],
+                "directors": [],
+                "writers": [],
+                "stars": [person],
+            },
+        )
+
+    def test_warm_cache_only_reads_through_tables(self):
+        self.serialize()
+
+        with self.assertNumQueries(5):
+            self.serialize()
+
+    def test_rename_is_picked_up(self):
+        self.serialize()
+
+        self.drama.title = "Tragedy"
+        self.drama.save()
+
+        self.assertIn(
+            {"id": self.drama.id, "title": "Tragedy"}, self.serialize()["genres"]
+        )
+
+    def test_version_bump_from_another_process_drops_rows(self):
+        GENRES.get_many([self.drama.id])
+        Genre.objects.filter(id=self.drama.id).update(title="Tragedy")
+
+        self.assertEqual(GENRES.get_many([self.drama.id])[self.drama.id][1], "Drama")
+
+        bump_references_version()
+
+        self.assertEqual(GENRES.get_many([self.drama.id])[self.drama.id][1], "Tragedy")
+
+    def test_missing_genre_is_remembered(self):
+        self.assertTrue(genre_exists(self.drama.id))
+        self.assertFalse(genre_exists(999))
+
+        with self.assertNumQueries(0):
+            self.assertFalse(genre_exists(999))
+            self.assertTrue(genre_exists(self.drama.id))
+
+    @override_settings(REFERENCE_CACHE_MAX_ENTRIES=1)
+    def test_entries_are_bounded(self):
+        bump_references_version()
+        PERSONS.get_many([self.person.id])
+        GENRES.get_many([self.drama.id, self.comedy.id])
+
+        self.assertEqual(len(GENRES.get_rows(GENRES._version)), 1)
@@ -0,0 +1,147 @@
+from collections import Counter
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.models import Genre, Movie, Person, RelatedMovie
+from api.references import GENRES
+from api.related import SimilarityIndex, rebuild_related_movies
+from api.serializers import CARD_FIELDS
+from api.tests.utils import create_movie
+
+
+def get_related(movie: Movie) -> list[tuple[int, float]]:
+    return list(
+        RelatedMovie.objects.filter(movie=movie).values_list("related_id", "score")
+    )
+
+
+class SimilarityIndexTests(TestCase):
+    def setUp(self):
+        attributes = {
+            1: {("genres", 1), ("directors", 1)},
+            2: {("genres", 1), ("directors", 1)},
+            3: {("genres", 1), ("stars", 1)},
+            4: {("genres", 2)},
+        }
+        frequencies = Counter(
+            attribute for values in attributes.values() for attribute in values
+        )
+        self.index = SimilarityIndex(attributes, frequencies, 4, max_posting=10)
+
+    def test_ranks_by_shared_attributes(self):
+        similar = self.index.get_similar(1, 10)
+
+        self.assertEqual([movie_id for movie_id, _ in similar], [2, 3])
+        self.assertAlmostEqual(similar[0][1], 1.0)
+        self.assertLess(similar[1][1], similar[0][1])
+        self.assertEqual(self.index.get_similar(4, 10), [])
+
+    def test_scores_are_symmetric(self):
+        self.assertAlmostEqual(self.index.score(1, 3), self.index.score(3, 1))
+
+    def test_frequent_attributes_fill_short_lists(self):
+        self.index.max_posting = 2
+
+        # The shared director alone is enough for one candidate
+        self.assertEqual(set(self.index.get_scores(1, 1)), {2})
+        self.assertEqual(set(self.index.get_scores(1, 2)), {2, 3})
+        # Only the newest max_posting movies of a frequent genre
+        self.assertEqual(set(self.index.get_scores(3, 2)), {2})
+
+
+@override_settings(API_RESPONSE_CACHE={"BACKEND": None})
+class RelatedMoviesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.drama = Genre.objects.create(title="Drama")
+        cls.comedy = Genre.objects.create(title="Comedy")
+        cls.director = Person.objects.create(
+            first_name="Jane", last_name="Doe", types=Person.PersonStatus.DIRECTOR
+        )
+        cls.star = Person.objects.create(
+            first_name="John", last_name="Roe", types=Person.PersonStatus.ACTOR
+        )
+        cls.movie = create_movie("Movie")
+        cls.same_director = create_movie("Same director")
+        cls.same_genre = create_movie("Same genre")
+        cls.other = create_movie("Other")
+
+        cls.movie.genres.add(cls.drama)
+        cls.movie.directors.add(cls.director)
+        cls.same_director.genres.add(cls.drama)
+        cls.same_director.directors.add(cls.director)
+        cls.same_genre.genres.add(cls.drama)
+        cls.other.genres.add(cls.comedy)
+
+    def test_relation_changes_update_related_movies(self):
+        self.assertEqual(
+            [movie_id for movie_id, _ in get_related(self.movie)],
+            [self.same_director.id, self.same_genre.id],
+        )
+        self.assertEqual(
+            {movie_id for movie_id, _ in get_related(self.same_genre)},
+            {self.movie.id, self.same_director.id},
+        )
+        self.assertEqual(get_related(self.other), [])
+
+    def test_incremental_matches_rebuild(self):
+        self.other.genres.add(self.drama)
+        self.other.stars.add(self.star)
+        self.same_genre.stars.add(self.star)
+        self.director.delete()
+
+        incremental = {
+            movie.id: get_related(movie)
+            for movie in (self.movie, self.same_genre, self.other)
+        }
+        rebuild_related_movies()
+
+        for movie_id, related in incremental.items():
+            rebuilt = get_related(Movie(id=movie_id))
+            self.assertEqual(
+                [pair[0] for pair in related], [pair[0] for pair in rebuilt]
+            )
+            for (_, score), (_, expected) in zip(related, rebuilt):
+                self.assertAlmostEqual(score, expected)
+
+    def test_deleted_movie_leaves_lists(self):
+        self.same_director.delete()
+
+        self.assertEqual(
+            [movie_id for movie_id, _ in get_related(self.movie)],
+            [self.same_genre.id],
+        )
+
+    def test_related_view(self):
+        GENRES.get_many([self.drama.id])
+        url = reverse("api:movie_related", args=[self.movie.id])
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {"limit": 1})
+
+        (movie,) = response.json()["results"]
+        self.assertEqual(tuple(movie), (*CARD_FIELDS, "score"))
+        self.assertEqual(movie["id"], self.same_director.id)
+        # Related ids, movie rows and genres
+        self.assertEqual(len(context.captured_queries), 3)
+
+    def test_related_view_errors(self):
+        url = reverse("api:movie_related", args=[self.movie.id])
+        for params, code in (
+            ({"limit": 0}, "limit__invalid"),
+            ({"limit": 21}, "limit__invalid"),
+            ({"view": "x"}, "view__invalid"),
+        ):
+            with self.subTest(params=params):
+                self.assertJSONEqual(
+                    self.client.get(url, params).content, {"error": [code]}
+                )
+
+        response = self.client.get(reverse("api:movie_related", args=[0]))
+        self.assertJSONEqual(response.content, {"error": ["movie__not_found"]})
+
+        response = self.client.get(reverse("api:movie_related", args=[self.other.id]))
+        self.assertJSONEqual(response.content, {"results": []})
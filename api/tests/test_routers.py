@@ -0,0 +1,231 @@
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import DatabaseError, OperationalError, connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api import routers
+from api.cache import bump_catalog_version
+from api.models import Genre, Movie
+from api.routers import (
+    CATALOG_WRITTEN_KEY,
+    PRIMARY_COOKIE,
+    ReplicaRouter,
+    replica_middleware,
+)
+
+router = ReplicaRouter()
+
+
+# Reads routed to the replica return its alias, reads left to the
+# primary return None
+@override_settings(API_DB_REPLICAS=["test_replica"], API_DB_REPLICA_STICKINESS=10)
+class ReplicaRouterTests(SimpleTestCase):
+    databases = {"default", "test_replica"}
+
+    def setUp(self):
+        routers._down_until.clear()
+        cache.delete(CATALOG_WRITTEN_KEY)
+        self.reads = []
+
+    def handle(self, request, write: bool = False) -> HttpResponse:
+        def view(request):
+            self.reads.append(router.db_for_read(Movie))
+            if write:
+                router.db_for_write(Genre)
+            self.reads.append(router.db_for_read(Genre))
+            return HttpResponse()
+
+        return replica_middleware(view)(request)
+
+    def test_safe_request_reads_from_replica(self):
+        response = self.handle(RequestFactory().get("/"))
+
+        self.assertEqual(self.reads, ["test_replica", "test_replica"])
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_write_pins_request_and_client(self):
+        response = self.handle(RequestFactory().get("/"), write=True)
+
+        self.assertEqual(self.reads, ["test_replica", None])
+        self.assertEqual(response.cookies[PRIMARY_COOKIE]["max-age"], 10)
+
+    def test_unsafe_request_is_pinned(self):
+        response = self.handle(RequestFactory().post("/"))
+
+        self.assertEqual(self.reads, [None, None])
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_sticky_client_reads_from_primary(self):
+        request = RequestFactory().get("/")
+        request.COOKIES[PRIMARY_COOKIE] = "1"
+
+        response = self.handle(request)
+
+        self.assertEqual(self.reads, [None, None])
+        # Stickiness is not extended by reads
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_requests_read_from_primary_after_catalog_write(self):
+        bump_catalog_version()
+        self.handle(RequestFactory().get("/"))
+
+        self.assertEqual(self.reads, [None, None])
+
+        cache.delete(CATALOG_WRITTEN_KEY)
+        self.handle(RequestFactory().get("/"))
+
+        self.assertEqual(self.reads[2:], ["test_replica", "test_replica"])
+
+    def test_outside_requests_and_other_apps_use_primary(self):
+        self.assertIsNone(router.db_for_read(Movie))
+
+        def view(request):
+            self.reads.append(router.db_for_read(Session))
+            router.db_for_write(Session)
+            return HttpResponse()
+
+        response = replica_middleware(view)(RequestFactory().get("/"))
+
+        self.assertEqual(self.reads, [None])
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    @override_settings(API_DB_REPLICAS=["missing"], API_DB_REPLICA_RETRY_AFTER=30)
+    def test_failed_replica_falls_back_to_primary(self):
+        with self.assertLogs("api.routers", "WARNING"):
+            self.handle(RequestFactory().get("/"))
+
+        self.assertEqual(self.reads, [None, None])
+        self.assertFalse(routers.is_replica_available("missing"))
+
+    def test_streamed_content_keeps_routing(self):
+        def stream():
+            self.reads.append(router.db_for_read(Movie))
+            yield b"line"
+
+        response = replica_middleware(lambda request: StreamingHttpResponse(stream()))(
+            RequestFactory().get("/")
+        )
+        b"".join(response.streaming_content)
+
+        self.assertEqual(self.reads, ["test_replica"])
+
+    def test_replica_failing_mid_request_is_retried_on_primary(self):
+        def fail(sql, params, many, context):
+            raise OperationalError("server closed the connection")
+
+        def view(request):
+            self.reads.append(router.db_for_read(Movie))
+            if len(self.reads) == 1:
+                try:
+                    routers.note_replica_error(
+                        fail,
+                        "SELECT 1",
+                        None,
+                        False,
+                        {"connection": connections["test_replica"]},
+                    )
+                except DatabaseError:
+                    return HttpResponse(status=500)
+            return HttpResponse()
+
+        with self.assertLogs("api.routers", "WARNING"):
+            response = replica_middleware(view)(RequestFactory().get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.reads, ["test_replica", None])
+        self.assertFalse(routers.is_replica_available("test_replica"))
+
+    @override_settings(API_DB_REPLICAS=["missing"])
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(router.allow_migrate("missing", "api"))
+        self.assertIsNone(router.allow_migrate("default", "api"))
+
+
+@override_settings(
+    API_DB_REPLICAS=["test_replica"],
+    API_DB_REPLICA_STICKINESS=10,
+    API_RESPONSE_CACHE={"BACKEND": None},
+)
+class ReplicaRoutingIntegrationTests(TransactionTestCase):
+    """Requests through the whole stack, writes committed for the replica"""
+
+    databases = {"default", "test_replica"}
+
+    def setUp(self):
+        routers._down_until.clear()
+        cache.clear()
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+
+    def get_genres(self, *aliases: str) -> tuple[list[str], dict[str, int]]:
+        """Titles listed by the API and genre queries run on each database"""
+        contexts = {
+            alias: CaptureQueriesContext(connections[alias]) for alias in aliases
+        }
+        for context in contexts.values():
+            context.__enter__()
+        try:
+            response = self.client.get(reverse("api:genres_list"))
+        finally:
+            for context in contexts.values():
+                context.__exit__(None, None, None)
+
+        queries = {
+            alias: sum("api_genre" in query["sql"] for query in context)
+            for alias, context in contexts.items()
+        }
+        return [genre["title"] for genre in response.json()], queries
+
+    def disconnect(self, connection) -> None:
+        # close() keeps SQLite in-memory test databases open, drop the
+        # connection itself so that the next query connects again
+        if connection.connection is not None:
+            connection.connection.close()
+            connection.connection = None
+
+    def test_write_then_read(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("admin:api_genre_add"), {"title": "Drama"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+        # The writing client reads its own write from the primary
+        titles, queries = self.get_genres("default", "test_replica")
+        self.assertEqual(titles, ["Drama"])
+        self.assertEqual(queries, {"default": 1, "test_replica": 0})
+
+        # So does everyone else until the catalog write settles
+        del self.client.cookies[PRIMARY_COOKIE]
+        _, queries = self.get_genres("default", "test_replica")
+        self.assertEqual(queries, {"default": 1, "test_replica": 0})
+
+        cache.delete(CATALOG_WRITTEN_KEY)
+        titles, queries = self.get_genres("default", "test_replica")
+        self.assertEqual(titles, ["Drama"])
+        self.assertEqual(queries, {"default": 0, "test_replica": 1})
+
+    def test_unavailable_replica_falls_back_to_primary(self):
+        Genre.objects.create(title="Drama")
+        cache.delete(CATALOG_WRITTEN_KEY)
+
+        replica = connections["test_replica"]
+        name = replica.settings_dict["NAME"]
+        self.disconnect(replica)
+        replica.settings_dict["NAME"] = "/nonexistent/replica"
+        self.addCleanup(replica.settings_dict.__setitem__, "NAME", name)
+        self.addCleanup(self.disconnect, replica)
+
+        with self.assertLogs("api.routers", "WARNING"):
+            titles, queries = self.get_genres("default")
+
+        self.assertEqual(titles, ["Drama"])
+        self.assertEqual(queries, {"default": 1})
+        self.assertFalse(routers.is_replica_available("test_replica"))
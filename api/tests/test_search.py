@@ -0,0 +1,82 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from api.models import Movie
+from api.search import prefix_search, ranked_search
+from api.tests.utils import create_movie
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.in_description = create_movie("Quiet Night", description="An ocean story")
+        self.in_title = create_movie("Under The Ocean")
+        self.title_prefix = create_movie("Ocean Drive")
+        create_movie("Mountain")
+
+    def test_ranked_search_orders_by_relevance(self):
+        movies = ranked_search(Movie.objects.all(), "ocean")
+
+        self.assertEqual(
+            list(movies.values_list("id", flat=True)),
+            [self.title_prefix.id, self.in_title.id, self.in_description.id],
+        )
+
+    def test_prefix_search_matches_title_start_only(self):
+        movies = prefix_search(Movie.objects.all(), "ocean")
+
+        self.assertEqual(list(movies), [self.title_prefix])
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite fallback index")
+    def test_prefix_search_uses_index(self):
+        plan = prefix_search(Movie.objects.all(), "ocean").explain()
+
+        self.assertIn("api_movie_title_prefix_idx", plan)
+
+    def test_movie_list_search(self):
+        response = self.client.get(reverse("api:movies_list"), {"q": "ocean"})
+
+        self.assertEqual(response.json()["total"], 3)
+        self.assertEqual(response.json()["results"][0]["id"], self.title_prefix.id)
+
+    def test_movie_list_prefix_search(self):
+        response = self.client.get(
+            reverse("api:movies_list"), {"q": "ocean", "search_mode": "prefix"}
+        )
+
+        self.assertEqual(
+            [movie["id"] for movie in response.json()["results"]],
+            [self.title_prefix.id],
+        )
+
+    def test_invalid_search_mode(self):
+        response = self.client.get(
+            reverse("api:movies_list"), {"q": "ocean", "search_mode": "fuzzy"}
+        )
+
+        self.assertJSONEqual(response.content, {"error": ["search_mode__invalid"]})
+
+    def test_invalid_query(self):
+        response = self.client.get(reverse("api:movies_list"), {"q": "o"})
+
+        self.assertJSONEqual(response.content, {"error": ["q__invalid"]})
+
+    def test_cursor_with_ranked_search(self):
+        response = self.client.get(
+            reverse("api:movies_list"), {"q": "ocean", "cursor": ""}
+        )
+
+        self.assertJSONEqual(response.content, {"error": ["cursor__not_supported"]})
+
+    def test_cursor_with_prefix_search(self):
+        response = self.client.get(
+            reverse("api:movies_list"),
+            {"q": "ocean", "search_mode": "prefix", "cursor": ""},
+        )
+
+        self.assertEqual(
+            [movie["id"] for movie in response.json()["results"]],
+            [self.title_prefix.id],
+        )
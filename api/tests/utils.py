@@ -0,0 +1,27 @@
+from decimal import Decimal
+
+from django.db import connection
+
+from api.models import Movie
+
+
+def create_movie(title: str, **fields) -> Movie:
+    """Movie with valid values of every field a test does not set"""
+    fields = {
+        "description": "Test",
+        "release_year": 2015,
+        "mpa_rating": Movie.MPARating.G,
+        "imdb_rating": Decimal("7.5"),
+        "duration": 100,
+        **fields,
+    }
+    return Movie.objects.create(title=title, **fields)
+
+
+def analyze() -> None:
+    """
+    Refresh planner statistics. Postgres writes them to pg_class in place,
+    so they survive the rollback of the test and need refreshing after it.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
@@ -1,11 +1,25 @@
 from django.urls import path
 
-from api.views import genre_list_view, movie_list_view, movie_detail_view
+from api.views import (
+    genre_list_view,
+    movie_list_view,
+    movie_detail_view,
+    movie_related_view,
+    person_detail_view,
+    person_list_view,
+    movie_export_view,
+    metrics_view,
+)
 
 urlpatterns = [
     path("genres/", genre_list_view, name="genres_list"),
     path("movies/", movie_list_view, name="movies_list"),
+    path("movies/export/", movie_export_view, name="movies_export"),
     path("movies/<int:pk>/", movie_detail_view, name="movie_detail"),
+    path("movies/<int:pk>/related/", movie_related_view, name="movie_related"),
+    path("persons/", person_list_view, name="persons_list"),
+    path("persons/<int:pk>/", person_detail_view, name="person_detail"),
+    path("metrics/", metrics_view, name="metrics"),
 ]
 
 app_name = "api"
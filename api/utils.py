@@ -1,8 +1,13 @@
 import os
 import uuid as uuid
 
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.utils.text import slugify
 
+DERIVATIVES_DIR = "derivatives"
+DERIVATIVE_FORMAT = "webp"
+
 
 def poster_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
@@ -15,4 +20,24 @@ def bg_picture_file_path(instance, filename):
     _, extension = os.path.splitext(filename)
     filename = f"{slugify(instance.title)}-{uuid.uuid4()}{extension}"
 
-    return os.path.join("uploads/movies/bg_pictures/", filename)
\ No newline at end of file
+    return os.path.join("uploads/movies/bg_pictures/", filename)
+
+
+def get_derivative_path(content_hash: str, name: str) -> str:
+    return os.path.join(
+        DERIVATIVES_DIR,
+        content_hash[:2],
+        content_hash,
+        f"{name}.{DERIVATIVE_FORMAT}",
+    )
+
+
+def get_derivative_urls(content_hash: str) -> dict[str, str]:
+    """URLs of all derivatives of an image, empty while they are not ready"""
+    if not content_hash:
+        return {}
+
+    return {
+        name: default_storage.url(get_derivative_path(content_hash, name))
+        for name in settings.IMAGE_DERIVATIVES
+    }
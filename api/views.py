@@ -1,141 +1,461 @@
-import re
+from datetime import timedelta
+from typing import Iterable
 
 from django.conf import settings
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.core.paginator import InvalidPage, PageNotAnInteger
 from django.db import DatabaseError
 from django.db.models import QuerySet
-from django.http import JsonResponse, HttpRequest
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpRequest,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from django.utils.cache import add_never_cache_headers
+from django.utils.dateparse import parse_datetime
+
+from api.cache import cache_response, conditional_response
+from api.counting import count_movies
+from api.encoding import FastJsonResponse
+from api.export import iter_card_lines, iter_movie_lines
+from api.facets import get_facets, parse_facets
+from api.fieldsets import VIEW_CARD, VIEW_FULL, parse_fieldset
+from api.filmography import (
+    PERSON_FIELDS,
+    filter_persons,
+    get_credit_rows,
+    get_person_dicts,
+    get_person_rows,
+    group_credits,
+    parse_roles,
+)
+from api.filters import (
+    FIELDSET_PARAMS,
+    GENRE_LIST_PARAMS,
+    MOVIE_LIST_PARAMS,
+    PERSON_DETAIL_PARAMS,
+    PERSON_LIST_PARAMS,
+    RELATED_LIST_PARAMS,
+    InvalidFilter,
+    MovieListFilters,
+    get_movie_rows,
+    parse_genre_id,
+)
+from api.instrumentation import REGISTRY
+from api.models import Genre, Movie, Person
+from api.pagination import get_cursor_page, get_estimated_page, get_offset_page
+from api.ratelimit import rate_limit
+from api.read_model import (
+    encode_with_results,
+    get_card_payload,
+    is_read_model_enabled,
+)
+from api.references import genre_exists
+from api.related import get_related_ids, order_related_rows, parse_limit
+from api.serializers import (
+    CARD_FIELDS,
+    MOVIE_OUTPUT_FIELDS,
+    get_genre_count_dicts,
+    get_genres_dicts,
+    get_movie_columns,
+    get_movie_dicts,
+)
 
-from api.models import Genre, Movie
 
+def retrieve_one_genre_id(genre_ids: str) -> int | None:
+    genre_id = parse_genre_id(genre_ids)
 
-def get_genres_dicts(genres_query: QuerySet) -> list[dict]:
-    return [{"id": genre.id, "title": genre.title} for genre in genres_query.all()]
+    if genre_id is None or not genre_exists(genre_id):
+        return None
 
+    return genre_id
 
-def get_person_dicts(persons_query: QuerySet) -> list[dict]:
-    return [
-        {
-            "id": person.id,
-            "first_name": person.first_name,
-            "last_name": person.last_name,
-        }
-        for person in persons_query.all()
-    ]
-
-
-def get_movie_dict(movie: Movie) -> dict:
-    data = {
-        "id": movie.id,
-        "title": movie.title,
-        "description": movie.description,
-        "release_year": movie.release_year,
-        "mpa_rating": movie.mpa_rating,
-        "imdb_rating": movie.imdb_rating,
-        "duration": movie.duration,
-        "poster": str(movie.poster),
-        "bg_picture": str(movie.bg_picture),
-        "genres": get_genres_dicts(movie.genres),
-        "directors": get_person_dicts(movie.directors),
-        "writers": get_person_dicts(movie.writers),
-        "stars": get_person_dicts(movie.stars),
-    }
-    return data
 
+def get_movie_updated_at(pk: int) -> QuerySet:
+    """Relation changes touch updated_at too, see api.signals"""
+    return Movie.objects.filter(id=pk).values_list("updated_at", flat=True)
 
-def retrieve_one_genre_id(genre_ids: str) -> int | None:
-    list_of_ids = genre_ids.split(",")
-    genre_id = list_of_ids[0]
 
-    integer_pattern = re.compile(r"^[0-9]+$")
+def error_response(code: str) -> FastJsonResponse:
+    """Errors are never cached, they echo whatever parameters were sent"""
+    response = FastJsonResponse({"error": [code]})
+    add_never_cache_headers(response)
+    return response
 
-    if not integer_pattern.match(genre_id):
-        return None
 
-    try:
-        Genre.objects.get(id=genre_id)
-    except Genre.DoesNotExist:
-        return None
+def internal_error_response() -> FastJsonResponse:
+    return error_response("internal")
 
-    return int(genre_id)
 
+def page_error_response(error: InvalidPage) -> FastJsonResponse:
+    if isinstance(error, PageNotAnInteger):
+        return error_response("page__invalid")
+    return error_response("page__out_of_bounds")
 
-def verify_search_phrase(search_phrase: str) -> bool:
-    search_phrase_pattern = re.compile(r"^[A-Za-z0-9 !?:;,.]{2,20}$")
 
-    if search_phrase_pattern.match(search_phrase):
-        return True
+def get_genre_list_data(request: HttpRequest, genres: Iterable[Genre]) -> list[dict]:
+    if request.GET.get("with_counts"):
+        return get_genre_count_dicts(genres)
+    return get_genres_dicts(genres)
 
-    return False
+
+def parse_movie_list_query(
+    request: HttpRequest,
+) -> tuple[MovieListFilters, tuple[str, ...], tuple[str, ...]]:
+    """
+    Filters, facets and fields of movie list, raises InvalidFilter.
+    Whether the genre exists is left to the caller, it takes a query.
+    """
+    filters = MovieListFilters.from_query(request.GET)
+    facets = parse_facets(request.GET)
+    fields = parse_fieldset(request.GET, settings.API_MOVIE_LIST_VIEW)
+    # Keyset order would replace relevance order of ranked search
+    if filters.is_ranked and "cursor" in request.GET:
+        raise InvalidFilter("cursor__not_supported")
+    return filters, facets, fields
+
+
+def get_movie_list_rows(
+    filters: MovieListFilters, fields: tuple[str, ...]
+) -> tuple[QuerySet, QuerySet, bool]:
+    """Filtered movies, the rows to page through and whether they are cards"""
+    movies = filters.filter_movies(Movie.objects.all())
+    # Cards hold full payloads only
+    from_cards = (
+        is_read_model_enabled()
+        and not filters.is_ranked
+        and fields == MOVIE_OUTPUT_FIELDS
+    )
+    return movies, get_movie_rows(movies, from_cards, fields), from_cards
+
+
+def get_cards_page_response(data: dict, rows: Iterable[dict]) -> HttpResponse:
+    """Card payloads are spliced into the response as they are stored"""
+    return HttpResponse(
+        encode_with_results(data, [row["payload"] for row in rows]),
+        content_type="application/json",
+    )
+
+
+def get_movies_page_response(
+    data: dict, rows: Iterable[dict], from_cards: bool, fields: tuple[str, ...]
+) -> HttpResponse:
+    """Response with page of movies under "results" key after data"""
+    if from_cards:
+        return get_cards_page_response(data, rows)
+
+    return FastJsonResponse({**data, "results": get_movie_dicts(rows, fields)})
+
+
+def get_related_rows(pairs: list[tuple[int, int]], fields: tuple[str, ...]) -> QuerySet:
+    return Movie.objects.filter(id__in=[movie_id for movie_id, _ in pairs]).values(
+        *get_movie_columns(fields)
+    )
+
+
+def get_related_results(movies: list[dict], scores: list[int]) -> list[dict]:
+    return [{**movie, "score": score} for movie, score in zip(movies, scores)]
+
+
+def get_person_list_response(
+    page: str | int, total: int, rows: list[dict]
+) -> FastJsonResponse:
+    return FastJsonResponse(
+        {"pages": page, "total": total, "results": get_person_dicts(rows)}
+    )
+
+
+def get_person_detail_response(
+    person: dict,
+    page: str | int,
+    total: int,
+    credits: list[dict],
+    movies: list[dict],
+    roles: tuple[str, ...],
+) -> FastJsonResponse:
+    return FastJsonResponse(
+        {
+            **person,
+            "pages": page,
+            "total": total,
+            "filmography": group_credits(credits, movies, roles),
+        }
+    )
 
 
-def genre_list_view(request: HttpRequest) -> JsonResponse:
-    """Function based view for retrieving all genre instances"""
+def get_credit_movie_rows(credits: list[dict]) -> QuerySet:
+    return Movie.objects.filter(
+        id__in={credit["movie_id"] for credit in credits}
+    ).values(*get_movie_columns(CARD_FIELDS))
+
+
+@rate_limit("genres_list")
+@conditional_response("genres_list", query_params=GENRE_LIST_PARAMS)
+@cache_response(query_params=GENRE_LIST_PARAMS)
+def genre_list_view(request: HttpRequest) -> FastJsonResponse:
+    """
+    Function based view for retrieving all genre instances.
+    `with_counts` adds the number of movies of every genre.
+    """
     try:
-        genres = Genre.objects.all()
-        data = get_genres_dicts(genres)
-        return JsonResponse(data, safe=False)
+        data = get_genre_list_data(request, Genre.objects.all())
+        return FastJsonResponse(data, safe=False)
     except DatabaseError:
-        return JsonResponse({"error": ["internal"]})
+        return internal_error_response()
 
 
-def movie_list_view(request: HttpRequest) -> JsonResponse:
+@rate_limit("movies_list")
+@conditional_response("movies_list", query_params=MOVIE_LIST_PARAMS)
+@cache_response(query_params=MOVIE_LIST_PARAMS)
+def movie_list_view(request: HttpRequest) -> HttpResponse:
     """
     Function based view for retrieving all movie instances with pagination.
     Filtering by genre_id, src can be applied.
+    `genres`, `genres_match`, `year_min`/`year_max`, `rating_min`/`rating_max`,
+    `mpa_rating`, `duration_min`/`duration_max`, `directors` and `stars`
+    narrow the list down, see api.filters.MovieListFilters.
+    `q` searches title and description, ranked by relevance, or by title
+    prefix only with `search_mode=prefix`.
+    Passing `cursor` switches to keyset pagination with `next_cursor`
+    in response, `with_total` adds the total of filtered movies. Ranked
+    search pages by `page` only, with `cursor` it is an error. Totals
+    are counted once per filters and catalog version, big ones are
+    planner estimates flagged by `total_is_estimate`, see api.counting.
+    Estimates do not bound `page`, the last page reports the exact total.
+    `facets=genres,mpa_rating` adds counts of filtered movies per value.
+    With API_SERVE_FROM_READ_MODEL pages are served from movie cards.
     """
-    genre_id = request.GET.get("genre_id", None)
-    search_phrase = request.GET.get("src", None)
     page = request.GET.get("page", 1)
 
-    movies = Movie.objects.all()
+    try:
+        filters, facets, fields = parse_movie_list_query(request)
+        if filters.genre_id and not retrieve_one_genre_id(str(filters.genre_id)):
+            raise InvalidFilter("genre__invalid")
+    except InvalidFilter as error:
+        return error_response(error.code)
 
     try:
-        if genre_id:
-            genre_id = retrieve_one_genre_id(genre_id)
-            if not genre_id:
-                return JsonResponse({"error": ["genre__invalid"]})
-            movies = Movie.objects.exclude(genres__id=genre_id)
+        movies, rows, from_cards = get_movie_list_rows(filters, fields)
 
-        if search_phrase:
-            if not verify_search_phrase(search_phrase):
-                return JsonResponse({"error": ["src__invalid"]})
-            movies = movies.exclude(title__istartswith=search_phrase)
+        if "cursor" in request.GET:
+            try:
+                page_rows, next_cursor = get_cursor_page(
+                    rows,
+                    request.GET["cursor"],
+                    settings.NUM_OF_INSTANCES_ON_PAGE,
+                    pk_field="movie_id" if from_cards else "id",
+                )
+            except ValueError:
+                return error_response("cursor__invalid")
 
-        total = movies.count()
+            data = {"next_cursor": next_cursor}
+            if request.GET.get("with_total"):
+                data["total"], data["total_is_estimate"] = count_movies(movies)
+            if facets:
+                data["facets"] = get_facets(movies, facets)
 
-        paginator = Paginator(movies, settings.NUM_OF_INSTANCES_ON_PAGE)
+            return get_movies_page_response(data, page_rows, from_cards, fields)
 
-        try:
-            movies_page = paginator.page(page)
-            if not movies_page:
-                return JsonResponse([])
-        except PageNotAnInteger:
-            return JsonResponse({"error": ["page__invalid"]})
-        except EmptyPage:
-            return JsonResponse({"error": ["page__out_of_bounds"]})
+        total, total_is_estimate = count_movies(movies)
 
-        results = [get_movie_dict(movie) for movie in movies_page]
-
-        return JsonResponse(
-            {"pages": page, "total": total, "results": results}, safe=False
-        )
+        try:
+            if total_is_estimate:
+                page_rows, total, total_is_estimate = get_estimated_page(
+                    rows, page, settings.NUM_OF_INSTANCES_ON_PAGE, total
+                )
+            else:
+                page_rows = get_offset_page(
+                    rows, page, settings.NUM_OF_INSTANCES_ON_PAGE, total
+                )
+        except InvalidPage as error:
+            return page_error_response(error)
+
+        data = {"pages": page, "total": total, "total_is_estimate": total_is_estimate}
+        if facets:
+            data["facets"] = get_facets(movies, facets)
+
+        return get_movies_page_response(data, page_rows, from_cards, fields)
 
     except DatabaseError:
-        return JsonResponse({"error": ["internal"]})
+        return internal_error_response()
 
 
-def movie_detail_view(request: HttpRequest, pk: int) -> JsonResponse:
+@conditional_response(
+    "movie_detail", query_params=FIELDSET_PARAMS, last_modified=get_movie_updated_at
+)
+@cache_response(query_params=FIELDSET_PARAMS)
+def movie_detail_view(request: HttpRequest, pk: int) -> HttpResponse:
     """
     Function based view for retrieving all details on specific movie instance.
+    `view`, `fields` and `include` narrow the payload like on movie list.
     """
     try:
-        movie = Movie.objects.get(id=pk)
+        fields = parse_fieldset(request.GET, VIEW_FULL)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        if is_read_model_enabled() and fields == MOVIE_OUTPUT_FIELDS:
+            payload = get_card_payload(pk)
+            if payload is not None:
+                return HttpResponse(payload, content_type="application/json")
+
+        movie = Movie.objects.values(*get_movie_columns(fields)).get(id=pk)
+        data = get_movie_dicts([movie], fields)[0]
     except Movie.DoesNotExist:
-        return JsonResponse({"error": ["movie__not_found"]})
+        return error_response("movie__not_found")
+    except DatabaseError:
+        return internal_error_response()
+
+    return FastJsonResponse(data, safe=False)
+
+
+@rate_limit("movie_related")
+@conditional_response("movie_related", query_params=RELATED_LIST_PARAMS)
+@cache_response(query_params=RELATED_LIST_PARAMS)
+def movie_related_view(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    Function based view for retrieving movies sharing most genres and
+    persons with a movie, best first, each with its similarity `score`.
+    Served from related movies precomputed by api.related, `limit` caps
+    their number. Payloads are cards unless `view`, `fields` or `include`
+    say otherwise.
+    """
+    try:
+        fields = parse_fieldset(request.GET, VIEW_CARD)
+        limit = parse_limit(request.GET)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        pairs = get_related_ids(pk, limit)
+        if not pairs and not Movie.objects.filter(id=pk).exists():
+            return error_response("movie__not_found")
+
+        rows, scores = order_related_rows(pairs, get_related_rows(pairs, fields))
+        results = get_related_results(get_movie_dicts(rows, fields), scores)
+    except DatabaseError:
+        return internal_error_response()
+
+    return FastJsonResponse({"results": results})
+
+
+@rate_limit("persons_list")
+@conditional_response("persons_list", query_params=PERSON_LIST_PARAMS)
+@cache_response(query_params=PERSON_LIST_PARAMS)
+def person_list_view(request: HttpRequest) -> FastJsonResponse:
+    """
+    Function based view for retrieving persons with pagination, newest
+    first, each with their number of movies per role.
+    `types` keeps persons of one type only.
+    """
+    page = request.GET.get("page", 1)
+
+    try:
+        persons = filter_persons(Person.objects.all(), request.GET)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        total = persons.count()
+        try:
+            rows = get_offset_page(
+                get_person_rows(persons),
+                page,
+                settings.NUM_OF_INSTANCES_ON_PAGE,
+                total,
+            )
+        except InvalidPage as error:
+            return page_error_response(error)
+
+        return get_person_list_response(page, total, rows)
+    except DatabaseError:
+        return internal_error_response()
+
+
+@conditional_response("person_detail", query_params=PERSON_DETAIL_PARAMS)
+@cache_response(query_params=PERSON_DETAIL_PARAMS)
+def person_detail_view(request: HttpRequest, pk: int) -> FastJsonResponse:
+    """
+    Function based view for retrieving a person with a page of their
+    filmography, movie cards grouped by role with newest movies first.
+    `role` limits the filmography to director, writer or star credits.
+    """
+    page = request.GET.get("page", 1)
+
+    try:
+        roles = parse_roles(request.GET)
+    except InvalidFilter as error:
+        return error_response(error.code)
+
+    try:
+        person = Person.objects.values(*PERSON_FIELDS).get(id=pk)
+
+        credit_rows = get_credit_rows(pk, roles)
+        total = credit_rows.count()
+        try:
+            credits = get_offset_page(
+                credit_rows, page, settings.NUM_OF_INSTANCES_ON_PAGE, total
+            )
+        except InvalidPage as error:
+            return page_error_response(error)
+
+        movies = get_movie_dicts(get_credit_movie_rows(credits), CARD_FIELDS)
+    except Person.DoesNotExist:
+        return error_response("person__not_found")
     except DatabaseError:
-        return JsonResponse({"error": ["internal"]})
+        return internal_error_response()
+
+    return get_person_detail_response(person, page, total, credits, movies, roles)
 
-    data = get_movie_dict(movie)
 
-    return JsonResponse(data, safe=False)
+def movie_export_view(request: HttpRequest) -> HttpResponse:
+    """
+    Function based view streaming the whole catalog as NDJSON,
+    one movie per line. `updated_since` limits export to movies
+    changed after given ISO datetime, pass `X-Export-Watermark`
+    of the previous export to fetch only what changed since then.
+    The watermark lags EXPORT_WATERMARK_LAG behind, so consecutive
+    exports overlap and consumers must upsert lines by id.
+    """
+    watermark = timezone.now() - timedelta(seconds=settings.EXPORT_WATERMARK_LAG)
+    updated_since = request.GET.get("updated_since", None)
+
+    movies = Movie.objects.all()
+
+    if updated_since:
+        try:
+            updated_since = parse_datetime(updated_since)
+        except ValueError:
+            updated_since = None
+        if updated_since is None:
+            return error_response("updated_since__invalid")
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+        movies = movies.filter(updated_at__gt=updated_since)
+
+    iter_lines = iter_card_lines if is_read_model_enabled() else iter_movie_lines
+    response = StreamingHttpResponse(
+        iter_lines(movies, settings.EXPORT_CHUNK_SIZE),
+        content_type="application/x-ndjson",
+    )
+    response["X-Export-Watermark"] = watermark.isoformat()
+    return response
+
+
+def metrics_view(request: HttpRequest) -> FastJsonResponse:
+    """
+    Per-view request metrics collected by
+    api.instrumentation.instrumentation_middleware in this process.
+    Only answered to INTERNAL_IPS while instrumentation is enabled.
+    """
+    if (
+        not settings.API_INSTRUMENTATION["ENABLED"]
+        or request.META.get("REMOTE_ADDR") not in settings.INTERNAL_IPS
+    ):
+        raise Http404
+
+    response = FastJsonResponse({"views": REGISTRY.snapshot()})
+    add_never_cache_headers(response)
+    return response